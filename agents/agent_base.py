@@ -3,20 +3,59 @@
 import os
 import json
 import logging
-import requests
 import traceback
 import time
+import threading
 from abc import ABC, abstractmethod
-import openai
-try:
-    import anthropic
-except ImportError:
-    anthropic = None
 from typing import Any, Dict, Optional, Tuple
+from tools.rate_limiter import RateLimiter, retry_after_seconds, backoff_delay
+from tools.circuit_breaker import CircuitBreaker, CircuitOpenError
+from tools.latency_tracker import LatencyTracker, adaptive_timeout
+from tools.hedging import HedgeStats, HedgeCancelledError, hedged_call
+from tools.single_flight import SingleFlight, llm_request_key
+from tools.usage_ledger import UsageLedger, bind_usage_context
+from tools.json_stream import extract_json
+from tools.output_schemas import validate_schema
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Prefix of the text returned by call_llm when every provider failed.
+LLM_ERROR_PREFIX = "❌ LLM Error"
+
+# Completion budget requested from every provider.
+DEFAULT_MAX_TOKENS = 2000
+
+
+class ModelNotFoundError(RuntimeError):
+    """Raised when a provider does not have the requested model."""
+
+
+def is_model_not_found(error: Exception) -> bool:
+    """True if ``error`` means the model does not exist (HTTP 404), not that the provider failed."""
+    return isinstance(error, ModelNotFoundError) or getattr(error, "status_code", None) == 404
+
+# Identical requests in flight at the same time (from any agent) share one call.
+LLM_FLIGHTS = SingleFlight()
+
+# Usage reported by the provider for the current thread's last request.
+_call_usage = threading.local()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for budgeting."""
+    return (len(text or "") + 3) // 4
+
+
+def provider_for_model(model: str) -> str:
+    """Map a model name to the provider that serves it."""
+    model = model.strip().lower()
+    if model.startswith("gpt"):
+        return "openai"
+    if model.startswith("claude") or model.startswith("anthropic"):
+        return "anthropic"
+    return "ollama"
+
 class BaseAgent(ABC):
     """
     Abstract base class for all AI agents in The Agency.
@@ -33,9 +72,10 @@ class BaseAgent(ABC):
         self.max_retries = getattr(config, "MAX_RETRIES", 3)
         self.retry_delay = getattr(config, "RETRY_DELAY", 2)
 
-        # Initialize OpenAI client
+        # Initialize OpenAI client (the SDKs are imported only when a key is set)
         key = getattr(config, "GPT4_API_KEY", "")
         if key and not key.startswith("your-"):
+            import openai
             self.openai_client = openai.OpenAI(api_key=key)
         else:
             logger.warning("OpenAI API key not configured")
@@ -43,16 +83,37 @@ class BaseAgent(ABC):
 
         # Initialize Anthropic client
         akey = getattr(config, "ANTHROPIC_API_KEY", "")
-        if anthropic and akey and not akey.startswith("your-"):
-            self.anthropic_client = anthropic.Anthropic(api_key=akey)
-        else:
-            self.anthropic_client = None
+        self.anthropic_client = None
+        if akey and not akey.startswith("your-"):
+            try:
+                import anthropic
+                self.anthropic_client = anthropic.Anthropic(api_key=akey)
+            except ImportError:
+                logger.warning("anthropic package not installed; Claude models unavailable")
 
         # Test Ollama connection
         self._test_ollama_connection()
+        self._register_health_probes()
+
+    def _register_health_probes(self):
+        """Give the shared circuit breakers a cheap way to detect provider recovery."""
+        ollama_breaker = CircuitBreaker.get("ollama", self.config)
+        if ollama_breaker.probe is None:
+            ollama_breaker.set_probe(self._probe_ollama)
+        openai_breaker = CircuitBreaker.get("openai", self.config)
+        if openai_breaker.probe is None and self.openai_client:
+            client = self.openai_client
+            openai_breaker.set_probe(lambda: client.models.list() is not None)
+
+    def _probe_ollama(self) -> bool:
+        import requests
+        url = self.config.OLLAMA_API_URL.rstrip("/")
+        url = url.replace("/api/chat", "/api/tags") if "/api/" in url else f"{url}/api/tags"
+        return requests.get(url, timeout=5).status_code == 200
 
     def _test_ollama_connection(self):
         """Test if Ollama is reachable."""
+        import requests
         try:
             url = self.config.OLLAMA_API_URL.rstrip("/")
             test_url = url if "/api/" in url else f"{url}/api/tags"
@@ -70,7 +131,9 @@ class BaseAgent(ABC):
         """Abstract method to be implemented by child agents."""
         pass
 
-    def call_llm(self, prompt: str, model: str = "gpt-4", system: str = "") -> str:
+    def call_llm(self, prompt: str, model: str = "gpt-4", system: str = "",
+                 max_tokens: Optional[int] = None, task: str = "general",
+                 schema: Optional[dict] = None) -> str:
         """
         Unified method for calling LLMs with retry logic and fallbacks.
         
@@ -78,103 +141,383 @@ class BaseAgent(ABC):
             prompt (str): User input or task description.
             model (str): Model name (e.g., 'gpt-4o', 'qwen:7b', 'claude-3-sonnet').
             system (str): Optional system-level instruction for context.
+            max_tokens (int): Completion budget; defaults to DEFAULT_MAX_TOKENS.
+                See ``tools.output_budget`` for per-file-type hints.
+            task (str): Task type (e.g. 'code', 'fix', 'review') used to track
+                latency and derive the request timeout.
+            schema (dict): JSON schema the response must follow (see ``call_llm_json``).
 
         Returns:
             str: The generated model response.
         """
         model = model.strip().lower()
+        max_tokens = max_tokens or DEFAULT_MAX_TOKENS
+        call = lambda: self._call_llm_with_retries(prompt, model, system, max_tokens, task, schema)
+        if not getattr(self.config, "LLM_SINGLE_FLIGHT", True):
+            return call()
+        return LLM_FLIGHTS.do(llm_request_key(model, prompt, system, max_tokens, schema), call)
+
+    def call_llm_json(self, prompt: str, schema: dict, strict: bool = True, **kwargs) -> Any:
+        """
+        Call the LLM with schema-constrained output and parse the response.
+
+        The schema is sent as OpenAI ``response_format``, Ollama ``format`` or
+        a forced Anthropic tool call, and the parsed response is validated
+        against it on arrival.
+
+        Args:
+            prompt (str): User input or task description.
+            schema (dict): JSON schema of the response; its ``title`` names it.
+            strict (bool): Raise on schema violations instead of logging them
+                (callers that normalize the result can pass False).
+            **kwargs: Passed on to ``call_llm`` (model, system, max_tokens, task).
+
+        Returns:
+            Any: The parsed response.
+
+        Raises:
+            ValueError: If the response is not JSON of the schema's type, or
+                violates the schema while ``strict``.
+        """
+        response = self.call_llm(prompt, schema=schema, **kwargs)
+
+        data = self.extract_json_from_response(response, "[" if schema.get("type") == "array" else "{")
+        errors = validate_schema(data, schema)
+        if not errors:
+            return data
+        name = schema.get("title", "schema")
+        wrong_type = bool(validate_schema(data, {"type": schema.get("type")}))
+        if strict or wrong_type:
+            raise ValueError(f"Response does not match {name}: {'; '.join(errors[:5])}")
+        logger.warning(f"⚠️ Response deviates from {name}: {'; '.join(errors[:5])}")
+        return data
+
+    def _call_llm_with_retries(self, prompt: str, model: str, system: str = "",
+                               max_tokens: int = DEFAULT_MAX_TOKENS, task: str = "general",
+                               schema: Optional[dict] = None) -> str:
+        """Call ``model`` with retries, hedging and fallbacks (see ``call_llm``)."""
         logger.info(f"🧠 Calling LLM → Model: {model}")
 
+        provider = self._provider_for(model)
+        if not self._provider_available(provider):
+            logger.warning(f"{provider} client not configured; routing {model} to a fallback model")
+            return self._get_fallback_response(
+                prompt, model, f"{provider} client not configured", system, max_tokens, task, schema
+            )
+
         # Try the primary model with retries
         for attempt in range(self.max_retries):
             try:
-                if model.startswith("gpt"):
-                    return self._call_openai_chat(model, prompt, system)
-                elif model.startswith("claude") or model.startswith("anthropic"):
-                    return self._call_anthropic_chat(model, prompt, system)
-                else:
-                    return self._call_ollama_chat(model, prompt, system)
+                return self._call_primary(provider, model, prompt, system, max_tokens, task, schema)
+            except CircuitOpenError as e:
+                logger.warning(f"{e}; failing over immediately")
+                return self._get_fallback_response(prompt, model, str(e), system, max_tokens, task, schema)
             except Exception as e:
+                if is_model_not_found(e):
+                    logger.warning(f"{e}; failing over without retrying")
+                    return self._get_fallback_response(prompt, model, str(e), system, max_tokens, task, schema)
                 logger.warning(f"Attempt {attempt + 1} failed: {e}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    time.sleep(self._retry_delay_for(e, provider, model, attempt))
                 else:
                     logger.error(f"All {self.max_retries} attempts failed")
-                    return self._get_fallback_response(prompt, model, str(e))
+                    return self._get_fallback_response(prompt, model, str(e), system, max_tokens, task, schema)
 
-    def _get_fallback_response(self, prompt: str, model: str, error: str) -> str:
-        """Generate a fallback response when all LLM calls fail."""
-        logger.warning(f"Using fallback response due to error: {error}")
-        
-        # Try alternative models
+    def _call_primary(self, provider: str, model: str, prompt: str, system: str = "",
+                      max_tokens: int = DEFAULT_MAX_TOKENS, task: str = "general",
+                      schema: Optional[dict] = None) -> str:
+        """
+        Call the requested model, hedging to the next-best model when enabled.
+
+        With ``HEDGING["enabled"]`` set, a duplicate request goes to another
+        model once the primary has been slower than its observed latency
+        quantile (p90 by default); the first usable answer wins.
+        """
+        hedge_model, delay = self._hedge_plan(model, prompt, system)
+        if not hedge_model:
+            return self._call_provider(provider, model, prompt, system, max_tokens, task, schema)
+
+        hedge_provider = self._provider_for(hedge_model)
+        cancelled = threading.Event()
+        prompt_tokens = estimate_tokens(prompt) + estimate_tokens(system)
+        return hedged_call(
+            bind_usage_context(lambda: self._call_provider(
+                provider, model, prompt, system, max_tokens, task, schema, cancelled=cancelled
+            )),
+            bind_usage_context(lambda: self._call_provider(
+                hedge_provider, hedge_model, prompt, system, max_tokens, task, schema, cancelled=cancelled
+            )),
+            delay,
+            is_usable=lambda response: bool(response and response.strip()),
+            cancelled=cancelled,
+            tokens=lambda response: prompt_tokens + estimate_tokens(response or ""),
+        )
+
+    def _hedge_plan(self, model: str, prompt: str, system: str) -> Tuple[Optional[str], float]:
+        """
+        Decide whether a call may be hedged.
+
+        Returns:
+            Tuple[Optional[str], float]: The hedge model (None to not hedge) and
+            how long to wait for the primary before sending it.
+        """
+        settings = getattr(self.config, "HEDGING", None) or {}
+        if not settings.get("enabled"):
+            return None, 0.0
+
+        # Cost caps: skip large prompts and stop once too many calls were hedged.
+        if estimate_tokens(prompt) + estimate_tokens(system) > settings.get("max_prompt_tokens", 4000):
+            return None, 0.0
+        max_fraction = settings.get("max_fraction", 0.1)
+        if HedgeStats.fired_fraction() >= max_fraction or HedgeStats.overhead_fraction() >= max_fraction:
+            return None, 0.0
+
+        delay = LatencyTracker.percentile(model, settings.get("quantile", 0.9), settings.get("min_samples", 5))
+        if delay is None:
+            return None, 0.0
+
+        for candidate in self._hedge_candidates(model):
+            provider = self._provider_for(candidate)
+            if candidate != model and self._provider_available(provider) \
+                    and not CircuitBreaker.get(provider, self.config).is_open():
+                return candidate, delay
+        return None, 0.0
+
+    def _hedge_candidates(self, model: str) -> list:
+        """Models ranked by ModelManager for the task ``model`` is best suited to."""
+        from tools.model_manager import ModelManager
+        manager = ModelManager.shared(self.config)
+        return manager.get_ranked_models_for_task(manager.get_task_for_model(model))
+
+    def _retry_delay_for(self, error: Exception, provider: str, model: str, attempt: int) -> float:
+        """
+        Seconds to wait before retrying after ``error``.
+
+        A Retry-After header from the provider wins and also pauses every other
+        caller of that backend; otherwise exponential backoff with jitter is used.
+        """
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            RateLimiter.get(provider, model, self.config).defer(retry_after)
+            return retry_after
+        return backoff_delay(attempt, self.retry_delay)
+
+    def _provider_for(self, model: str) -> str:
+        """Map a model name to the provider that serves it."""
+        return provider_for_model(model)
+
+    def _provider_available(self, provider: str) -> bool:
+        """Return True if a client for the provider is configured."""
+        if provider == "openai":
+            return self.openai_client is not None
+        if provider == "anthropic":
+            return self.anthropic_client is not None
+        return True
+
+    def _call_provider(self, provider: str, model: str, prompt: str, system: str = "",
+                       max_tokens: int = DEFAULT_MAX_TOKENS, task: str = "general",
+                       schema: Optional[dict] = None, cancelled: Optional[threading.Event] = None) -> str:
+        """
+        Dispatch a single request to the given provider.
+
+        The request must pass the provider's circuit breaker and fit its rate
+        limits; the outcome and latency are recorded on the breaker (a
+        missing model is not held against the provider), and
+        successful calls are written to the usage ledger. The timeout adapts
+        to the latency observed for this model and task and to ``max_tokens``.
+        A ``schema`` asks the provider for output conforming to it. A hedged
+        request whose ``cancelled`` event is set by the time it gets its slot
+        is not sent.
+        """
+        breaker = CircuitBreaker.get(provider, self.config)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit for {provider} is open")
+
+        tokens = estimate_tokens(prompt) + estimate_tokens(system) + max_tokens
+        with RateLimiter.slot(provider, model, tokens, self.config):
+            if cancelled is not None and cancelled.is_set():
+                breaker.release()
+                raise HedgeCancelledError(f"Hedged request to {model} no longer needed")
+            timeout = adaptive_timeout(model, task, max_tokens, self.config, DEFAULT_MAX_TOKENS)
+            options = {"max_tokens": max_tokens, "timeout": timeout, "schema": schema}
+            start = time.monotonic()
+            _call_usage.value = None
+            try:
+                if provider == "openai":
+                    result = self._call_openai_chat(model, prompt, system, **options)
+                elif provider == "anthropic":
+                    result = self._call_anthropic_chat(model, prompt, system, **options)
+                else:
+                    result = self._call_ollama_chat(model, prompt, system, **options)
+            except Exception as e:
+                if is_model_not_found(e):
+                    breaker.release()
+                else:
+                    breaker.record_failure(time.monotonic() - start)
+                raise
+            latency = time.monotonic() - start
+            breaker.record_success(latency, timeout)
+            usage = getattr(_call_usage, "value", None) or {}
+            output_tokens = usage.get("completion_tokens", estimate_tokens(result))
+            LatencyTracker.record(model, latency, task, output_tokens)
+            self._record_usage(provider, model, prompt, system, result, latency)
+            return result
+
+    def _record_usage(self, provider: str, model: str, prompt: str, system: str, result: str, latency: float):
+        """Write one call to the usage ledger, estimating tokens the provider did not report."""
+        if not getattr(self.config, "USAGE_LEDGER_ENABLED", True):
+            return
+        usage = getattr(_call_usage, "value", None) or {}
+        try:
+            UsageLedger.get(self.config).record(
+                provider,
+                model,
+                prompt_tokens=usage.get("prompt_tokens", estimate_tokens(prompt) + estimate_tokens(system)),
+                completion_tokens=usage.get("completion_tokens", estimate_tokens(result)),
+                latency=latency,
+                ttft=usage.get("ttft"),
+                tokens_per_sec=usage.get("tokens_per_sec"),
+                agent=type(self).__name__,
+                estimated=not usage,
+            )
+        except Exception as e:
+            logger.warning(f"Could not record LLM usage: {e}")
+
+    def _fallback_models(self, model: str) -> list:
+        """
+        Alternative models to try when ``model`` fails.
+
+        Candidates are ordered by the health of their provider's circuit
+        breaker (local Ollama last on ties); providers with an open breaker
+        are left out.
+        """
+        provider = self._provider_for(model)
         fallback_models = []
-        if not model.startswith("gpt") and self.openai_client:
+        if provider != "openai" and self.openai_client:
             fallback_models.append("gpt-3.5-turbo")
-        if not model.startswith("claude") and self.anthropic_client:
+        if provider != "anthropic" and self.anthropic_client:
             fallback_models.append("claude-3-haiku-20240307")
+        ollama_model = getattr(self.config, "OLLAMA_MODEL", "")
+        if provider != "ollama" and ollama_model:
+            fallback_models.append(ollama_model.strip().lower())
+
+        breakers = {m: CircuitBreaker.get(self._provider_for(m), self.config) for m in fallback_models}
+        healthy = [m for m in fallback_models if not breakers[m].is_open()]
+        return sorted(healthy, key=lambda m: -breakers[m].health())
+
+    def _get_fallback_response(self, prompt: str, model: str, error: str, system: str = "",
+                               max_tokens: int = DEFAULT_MAX_TOKENS, task: str = "general",
+                               schema: Optional[dict] = None) -> str:
+        """Generate a fallback response when all LLM calls fail."""
+        logger.warning(f"Using fallback response due to error: {error}")
         
-        for fallback_model in fallback_models:
+        # Try alternative models once each; no recursion back into call_llm
+        for fallback_model in self._fallback_models(model):
             try:
                 logger.info(f"Trying fallback model: {fallback_model}")
-                return self.call_llm(prompt, fallback_model, "")
-            except Exception:
+                return self._call_provider(
+                    self._provider_for(fallback_model), fallback_model, prompt, system, max_tokens, task, schema
+                )
+            except Exception as e:
+                logger.warning(f"Fallback model {fallback_model} failed: {e}")
                 continue
         
         # Final fallback: return a structured error response
-        return f"❌ LLM Error: {error}\n\nPlease check:\n1. Is Ollama running? (ollama serve)\n2. Is the model pulled? (ollama pull {model})\n3. Are API keys configured correctly?"
+        return f"{LLM_ERROR_PREFIX}: {error}\n\nPlease check:\n1. Is Ollama running? (ollama serve)\n2. Is the model pulled? (ollama pull {model})\n3. Are API keys configured correctly?"
 
-    def _call_openai_chat(self, model: str, user_prompt: str, system_prompt: str = "") -> str:
+    @staticmethod
+    def is_llm_error(response: str) -> bool:
+        """Return True if ``response`` is the error text produced after all providers failed."""
+        return isinstance(response, str) and response.startswith(LLM_ERROR_PREFIX)
+
+    def _call_openai_chat(self, model: str, user_prompt: str, system_prompt: str = "",
+                          max_tokens: int = DEFAULT_MAX_TOKENS, timeout: Optional[float] = None,
+                          schema: Optional[dict] = None) -> str:
         """Calls OpenAI's chat model."""
         if not self.openai_client:
             raise RuntimeError("OpenAI client not configured")
 
         messages = self._build_messages(user_prompt, system_prompt)
+        structured = {"response_format": self._openai_response_format(model, schema)} if schema else {}
         try:
             response = self.openai_client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=0.7,
-                max_tokens=2000
+                max_tokens=max_tokens,
+                timeout=timeout or getattr(self.config, "REQUEST_TIMEOUT", 60),
+                **structured,
             )
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                _call_usage.value = {
+                    "prompt_tokens": usage.prompt_tokens,
+                    "completion_tokens": usage.completion_tokens,
+                }
             return response.choices[0].message.content.strip()
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             raise
 
-    def _call_anthropic_chat(self, model: str, user_prompt: str, system_prompt: str = "") -> str:
+    def _call_anthropic_chat(self, model: str, user_prompt: str, system_prompt: str = "",
+                             max_tokens: int = DEFAULT_MAX_TOKENS, timeout: Optional[float] = None,
+                             schema: Optional[dict] = None) -> str:
         """Calls Anthropic's chat API."""
         if not self.anthropic_client:
             raise RuntimeError("Anthropic client not configured")
 
         messages = self._build_messages(user_prompt, system_prompt)
+        structured = {}
+        if schema:
+            # Forcing a single tool call makes the tool input the structured response
+            name = schema.get("title", "response")
+            structured = {
+                "tools": [{"name": name, "description": "Return the response.", "input_schema": schema}],
+                "tool_choice": {"type": "tool", "name": name},
+            }
         try:
             response = self.anthropic_client.messages.create(
                 model=model,
-                max_tokens=2000,
+                max_tokens=max_tokens,
                 messages=messages,
-                temperature=0.7
+                temperature=0.7,
+                timeout=timeout or getattr(self.config, "REQUEST_TIMEOUT", 60),
+                **structured,
             )
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                _call_usage.value = {
+                    "prompt_tokens": usage.input_tokens,
+                    "completion_tokens": usage.output_tokens,
+                }
             if hasattr(response, "content"):
+                for block in response.content:
+                    if getattr(block, "type", "") == "tool_use":
+                        return json.dumps(block.input)
                 return "".join(block.text for block in response.content if hasattr(block, 'text')).strip()
             return str(response)
         except Exception as e:
             logger.error(f"Anthropic API error: {e}")
             raise
 
-    def _call_ollama_chat(self, model: str, user_prompt: str, system_prompt: str = "") -> str:
+    def _call_ollama_chat(self, model: str, user_prompt: str, system_prompt: str = "",
+                          max_tokens: int = DEFAULT_MAX_TOKENS, timeout: Optional[float] = None,
+                          schema: Optional[dict] = None) -> str:
         """Calls a local Ollama model via REST API."""
+        import requests
         headers = {"Content-Type": "application/json"}
         payload = {
             "model": model,
             "messages": self._build_messages(user_prompt, system_prompt),
             "stream": False,
-            "options": {
-                "temperature": 0.7,
-                "num_predict": 2000
-            }
+            "keep_alive": getattr(self.config, "OLLAMA_KEEP_ALIVE", "30m"),
+            "options": self._ollama_options(max_tokens),
         }
+        if schema:
+            # Older Ollama versions only understand plain JSON mode
+            payload["format"] = schema if getattr(self.config, "OLLAMA_JSON_SCHEMA", True) else "json"
 
-        timeout = getattr(self.config, "REQUEST_TIMEOUT", 60)
+        timeout = timeout or getattr(self.config, "REQUEST_TIMEOUT", 60)
         
         # Ensure correct API endpoint
         url = self.config.OLLAMA_API_URL.rstrip("/")
@@ -191,6 +534,7 @@ class BaseAgent(ABC):
             res.raise_for_status()
             
             result = res.json()
+            _call_usage.value = self._ollama_usage(result)
             
             # Handle response format
             if "message" in result and "content" in result["message"]:
@@ -208,7 +552,7 @@ class BaseAgent(ABC):
             )
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 404:
-                raise RuntimeError(
+                raise ModelNotFoundError(
                     f"Model '{model}' not found. "
                     f"Pull it first with: ollama pull {model}"
                 )
@@ -217,6 +561,84 @@ class BaseAgent(ABC):
             logger.error(f"Ollama error: {e}")
             raise
 
+    @staticmethod
+    def _openai_response_format(model: str, schema: dict) -> dict:
+        """JSON-schema output for models that support it, plain JSON mode otherwise."""
+        if model.startswith(("gpt-4o", "gpt-4.1")):
+            return {
+                "type": "json_schema",
+                "json_schema": {"name": schema.get("title", "response"), "schema": schema, "strict": False},
+            }
+        return {"type": "json_object"}
+
+    def _ollama_options(self, max_tokens: int = DEFAULT_MAX_TOKENS) -> dict:
+        """
+        Model options sent with every Ollama request.
+
+        They must be identical across calls (and match the preload request):
+        Ollama reloads the model when load-time options such as ``num_ctx``
+        change, which also throws away the KV cache it reuses for prompts that
+        share a prefix, such as the same system prompt.
+        """
+        options = {"temperature": 0.7, "num_predict": max_tokens}
+        num_ctx = getattr(self.config, "OLLAMA_NUM_CTX", 0)
+        if num_ctx:
+            options["num_ctx"] = num_ctx
+        return options
+
+    def _ollama_endpoint(self, name: str) -> str:
+        """URL of an Ollama API endpoint such as ``generate`` or ``tags``."""
+        base = self.config.OLLAMA_API_URL.rstrip("/")
+        if "/api/" in base:
+            base = base.split("/api/")[0]
+        return f"{base}/api/{name}"
+
+    def load_ollama_model(self, model: str, keep_alive=None) -> bool:
+        """
+        Load an Ollama model into memory (or update how long it stays loaded).
+
+        Args:
+            model (str): Ollama model name.
+            keep_alive: Duration such as "30m", seconds, or -1 to pin indefinitely.
+                Defaults to ``OLLAMA_KEEP_ALIVE``.
+
+        Returns:
+            bool: True if Ollama accepted the request.
+        """
+        import requests
+        if keep_alive is None:
+            keep_alive = getattr(self.config, "OLLAMA_KEEP_ALIVE", "30m")
+        payload = {"model": model, "keep_alive": keep_alive, "options": self._ollama_options()}
+        try:
+            res = requests.post(
+                self._ollama_endpoint("generate"),
+                json=payload,
+                timeout=getattr(self.config, "REQUEST_TIMEOUT", 60),
+            )
+            res.raise_for_status()
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load Ollama model {model}: {e}")
+            return False
+
+    @staticmethod
+    def _ollama_usage(result: dict) -> Optional[dict]:
+        """
+        Token counts and timings from an Ollama response.
+
+        Ollama reports durations in nanoseconds; time to first token is the
+        model load plus prompt evaluation time.
+        """
+        if "eval_count" not in result:
+            return None
+        eval_seconds = result.get("eval_duration", 0) / 1e9
+        return {
+            "prompt_tokens": result.get("prompt_eval_count", 0),
+            "completion_tokens": result["eval_count"],
+            "ttft": (result.get("load_duration", 0) + result.get("prompt_eval_duration", 0)) / 1e9,
+            "tokens_per_sec": result["eval_count"] / eval_seconds if eval_seconds else None,
+        }
+
     def _build_messages(self, user_prompt: str, system_prompt: str = "") -> list:
         """Helper to build LLM message list."""
         messages = []
@@ -225,35 +647,36 @@ class BaseAgent(ABC):
         messages.append({"role": "user", "content": user_prompt})
         return messages
 
-    def extract_json_from_response(self, response: str) -> dict:
+    def extract_json_from_response(self, response: str, start: str = "{") -> Any:
         """
-        Extract JSON from LLM response, handling markdown code blocks.
+        Extract JSON from LLM response, handling markdown code blocks and prose.
+
+        The first complete (arbitrarily nested) object is returned, or the
+        first array when ``start`` is ``"["``; trailing commas are tolerated
+        and a response cut off mid-value is repaired.
         
         Args:
             response (str): Raw LLM response
+            start (str): ``"{"`` to expect an object, ``"["`` for an array.
             
         Returns:
-            dict: Parsed JSON object
+            Any: Parsed JSON object (or array)
+
+        Raises:
+            ValueError: If no JSON can be recovered from the response.
         """
-        # Remove markdown code blocks
-        if "```json" in response:
-            response = response.split("```json")[1].split("```")[0]
-        elif "```" in response:
-            response = response.split("```")[1].split("```")[0]
+        value = extract_json(response, start)
+        if value is not None:
+            return value
         
-        # Try to find JSON object
-        import re
-        json_match = re.search(r'\{[^{}]*\}', response, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group(0))
-            except json.JSONDecodeError:
-                pass
-        
-        # Try full response
+        # No object or array found; the response may be a bare JSON scalar
         try:
             return json.loads(response.strip())
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON: {e}")
             logger.debug(f"Response was: {response}")
             raise ValueError(f"Invalid JSON in response: {e}")
+
+    def safe_json_parse(self, text: str):
+        """Parse JSON from model output, raising ValueError if none can be recovered."""
+        return self.extract_json_from_response(text)
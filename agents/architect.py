@@ -5,7 +5,9 @@ import re
 import json
 import logging
 from agents.agent_base import BaseAgent
-from typing import Dict, List, Any
+from tools.plan_templates import template_files
+from tools.output_schemas import PLAN_SCHEMA
+from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +24,18 @@ class ArchitectAgent(BaseAgent):
         # Try to use the best model for architecture tasks
         try:
             from tools.model_manager import ModelManager
-            mm = ModelManager(config)
+            mm = ModelManager.shared(config)
             self.preferred_model = mm.get_best_model_for_task("architecture") or "gpt-4o"
         except:
             self.preferred_model = "gpt-4o"
 
+        # Plans of earlier, similar prompts (and shipped templates) to reuse
+        self.plan_settings = getattr(config, "PLAN_STORE", None) or {}
+        self.plan_store = None
+        if self.plan_settings.get("enabled"):
+            from tools.plan_store import PlanStore
+            self.plan_store = PlanStore(config)
+
     def generate_plan(self, user_prompt: str) -> dict:
         """
         Generates a comprehensive software architecture plan.
@@ -42,25 +51,32 @@ class ArchitectAgent(BaseAgent):
         # First, analyze what type of project this is
         project_type = self._analyze_project_type(user_prompt)
         
-        # Generate appropriate plan based on project type
-        planning_prompt = self._create_planning_prompt(user_prompt, project_type)
+        # Reuse or adapt the plan of a near-duplicate request if there is one
+        plan = self._plan_from_store(user_prompt, project_type)
         
-        try:
-            plan_response = self.call_llm(
-                prompt=planning_prompt,
-                model=self.preferred_model,
-                system="You are a senior software architect. Always respond with valid JSON only."
-            )
-            
-            logger.debug("📝 Raw plan response:\n" + plan_response)
-            plan = self.extract_json_from_response(plan_response)
-            plan = self._enhance_plan(plan, project_type)
-            plan = self.normalize_plan(plan)
+        if plan is None:
+            # Generate appropriate plan based on project type
+            planning_prompt = self._create_planning_prompt(user_prompt, project_type)
             
-        except Exception as e:
-            logger.error(f"❌ Failed to parse architecture plan: {e}")
-            # Use a robust fallback plan
-            plan = self._create_fallback_plan(user_prompt, project_type)
+            try:
+                # Schema-constrained output; deviations are repaired by normalize_plan
+                plan = self.call_llm_json(
+                    planning_prompt,
+                    PLAN_SCHEMA,
+                    strict=False,
+                    model=self.preferred_model,
+                    system="You are a senior software architect. Always respond with valid JSON only."
+                )
+                
+                logger.debug(f"📝 Raw plan: {plan}")
+                plan = self._enhance_plan(plan, project_type)
+                plan = self.normalize_plan(plan)
+                self._store_plan(user_prompt, project_type, plan)
+                
+            except Exception as e:
+                logger.error(f"❌ Failed to parse architecture plan: {e}")
+                # Use a robust fallback plan
+                plan = self._create_fallback_plan(user_prompt, project_type)
         
         # Validate plan has required fields
         if not plan.get("files") or len(plan["files"]) == 0:
@@ -74,6 +90,91 @@ class ArchitectAgent(BaseAgent):
         logger.info(f"✅ Plan created: {len(plan.get('files', []))} files, {len(plan.get('components', []))} components")
         return plan
 
+    def revise_plan(self, change_request: str, previous_plan: dict) -> dict:
+        """
+        Updates an existing plan for a follow-up request.
+
+        File specs the change does not touch are expected back verbatim so that
+        only files whose specs actually changed get regenerated.
+
+        Args:
+            change_request (str): What the user wants changed or added.
+            previous_plan (dict): The plan the project was generated from.
+
+        Returns:
+            dict: The revised, normalized plan (the previous plan if revision fails).
+        """
+        logger.info(f"\n🧠 [{self.role}] Revising architecture...")
+
+        revision_prompt = f"""
+You are a senior software architect maintaining an existing project.
+
+Current plan:
+{json.dumps(previous_plan, indent=2)}
+
+The user now asks:
+"{change_request}"
+
+Return the COMPLETE updated plan as a JSON object with the same structure.
+- Copy every file entry that does not need to change exactly as it is.
+- Only edit the description of files whose behaviour must change.
+- Add entries for new files and omit files that are no longer needed.
+"""
+
+        try:
+            plan = self.normalize_plan(self.call_llm_json(
+                revision_prompt,
+                PLAN_SCHEMA,
+                strict=False,
+                model=self.preferred_model,
+                system="You are a senior software architect. Always respond with valid JSON only."
+            ))
+        except Exception as e:
+            logger.error(f"❌ Failed to revise architecture plan: {e}")
+            return previous_plan
+
+        if not plan.get("files"):
+            logger.warning("⚠️ Revised plan has no files. Keeping the previous plan.")
+            return previous_plan
+
+        self.memory.save(f"{self.__class__.__name__}::plan", plan)
+        logger.info(f"✅ Plan revised: {len(plan['files'])} files")
+        return plan
+
+    def _plan_from_store(self, user_prompt: str, project_type: str) -> Optional[dict]:
+        """
+        Find a stored plan or template for a similar prompt of the same project type.
+
+        Plans at least ``reuse_threshold`` similar are reused as they are; plans
+        at least ``adapt_threshold`` similar are revised for the new prompt.
+
+        Returns:
+            Optional[dict]: The plan to use, or None to plan from scratch.
+        """
+        if not self.plan_store:
+            return None
+
+        match = self.plan_store.lookup(user_prompt, project_type, self.plan_settings.get("use_templates", True))
+        if match is None:
+            return None
+        score, plan, source = match
+
+        if score >= self.plan_settings.get("reuse_threshold", 0.85):
+            logger.info(f"♻️ Reusing {source} plan (similarity {score:.2f})")
+            return self.normalize_plan(plan)
+        if score >= self.plan_settings.get("adapt_threshold", 0.6):
+            logger.info(f"🪄 Adapting {source} plan (similarity {score:.2f})")
+            adapted = self.revise_plan(user_prompt, plan)
+            if adapted is not plan:
+                self._store_plan(user_prompt, project_type, adapted)
+            return adapted
+        return None
+
+    def _store_plan(self, user_prompt: str, project_type: str, plan: dict):
+        """Remember a planned (not fallback) result for later similar prompts."""
+        if self.plan_store and plan.get("files"):
+            self.plan_store.put_plan(user_prompt, project_type, plan)
+
     def _analyze_project_type(self, user_prompt: str) -> str:
         """Analyze the prompt to determine project type."""
         prompt_lower = user_prompt.lower()
@@ -186,7 +287,8 @@ Return ONLY a valid JSON object with this structure:
         {{
             "path": "relative/path/to/file.ext",
             "description": "detailed description of what this file does",
-            "component": "which component it belongs to"
+            "component": "which component it belongs to",
+            "depends_on": ["relative/paths/of/project/files/it/imports/or/uses"]
         }}
     ],
     "dependencies": {{
@@ -199,6 +301,8 @@ Return ONLY a valid JSON object with this structure:
     "deployment_notes": "Deployment instructions"
 }}
 
+List in each file's "depends_on" the project files it imports or uses, so files can be
+generated after the interfaces they rely on.
 Ensure the plan is production-ready and follows best practices.
 """
 
@@ -331,7 +435,10 @@ Ensure the plan is production-ready and follows best practices.
             ]
         }
         
-        return default_structures.get(project_type, default_structures["web_fullstack"])
+        if project_type in default_structures:
+            return default_structures[project_type]
+        # Fall back to the shipped template library before the generic web layout
+        return template_files(project_type) or default_structures["web_fullstack"]
 
     def _create_fallback_plan(self, user_prompt: str, project_type: str) -> dict:
         """Create a robust fallback plan when LLM fails."""
@@ -408,6 +515,10 @@ Ensure the plan is production-ready and follows best practices.
                         "description": file_item.get("description", "Auto-generated file").strip(),
                         "component": file_item.get("component", "unknown")
                     })
+                    if isinstance(file_item.get("depends_on"), list):
+                        normalized_files[-1]["depends_on"] = [
+                            str(dep).strip().replace("\\", "/") for dep in file_item["depends_on"]
+                        ]
                 elif isinstance(file_item, str):
                     normalized_files.append({
                         "path": file_item.strip(),
@@ -433,7 +544,7 @@ Ensure the plan is production-ready and follows best practices.
         
         # Log plan summary
         logger.info(f"Normalized plan: {plan['project_name']} ({plan['project_type']})")
-        logger.info(f"Components: {[c['name'] for c in plan['components']]}")
+        logger.info(f"Components: {[c.get('name') if isinstance(c, dict) else c for c in plan['components']]}")
         logger.info(f"Files: {len(plan['files'])}")
         
         return plan
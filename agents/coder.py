@@ -2,7 +2,12 @@
 
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from agents.agent_base import BaseAgent
+from tools.context_loader import ContextLoader
+from tools.output_budget import output_budget_for
+from tools.plan_graph import infer_dependencies, topological_waves
+from tools.usage_ledger import bind_usage_context
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -32,22 +37,49 @@ class CoderAgent(BaseAgent):
         super().__init__(config, memory)
         self.role = "Code Generator"
         self.description = "Writes complete source files from planning specs"
+        self.context = ContextLoader(config, memory)
+        # Paths of the last execute_plan written from a fallback template
+        # because the LLM failed; they are not reported as generated
+        self.placeholder_files = set()
 
     def generate_plan(self, user_prompt: str):
         return {}
 
-    def execute_plan(self, plan: dict) -> list:
+    def execute_plan(self, plan: dict, done=(), on_file=None, only=None) -> list:
+        """
+        Generate and write every file in ``plan``.
+
+        Files are generated in waves ordered by their dependencies (explicit
+        ``depends_on`` lists or ones inferred from the descriptions); files in
+        the same wave are generated concurrently, each with interface
+        summaries of the files it depends on.
+
+        Args:
+            plan (dict): Architect plan with a ``files`` list.
+            done (Iterable[str]): Paths already generated by an earlier, interrupted run;
+                they are kept as they are.
+            on_file (Callable[[str], None]): Called with each path once its generated
+                code is written; not called for fallback placeholders.
+            only (Iterable[str]): Generate just these paths. The rest of the plan is
+                still used for dependency ordering and, where already on disk,
+                for interface summaries, but is neither rewritten nor returned.
+
+        Returns:
+            list: Paths of the project's files (of ``only``, when given).
+        """
         logger.info(f"🛠️ [{self.role}] Generating code modules...")
+        done = set(done)
+        only = None if only is None else {os.path.normpath(p) for p in only}
+        self.placeholder_files = set()
 
         if not isinstance(plan, dict) or "files" not in plan:
             logger.error("Invalid plan format: missing 'files' key.")
             return []
 
-        file_paths = []
+        specs = {}
 
         for spec in plan.get("files", []):
             path = os.path.normpath(spec.get("path", "").strip())
-            description = spec.get("description", "No description provided").strip()
 
             if not path or path.endswith("/") or os.path.basename(path) == "":
                 logger.info(f"📁 Skipping directory path: {path}")
@@ -57,19 +89,66 @@ class CoderAgent(BaseAgent):
                 logger.error(f"❌ Skipping insecure or invalid path: {path}")
                 continue
 
-            try:
-                code = self._generate_code(description, path)
-                self._write_file(path, code)
-                file_paths.append(path)
-            except Exception as e:
-                logger.error(f"❌ Failed to generate/write {path}: {e}")
-
+            specs[path] = dict(spec, path=path)
+
+        deps = infer_dependencies(list(specs.values()))
+        waves = topological_waves(deps)
+        logger.info(f"🧭 Generating {len(specs)} files in {len(waves)} dependency waves")
+
+        written = set()
+        workers = getattr(self.config, "CODE_MAX_WORKERS", 4)
+        for wave in waves:
+            if only is not None:
+                wave = [p for p in wave if p in only]
+            for path in wave:
+                if path in done:
+                    logger.info(f"⏭️ Keeping already generated {path}")
+                    written.add(path)
+            pending = [p for p in wave if p not in done]
+            if not pending:
+                continue
+            generate = bind_usage_context(lambda p: self._generate_file(specs[p], deps[p]))
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as executor:
+                for path, ok in zip(pending, executor.map(generate, pending)):
+                    if ok:
+                        written.add(path)
+                        if on_file and path not in self.placeholder_files:
+                            on_file(path)
+
+        file_paths = [p for p in specs if p in written]
         logger.info(f"✅ Code generation complete. Files: {file_paths}")
         return file_paths
 
-    def _generate_code(self, description: str, path: str) -> str:
+    def _generate_file(self, spec: dict, dependencies: list) -> bool:
+        """Generate and write one file; returns whether it was written."""
+        path = spec["path"]
+        description = spec.get("description", "No description provided").strip()
+        try:
+            interfaces = self._dependency_interfaces(dependencies)
+            if interfaces:
+                code = self._generate_code(description, path, interfaces)
+            else:
+                code = self._generate_code(description, path)
+            self._write_file(path, code)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to generate/write {path}: {e}")
+            return False
+
+    def _dependency_interfaces(self, dependencies: list) -> str:
+        """Interface summaries of the already written files in ``dependencies``."""
+        written = [d for d in dependencies if os.path.isfile(os.path.join(self.config.PROJECTS_DIR, d))]
+        if not written:
+            return ""
+        budget = getattr(self.config, "INTERFACE_CONTEXT_TOKENS", 1200)
+        return self.context.build_interface_context(written, budget)
+
+    def _generate_code(self, description: str, path: str, interfaces: str = "") -> str:
         """
         Uses LLM to generate code. Falls back if model fails.
+
+        ``interfaces`` summarizes the project files this one depends on, so
+        the generated code uses their real names and signatures.
         """
         language = self._infer_language(path)
         if len(description) > 500:
@@ -82,12 +161,19 @@ class CoderAgent(BaseAgent):
 
         The file should be ready to use and follow best practices.
         """
+        if interfaces:
+            prompt += f"\nIt is `{path}` and uses these already written project files; import from them as they are:\n{interfaces}\n"
 
         try:
-            code = self.call_llm(prompt, model=self.config.CODE_MODEL)
+            code = self.call_llm(
+                prompt, model=self.config.CODE_MODEL, max_tokens=output_budget_for(path), task="code"
+            )
+            if self.is_llm_error(code):
+                raise RuntimeError(code.splitlines()[0])
             return code.strip()
         except Exception as e:
             logger.warning(f"⚠️ Fallback for {path} due to LLM error: {e}")
+            self.placeholder_files.add(path)
             return self._fallback_code(description, path)
 
     def _write_file(self, path: str, code: str):
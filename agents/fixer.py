@@ -2,34 +2,51 @@
 
 import os
 import logging
-from agents.agent_base import BaseAgent
-import openai
+from concurrent.futures import ThreadPoolExecutor
+from agents.agent_base import BaseAgent, estimate_tokens
+from tools.context_loader import ContextLoader
+from tools.fix_cache import FixCache, make_fix_key, error_signature
+from tools.symbol_index import traceback_names
+from tools.usage_ledger import bind_usage_context
+from tools.output_budget import output_budget_for, model_output_limit
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 
 class FixerAgent(BaseAgent):
     """
-    Attempts to automatically fix broken code using GPT-4o based on test output.
+    Attempts to automatically fix broken code based on test output.
+    Requests go through BaseAgent.call_llm using the configured FIX_MODEL.
     """
 
+    # Characters of the broken file shown in the fix prompt
+    CODE_PREVIEW_CHARS = 1000
+
     def __init__(self, config, memory):
         super().__init__(config, memory)
         self.role = "Fixer"
-        self.description = "Attempts to automatically fix broken code using GPT-4o"
-
-        if not config.GPT4_API_KEY:
-            raise ValueError("❌ GPT-4 API key is missing in the configuration.")
-
-        try:
-            self.client = openai.OpenAI(api_key=config.GPT4_API_KEY)
-        except Exception as e:
-            logging.error(f"❌ Failed to initialize OpenAI client: {e}")
-            raise
+        self.description = "Attempts to automatically fix broken code using an LLM"
+        self.model = getattr(config, "FIX_MODEL", "gpt-4o")
+        self.fix_cache = FixCache(config)
+        self.context = ContextLoader(config, memory)
+        # Estimated tokens spent per file and the cache key of the last fix
+        # applied, for the current fix loop (see ``reset``)
+        self.tokens_used = {}
+        self.applied_fixes = {}
 
     def generate_plan(self, user_prompt: str):
         return {}
 
+    def reset(self) -> None:
+        """
+        Clears per-run state before a new fix loop.
+
+        The agent is pooled and reused across runs, so token budgets and
+        applied fixes from an earlier project must not carry over.
+        """
+        self.tokens_used = {}
+        self.applied_fixes = {}
+
     def fix_code(self, file_paths: list, test_results: dict) -> dict:
         """
         Fixes code files that have test failures.
@@ -46,64 +63,152 @@ class FixerAgent(BaseAgent):
         if not isinstance(test_results, dict):
             raise ValueError("test_results must be a dictionary.")
 
-        logging.info(f"🔧 [{self.role}] Attempting automatic code fixes using GPT-4o...")
+        logging.info(f"🔧 [{self.role}] Attempting automatic code fixes using {self.model}...")
 
-        fixes = {}
-        fix_cache = {}
+        workers = getattr(self.config, "FIX_MAX_WORKERS", 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fix = bind_usage_context(lambda p: self._fix_single_file(p, test_results.get(p, "")))
+            fixes = dict(executor.map(fix, file_paths))
 
-        for path in file_paths:
-            full_path = os.path.join(self.config.PROJECTS_DIR, path)
+        stats = self.fix_cache.stats()
+        logging.info(
+            f"✅ Code fixing complete. Fix cache: {stats['hits']} hits, "
+            f"{stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)"
+        )
+        return fixes
 
-            if not os.path.isfile(full_path):
-                logging.error(f"❌ File not found: {path}")
-                fixes[path] = "❌ File missing"
-                continue
+    def _fix_single_file(self, path: str, test_output) -> tuple:
+        """
+        Fixes a single file and records the cache key and token usage.
 
-            if path in fix_cache:
-                logging.info(f"⚡ Using cached fix for {path}")
-                fixes[path] = fix_cache[path]
-                continue
+        Args:
+            path (str): Relative path of the file to fix.
+            test_output: The tester result for this file.
 
-            try:
-                with open(full_path, "r", encoding="utf-8") as f:
-                    original_code = f.read()
-            except Exception as e:
-                logging.error(f"❌ Failed to read file {path}: {e}")
-                fixes[path] = f"❌ File read error: {e}"
-                continue
+        Returns:
+            tuple: (path, fixed_code or error_message)
+        """
+        full_path = os.path.join(self.config.PROJECTS_DIR, path)
 
-            test_output = test_results.get(path, "")
-            prompt = self._build_fix_prompt(path, original_code, test_output)
+        if not os.path.isfile(full_path):
+            logging.error(f"❌ File not found: {path}")
+            return path, "❌ File missing"
 
-            try:
-                response = self.client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": "You are a senior developer who fixes broken code."},
-                        {"role": "user", "content": prompt}
-                    ]
+        try:
+            with open(full_path, "r", encoding="utf-8") as f:
+                original_code = f.read()
+        except Exception as e:
+            logging.error(f"❌ Failed to read file {path}: {e}")
+            return path, f"❌ File read error: {e}"
+
+        cache_key = make_fix_key(original_code, test_output)
+
+        try:
+            fixed_code = self.fix_cache.get(cache_key)
+            if fixed_code is not None:
+                logging.info(f"⚡ Using cached fix for {path}")
+            else:
+                # The whole file is rewritten, so the response must have room for all of it
+                limit = model_output_limit(self.model)
+                needed = estimate_tokens(original_code)
+                if needed > limit:
+                    logging.warning(f"⚠️ Not fixing {path}: ~{needed} tokens exceeds {self.model}'s {limit}-token output limit")
+                    return path, "❌ Skipped (file too large to rewrite in one response)"
+                prompt = self._build_fix_prompt(
+                    path, original_code, test_output,
+                    self._related_interfaces(path, original_code),
+                    self._traceback_definitions(path, original_code, test_output),
                 )
-                fixed_code = response.choices[0].message.content.strip()
-                fix_cache[path] = fixed_code
-                fixes[path] = fixed_code
-
-                try:
-                    with open(full_path, "w", encoding="utf-8") as f:
-                        f.write(fixed_code)
-                    self.memory.save(f"FixerAgent::patch::{path}", fixed_code)
-                    logging.info(f"✅ Fixed: {path}")
-                except Exception as e:
-                    logging.error(f"❌ Failed to write fix to {path}: {e}")
-                    fixes[path] = f"❌ Write error: {e}"
-
-            except Exception as e:
-                logging.error(f"❌ LLM error while fixing {path}: {e}")
-                fixes[path] = f"❌ Fixer error: {e}"
-
-        logging.info("✅ Code fixing complete.")
-        return fixes
+                fixed_code = self.call_llm(
+                    prompt,
+                    model=self.model,
+                    system="You are a senior developer who fixes broken code.",
+                    max_tokens=min(max(output_budget_for(path), needed * 3 // 2), limit),
+                    task="fix",
+                )
+                self.tokens_used[path] = (
+                    self.tokens_used.get(path, 0) + estimate_tokens(prompt) + estimate_tokens(fixed_code)
+                )
+                if self.is_llm_error(fixed_code):
+                    raise RuntimeError(fixed_code.splitlines()[0])
+                self.fix_cache.put(cache_key, fixed_code, error_signature(test_output))
+            self.applied_fixes[path] = cache_key
+        except Exception as e:
+            logging.error(f"❌ LLM error while fixing {path}: {e}")
+            return path, f"❌ Fixer error: {e}"
+
+        try:
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(fixed_code)
+            self.memory.save(f"FixerAgent::patch::{path}", fixed_code)
+            logging.info(f"✅ Fixed: {path}")
+        except Exception as e:
+            logging.error(f"❌ Failed to write fix to {path}: {e}")
+            return path, f"❌ Write error: {e}"
+
+        return path, fixed_code
+
+    def forget_fixes(self, file_paths: list) -> None:
+        """
+        Drops the cached fixes last applied to ``file_paths``.
+
+        Called when a retest shows the fix did not resolve the failure, so a
+        bad fix is not replayed in later runs.
+        """
+        for path in file_paths:
+            key = self.applied_fixes.pop(path, None)
+            if key:
+                self.fix_cache.discard(key)
+
+    def _related_interfaces(self, path: str, code: str) -> str:
+        """Interface summaries of the project files that ``path`` imports."""
+        try:
+            related = self.context.referenced_files(path, code)
+            budget = getattr(self.config, "INTERFACE_CONTEXT_TOKENS", 1200)
+            return self.context.build_interface_context(related, budget) if related else ""
+        except Exception as e:
+            logging.warning(f"⚠️ Could not summarize files related to {path}: {e}")
+            return ""
+
+    def _traceback_definitions(self, path: str, code: str, test_output) -> str:
+        """
+        Source of the project definitions a traceback points at.
 
-    def _build_fix_prompt(self, path: str, code: str, test_output: str) -> str:
+        The frames' locations and the names in the error message are looked
+        up in the project's symbol index. Definitions in the file being fixed
+        are skipped unless the prompt only shows a truncated copy of it.
+        """
+        text = test_output.get("message", "") if isinstance(test_output, dict) else str(test_output)
+        try:
+            index = self.context.symbol_index()
+            found = traceback_names(text, self.config.PROJECTS_DIR)
+            symbols = [index.symbol_at(p, line) for p, line in found["locations"]]
+            for name in found["names"]:
+                symbols.extend(index.definitions(name))
+        except Exception as e:
+            logging.warning(f"⚠️ Symbol lookup failed for {path}: {e}")
+            return ""
+
+        skip_own = len(code) <= self.CODE_PREVIEW_CHARS
+        budget = getattr(self.config, "INTERFACE_CONTEXT_TOKENS", 1200)
+        sections, used, seen = [], 0, set()
+        for symbol in symbols:
+            if not symbol or (skip_own and symbol["path"] == os.path.normpath(path)):
+                continue
+            key = (symbol["path"], symbol["line"])
+            if key in seen:
+                continue
+            seen.add(key)
+            source = self.context.read_lines(symbol["path"], symbol["line"], symbol["end_line"]) or ""
+            section = f"# {symbol['path']}:{symbol['line']} ({symbol['kind']} {symbol['qualname']})\n{source}"
+            tokens = estimate_tokens(section)
+            if used + tokens <= budget:
+                sections.append(section)
+                used += tokens
+        return "\n\n".join(sections)
+
+    def _build_fix_prompt(self, path: str, code: str, test_output: str, interfaces: str = "",
+                          definitions: str = "") -> str:
         """
         Builds a prompt for the LLM to fix the given code file.
 
@@ -111,12 +216,17 @@ class FixerAgent(BaseAgent):
             path (str): Path of the file being fixed.
             code (str): Current code in the file.
             test_output (str): The result from failed tests.
+            interfaces (str): Interface summaries of the project files it imports.
+            definitions (str): Source of the definitions the traceback points at.
 
         Returns:
             str: LLM prompt.
         """
-        max_len = 1000
+        max_len = self.CODE_PREVIEW_CHARS
         truncated_code = code if len(code) <= max_len else code[:max_len] + "\n# [Code truncated...]"
+        related = f"\n--- Interfaces of Imported Project Files ---\n{interfaces}\n" if interfaces else ""
+        if definitions:
+            related += f"\n--- Definitions Referenced in the Traceback ---\n{definitions}\n"
 
         return f"""
 The following file contains broken code based on its test results.
@@ -127,7 +237,7 @@ Filename: {path}
 ```python
 {truncated_code}
 ```
-
+{related}
 --- Test Output ---
 {test_output}
 
@@ -1,7 +1,7 @@
-import json
 import logging
 import requests
 from agents.agent_base import BaseAgent
+from tools.output_schemas import PRODUCT_SCHEMA
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -23,11 +23,13 @@ class ProductCreatorAgent(BaseAgent):
             f"{user_prompt}"
         )
         try:
-            text = self.call_llm(prompt, model=self.config.CODE_MODEL)
-            spec = json.loads(text)
+            spec = self.call_llm_json(prompt, PRODUCT_SCHEMA, strict=False, model=self.config.CODE_MODEL)
         except Exception:
             logger.warning("Fallback to basic spec due to LLM failure")
-            spec = {"title": user_prompt, "description": user_prompt, "tags": []}
+            spec = {}
+        spec.setdefault("title", user_prompt)
+        spec.setdefault("description", user_prompt)
+        spec.setdefault("tags", [])
         self.memory.save("product_spec", spec)
         return spec
 
@@ -0,0 +1,80 @@
+# registry.py
+
+import logging
+import importlib
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+class AgentRegistry(Mapping):
+    """
+    Lazily imported and constructed agents, keyed by role name.
+
+    Agents are registered as ``(module, class name)`` and only imported and
+    instantiated the first time they are looked up, so a pipeline that never
+    touches an agent never pays for its imports or constructor. Optional
+    agents that fail to construct behave as if they were not registered;
+    required ones raise.
+    """
+
+    def __init__(self, config, memory, specs: Optional[Dict[str, Tuple[str, str]]] = None,
+                 optional: Iterable[str] = ()):
+        self.config = config
+        self.memory = memory
+        self.specs: Dict[str, Tuple[str, str]] = dict(specs or {})
+        self.optional = set(optional)
+        self.instances = {}
+        self.failed = set()
+        self.lock = threading.RLock()
+
+    def register(self, name: str, module: str, class_name: str, optional: bool = True) -> None:
+        """Register an agent to be constructed on first use."""
+        with self.lock:
+            self.specs[name] = (module, class_name)
+            self.instances.pop(name, None)
+            self.failed.discard(name)
+            if optional:
+                self.optional.add(name)
+
+    def __setitem__(self, name: str, agent) -> None:
+        """Register an already constructed agent."""
+        with self.lock:
+            self.instances[name] = agent
+            self.specs.setdefault(name, (type(agent).__module__, type(agent).__name__))
+
+    def __getitem__(self, name: str):
+        with self.lock:
+            if name in self.instances:
+                return self.instances[name]
+            if name not in self.specs or name in self.failed:
+                raise KeyError(name)
+
+            module_name, class_name = self.specs[name]
+            try:
+                agent_class = getattr(importlib.import_module(module_name), class_name)
+                agent = agent_class(self.config, self.memory)
+            except Exception as e:
+                logger.error(f"❌ Failed to initialize {name} agent: {e}")
+                if name not in self.optional:
+                    raise
+                self.failed.add(name)
+                raise KeyError(name) from e
+
+            self.instances[name] = agent
+            logger.info(f"✅ Initialized {name} agent")
+            return agent
+
+    def __iter__(self):
+        return iter(list(self.specs))
+
+    def __len__(self) -> int:
+        return len(self.specs)
+
+    def loaded(self) -> list:
+        """Names of the agents constructed so far."""
+        with self.lock:
+            return list(self.instances)
@@ -4,22 +4,61 @@ import os
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from agents.agent_base import BaseAgent
-import openai
+from tools.review_cache import ReviewCache, make_review_key
+from tools.review_packer import pack_files, build_review_prompt, split_review
+from tools.usage_ledger import bind_usage_context
+from tools.output_budget import output_budget_for, model_output_limit
 import traceback
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Bump when the review prompts change so cached reviews are invalidated.
+REVIEW_PROMPT_VERSION = "3"
+
+REVIEW_SYSTEM_PROMPT = (
+    "You are a meticulous software reviewer. Point out issues, suggest improvements, "
+    "and offer best practices."
+)
+
+# Files that are not worth an LLM review at all.
+SKIP_REVIEW_NAMES = {".gitignore", ".dockerignore", ".env.example", "license", "readme.md"}
+SKIP_REVIEW_EXTS = {".md", ".txt", ".lock", ".log", ".png", ".jpg", ".svg", ".ico"}
+
+# Files reviewed even though their type would otherwise be skipped.
+ALWAYS_REVIEW_NAMES = {"requirements.txt"}
+
+
+def review_policy(path: str) -> str:
+    """
+    Decide whether a file is reviewed based on its name and type.
+
+    Returns:
+        str: "skip" or "review".
+    """
+    name = os.path.basename(path).lower()
+    ext = os.path.splitext(name)[1]
+    if name in ALWAYS_REVIEW_NAMES:
+        return "review"
+    if name in SKIP_REVIEW_NAMES or ext in SKIP_REVIEW_EXTS:
+        return "skip"
+    return "review"
+
+
 class ReviewerAgent(BaseAgent):
     """
-    A QA Reviewer Agent that uses GPT-4o to review code files for potential improvements or issues.
+    A QA Reviewer Agent that uses an LLM (GPT-4o by default) to review code files
+    for potential improvements or issues. Requests go through BaseAgent.call_llm
+    using the configured REVIEW_MODEL. Reviews are cached by content hash, so
+    unchanged files cost nothing on re-runs.
     """
 
     def __init__(self, config, memory):
         super().__init__(config, memory)
         self.role = "QA Reviewer"
-        self.description = "Performs GPT-4-based code review"
-        self.client = openai.OpenAI(api_key=config.GPT4_API_KEY)
+        self.description = "Performs LLM-based code review"
+        self.model = getattr(config, "REVIEW_MODEL", "gpt-4o")
+        self.review_cache = ReviewCache(config)
 
     def generate_plan(self, user_prompt: str):
         """Dummy method to satisfy abstract class."""
@@ -27,7 +66,12 @@ class ReviewerAgent(BaseAgent):
 
     def review_code(self, file_paths: list) -> dict:
         """
-        Review a list of source code files in parallel and return GPT-4o feedback.
+        Review a list of source code files in parallel and return LLM feedback.
+
+        Trivial files are skipped and files with a cached review are not
+        sent to the model again. The rest are packed into as few requests as
+        the REVIEW_TOKEN_BUDGET allows: small files share a request and large
+        files are split along function/class boundaries.
 
         Args:
             file_paths (list): List of file paths to review.
@@ -35,72 +79,132 @@ class ReviewerAgent(BaseAgent):
         Returns:
             dict: Dictionary of reviews keyed by file path.
         """
-        logger.info(f"🔍 [{self.role}] Reviewing files with GPT-4o...")
-
+        logger.info(f"🔍 [{self.role}] Reviewing files with {self.model}...")
+
+        results = {}
+        pending = {}
+
+        for path in file_paths:
+            policy = review_policy(path)
+            if policy == "skip":
+                results[path] = "⏭️ Skipped (trivial file type)"
+                continue
+
+            code, error = self._read_file(path)
+            if error:
+                results[path] = error
+                continue
+
+            cached = self.review_cache.get(self._cache_key(code))
+            if cached is not None:
+                logger.info(f"⚡ Using cached review for {path}")
+                results[path] = cached
+                continue
+
+            pending[path] = code
+
+        budget = getattr(self.config, "REVIEW_TOKEN_BUDGET", 6000)
+        # Keep each request's reviews within one response of the model
+        max_chunks = max(1, model_output_limit(self.model) // output_budget_for(task="review"))
+        requests = pack_files(pending, budget, max_chunks) if pending else []
+        chunk_reviews = {}
         with ThreadPoolExecutor() as executor:
-            results = dict(executor.map(self._review_single_file, file_paths))
+            for reviews in executor.map(bind_usage_context(self._review_packed), requests):
+                chunk_reviews.update(reviews)
 
-        logger.info("✅ Code review complete.")
-        return results
+        for path, code in pending.items():
+            results[path] = self._merge_chunk_reviews(path, chunk_reviews)
+            self._store_review(path, code, results[path])
 
-    def _review_single_file(self, path: str) -> tuple:
-        """
-        Handles a single file review.
+        stats = self.review_cache.stats()
+        logger.info(
+            f"✅ Code review complete. {len(pending)} file(s) reviewed in {len(requests)} request(s), "
+            f"{stats['hits']} cached."
+        )
+        return {path: results[path] for path in file_paths if path in results}
 
-        Args:
-            path (str): The relative file path.
+    def _cache_key(self, code: str) -> str:
+        return make_review_key(code, self.model, REVIEW_PROMPT_VERSION)
+
+    def _read_file(self, path: str) -> tuple:
+        """
+        Reads a file for review.
 
         Returns:
-            tuple: (path, review_text)
+            tuple: (code, error_message); exactly one of them is None.
         """
         full_path = os.path.join(self.config.PROJECTS_DIR, path)
 
         if not os.path.isfile(full_path):
-            return path, "❌ Skipped (not a valid file)"
+            return None, "❌ Skipped (not a valid file)"
 
         try:
             with open(full_path, "r", encoding="utf-8") as f:
                 code = f.read()
-
-            if not code.strip():
-                return path, "❌ Skipped (empty file)"
-
-            review = self._review_with_gpt4(path, code)
-            self.memory.save(f"ReviewerAgent::review::{path}", review)
-            return path, review
-
         except Exception as e:
             error_details = traceback.format_exc()
-            logger.error(f"❌ File read/review failed for {path}: {e}\n{error_details}")
-            return path, f"❌ File read error: {e}"
+            logger.error(f"❌ File read failed for {path}: {e}\n{error_details}")
+            return None, f"❌ File read error: {e}"
+
+        if not code.strip():
+            return None, "❌ Skipped (empty file)"
+        return code, None
 
-    def _review_with_gpt4(self, file_path: str, code: str) -> str:
+    def _review_packed(self, chunks: list) -> dict:
         """
-        Calls GPT-4o to perform a code review.
+        Reviews one packed request and maps the answer back to its chunks.
+
+        Chunks the answer has no section for are re-requested on their own.
 
         Args:
-            file_path (str): Name of the file for context.
-            code (str): The full code content.
+            chunks (list): Chunks produced by ``pack_files``.
 
         Returns:
-            str: GPT-4o’s feedback or an error message.
+            dict: Mapping of ``(path, start, end)`` to review text.
         """
+        label = ", ".join(sorted({c["path"] for c in chunks}))
+        max_tokens = min(output_budget_for(task="review") * len(chunks), model_output_limit(self.model))
+        review = self._call_review_llm(label, build_review_prompt(chunks), max_tokens)
+        if review.startswith("❌"):
+            return {(c["path"], c["start"], c["end"]): review for c in chunks}
+        reviews = split_review(review, chunks)
+        unmatched = [c for c in chunks if (c["path"], c["start"], c["end"]) not in reviews]
+        if unmatched:
+            logger.warning(f"⚠️ Review of {label} had no section for {len(unmatched)} chunk(s); re-requesting them")
+            for chunk in unmatched:
+                reviews.update(self._review_packed([chunk]))
+        return reviews
+
+    def _merge_chunk_reviews(self, path: str, chunk_reviews: dict) -> str:
+        """Joins the reviews of a file's chunks, labelled by line range when split."""
+        parts = sorted((start, end, text) for (p, start, end), text in chunk_reviews.items() if p == path)
+        if len(parts) == 1:
+            return parts[0][2]
+        errors = [text for _, _, text in parts if text.startswith("❌")]
+        if errors:
+            return errors[0]
+        return "\n\n".join(f"Lines {start}-{end}:\n{text}" for start, end, text in parts)
+
+    def _store_review(self, path: str, code: str, review: str) -> None:
+        """Saves a successful review to memory and the review cache."""
+        if review.startswith("❌"):
+            return
+        self.memory.save(f"ReviewerAgent::review::{path}", review)
+        self.review_cache.put(self._cache_key(code), review, path)
+
+    def _call_review_llm(self, label: str, prompt: str, max_tokens: int = None) -> str:
+        """Sends a review prompt to the model, mapping failures to an error message."""
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a meticulous software reviewer. Point out issues, suggest improvements, and offer best practices."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Please review the following code from {file_path}:\n\n```{code}```"
-                    }
-                ]
+            review = self.call_llm(
+                prompt, model=self.model, system=REVIEW_SYSTEM_PROMPT, max_tokens=max_tokens, task="review"
             )
-            return response.choices[0].message.content.strip()
-        except openai.error.OpenAIError as e:
+        except Exception as e:
             error_details = traceback.format_exc()
-            logger.error(f"GPT-4o API Error for {file_path}: {e}\n{error_details}")
-            return "❌ GPT-4o Review Error: Retry later."
+            logger.error(f"Review LLM error for {label}: {e}\n{error_details}")
+            return "❌ Review Error: Retry later."
+
+        if self.is_llm_error(review):
+            logger.error(f"Review LLM error for {label}: {review.splitlines()[0]}")
+            return "❌ Review Error: Retry later."
+        return review
+
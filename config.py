@@ -31,6 +31,8 @@ class Config:
     # Paths
     PROJECTS_DIR = os.getenv("PROJECTS_DIR", "./projects")
     LOGS_DIR = os.getenv("LOGS_DIR", "./logs")
+    # Indexes built from generated projects (e.g. symbol indexes), kept out of the projects
+    CACHE_DIR = os.getenv("CACHE_DIR", "./cache")
 
     # Containerization
     CONTAINER_TOOL = os.getenv("CONTAINER_TOOL", "docker")
@@ -41,6 +43,138 @@ class Config:
     # Flags
     USE_GPT4_FOR_QA = True
 
+    # Per-provider LLM limits shared by every agent in the process:
+    # requests/min and tokens/min (0 = unlimited) and concurrent requests.
+    LLM_RATE_LIMITS = {
+        "openai": {
+            "rpm": int(os.getenv("OPENAI_RPM", 500)),
+            "tpm": int(os.getenv("OPENAI_TPM", 150000)),
+            "concurrency": int(os.getenv("OPENAI_CONCURRENCY", 8)),
+        },
+        "anthropic": {
+            "rpm": int(os.getenv("ANTHROPIC_RPM", 50)),
+            "tpm": int(os.getenv("ANTHROPIC_TPM", 40000)),
+            "concurrency": int(os.getenv("ANTHROPIC_CONCURRENCY", 4)),
+        },
+        "ollama": {
+            "rpm": int(os.getenv("OLLAMA_RPM", 0)),
+            "tpm": int(os.getenv("OLLAMA_TPM", 0)),
+            "concurrency": int(os.getenv("OLLAMA_CONCURRENCY", 2)),
+        },
+    }
+
+    # Per-provider circuit breakers: open once `error_threshold` of the last
+    # `window` calls failed (calls that overrun their adaptive request timeout
+    # count as failures; `slow_call_seconds` is the limit when a call has no
+    # timeout) and probe for recovery every `open_seconds`. Requests for a
+    # model the provider does not have are not counted.
+    CIRCUIT_BREAKER = {
+        "window": int(os.getenv("BREAKER_WINDOW", 20)),
+        "min_calls": int(os.getenv("BREAKER_MIN_CALLS", 4)),
+        "error_threshold": float(os.getenv("BREAKER_ERROR_THRESHOLD", 0.5)),
+        "slow_call_seconds": float(os.getenv("BREAKER_SLOW_CALL_SECONDS", 90)),
+        "open_seconds": float(os.getenv("BREAKER_OPEN_SECONDS", 30)),
+    }
+
+    # Hedged requests (opt-in): if the primary model is slower than its
+    # observed `quantile` latency, send a duplicate to the next-best model.
+    # Prompts over `max_prompt_tokens` are never hedged, and hedging pauses
+    # once `max_fraction` of calls have been hedged or the tokens spent on
+    # losing requests reach `max_fraction` of the tokens used. Hedging can
+    # double the spend on a slow call: a losing request already sent cannot
+    # be stopped, holds its provider's concurrency slot and is still billed.
+    HEDGING = {
+        "enabled": os.getenv("HEDGE_ENABLED", "false").lower() == "true",
+        "quantile": float(os.getenv("HEDGE_QUANTILE", 0.9)),
+        "min_samples": int(os.getenv("HEDGE_MIN_SAMPLES", 5)),
+        "max_fraction": float(os.getenv("HEDGE_MAX_FRACTION", 0.1)),
+        "max_prompt_tokens": int(os.getenv("HEDGE_MAX_PROMPT_TOKENS", 4000)),
+    }
+
+    # Ollama models used by a run are loaded in parallel when it starts and
+    # kept loaded for OLLAMA_KEEP_ALIVE; afterwards they fall back to
+    # OLLAMA_IDLE_KEEP_ALIVE. OLLAMA_NUM_CTX is sent with every request so the
+    # loaded model (and its prompt cache) is never reloaded between calls.
+    OLLAMA_PRELOAD = os.getenv("OLLAMA_PRELOAD", "true").lower() == "true"
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+    OLLAMA_IDLE_KEEP_ALIVE = os.getenv("OLLAMA_IDLE_KEEP_ALIVE", "5m")
+    OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", 8192))
+    # Send JSON schemas as Ollama's `format` (Ollama 0.5+); set false for
+    # older servers, which then get plain JSON mode
+    OLLAMA_JSON_SCHEMA = os.getenv("OLLAMA_JSON_SCHEMA", "true").lower() == "true"
+
+    # Record tokens, latency and estimated cost of every LLM call in SQLite
+    # (see `python interfaces/cli_interface.py usage`). LLM_PRICES overrides
+    # the built-in USD prices per million tokens, e.g. {"gpt-4o": (2.5, 10.0)}.
+    # Only the newest USAGE_LEDGER_MAX_ROWS calls are kept.
+    USAGE_LEDGER_ENABLED = os.getenv("USAGE_LEDGER_ENABLED", "true").lower() == "true"
+    USAGE_LEDGER_MAX_ROWS = int(os.getenv("USAGE_LEDGER_MAX_ROWS", 100000))
+    LLM_PRICES = {}
+
+    # Base LLM request timeout (seconds) for a DEFAULT_MAX_TOKENS completion
+    REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", 60))
+
+    # Request timeouts derived from observed latency per model and task type:
+    # the `quantile` latency, scaled by the requested output budget, times
+    # `multiplier`, clamped to [min_seconds, max_seconds]. REQUEST_TIMEOUT is
+    # used until `min_samples` calls have been seen.
+    ADAPTIVE_TIMEOUT = {
+        "enabled": os.getenv("ADAPTIVE_TIMEOUT", "true").lower() == "true",
+        "quantile": float(os.getenv("ADAPTIVE_TIMEOUT_QUANTILE", 0.95)),
+        "multiplier": float(os.getenv("ADAPTIVE_TIMEOUT_MULTIPLIER", 2.0)),
+        "min_seconds": float(os.getenv("ADAPTIVE_TIMEOUT_MIN_SECONDS", 10)),
+        "max_seconds": float(os.getenv("ADAPTIVE_TIMEOUT_MAX_SECONDS", 600)),
+        "min_samples": int(os.getenv("ADAPTIVE_TIMEOUT_MIN_SAMPLES", 5)),
+    }
+
+    # Projects the shared orchestrator may run at the same time
+    MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", 4))
+    # Seconds discovered models are reused before providers are queried again
+    MODEL_DISCOVERY_TTL = float(os.getenv("MODEL_DISCOVERY_TTL", 300))
+
+    # Share one in-flight LLM call between concurrent identical requests
+    LLM_SINGLE_FLIGHT = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() == "true"
+
+    # Models used by the fixer and reviewer stages. Point these at an Ollama
+    # model (e.g. `qwen:7b`) to run fix/review locally.
+    FIX_MODEL = os.getenv("FIX_MODEL", "gpt-4o")
+    REVIEW_MODEL = os.getenv("REVIEW_MODEL", "gpt-4o")
+
+    # Maximum number of known fixes kept in the persistent fix cache
+    FIX_CACHE_MAX_ENTRIES = int(os.getenv("FIX_CACHE_MAX_ENTRIES", 500))
+
+    # Iterative fix/retest loop: per-file attempt and (estimated) token budgets
+    FIX_MAX_ATTEMPTS = int(os.getenv("FIX_MAX_ATTEMPTS", 3))
+    FIX_TOKEN_BUDGET = int(os.getenv("FIX_TOKEN_BUDGET", 16000))
+    FIX_MAX_WORKERS = int(os.getenv("FIX_MAX_WORKERS", 4))
+
+    # Code generation runs the plan's files in dependency waves; files within
+    # a wave are generated concurrently by up to this many workers
+    CODE_MAX_WORKERS = int(os.getenv("CODE_MAX_WORKERS", 4))
+
+    # Token budget for the interface summaries of related project files that
+    # are added to code generation and fix prompts
+    INTERFACE_CONTEXT_TOKENS = int(os.getenv("INTERFACE_CONTEXT_TOKENS", 1200))
+
+    # Threads used to read project files when assembling prompt context
+    CONTEXT_LOAD_WORKERS = int(os.getenv("CONTEXT_LOAD_WORKERS", 8))
+
+    # Reuse architecture plans of near-duplicate prompts instead of planning
+    # from scratch: reuse as-is above reuse_threshold (Jaccard similarity of
+    # prompt terms), adapt with a revision call above adapt_threshold
+    PLAN_STORE = {
+        "enabled": os.getenv("PLAN_STORE_ENABLED", "true").lower() == "true",
+        "reuse_threshold": float(os.getenv("PLAN_REUSE_THRESHOLD", 0.85)),
+        "adapt_threshold": float(os.getenv("PLAN_ADAPT_THRESHOLD", 0.6)),
+        "use_templates": os.getenv("PLAN_TEMPLATES_ENABLED", "true").lower() == "true",
+    }
+    PLAN_STORE_MAX_ENTRIES = int(os.getenv("PLAN_STORE_MAX_ENTRIES", 200))
+
+    # Maximum number of cached reviews (keyed on file content hash)
+    REVIEW_CACHE_MAX_ENTRIES = int(os.getenv("REVIEW_CACHE_MAX_ENTRIES", 2000))
+    # Estimated tokens of code packed into a single review request
+    REVIEW_TOKEN_BUDGET = int(os.getenv("REVIEW_TOKEN_BUDGET", 6000))
+
     # GitHub integration
     GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
     GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
@@ -9,7 +9,6 @@ import shutil
 # Ensure the project root is on the path when running directly
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from main import run_agency
 from config import Config
 
 # Logging setup
@@ -20,6 +19,24 @@ logging.basicConfig(
 )
 
 
+def run_agency(prompt, projects_dir=None):
+    """Run the pipeline; ``main`` is imported on first use to keep CLI startup fast."""
+    from main import run_agency as _run_agency
+    return _run_agency(prompt, projects_dir)
+
+
+def continue_agency(project, prompt):
+    """Apply ``prompt`` to an existing project, regenerating only the files it affects."""
+    from main import continue_agency as _continue_agency
+    return _continue_agency(project, prompt)
+
+
+def resume_agency(project):
+    """Resume an interrupted run of ``project``, skipping work it already completed."""
+    from main import resume_agency as _resume_agency
+    return _resume_agency(project)
+
+
 def launch_cli(input_func=input, output_func=print):
     """Interactive menu for running and resuming projects."""
     output_func("🕶️  Welcome to The Agency Terminal Interface")
@@ -59,13 +76,13 @@ def launch_cli(input_func=input, output_func=print):
                     output_func("Invalid selection.")
                     continue
                 project = projects[int(sel) - 1]
-                Config.PROJECTS_DIR = os.path.join(Config.PROJECTS_DIR, project)
+                project_dir = os.path.join(Config.PROJECTS_DIR, project)
                 prompt = input_func("📝 What would you like to do next?\n> ").strip()
                 if not prompt:
                     output_func("⚠️  Please enter a valid request.")
                     continue
                 logging.info(f"Continuing {project} with prompt: {prompt}")
-                run_agency(prompt)
+                continue_agency(project_dir, prompt)
                 continue
 
             output_func("Invalid option. Try again.")
@@ -83,6 +100,22 @@ def launch_cli(input_func=input, output_func=print):
             logging.exception("Unexpected exception in CLI loop.")
 
 
+def print_usage(by="stage", project=None, output_func=print):
+    """Print LLM usage from the ledger grouped by ``by``."""
+    from tools.usage_ledger import UsageLedger
+    rows = UsageLedger.get(Config).summary(by=by, project=project)
+    if not rows:
+        output_func("No LLM usage recorded yet.")
+        return
+    output_func(f"{by:<30} {'calls':>6} {'prompt':>9} {'output':>9} {'avg s':>7} {'tok/s':>7} {'cost $':>9}")
+    for row in rows:
+        output_func(
+            f"{str(row[by] or '-')[:30]:<30} {row['calls']:>6} {row['prompt_tokens']:>9} "
+            f"{row['completion_tokens']:>9} {row['avg_latency']:>7.2f} {row['avg_tokens_per_sec']:>7.1f} "
+            f"{row['cost']:>9.4f}"
+        )
+
+
 def main():
     parser = argparse.ArgumentParser(description="The Agency CLI")
     sub = parser.add_subparsers(dest="command")
@@ -90,6 +123,13 @@ def main():
     gen = sub.add_parser("generate", help="Generate a new project")
     gen.add_argument("prompt", nargs="+", help="Project prompt")
 
+    cont = sub.add_parser("continue", help="Apply a change to an existing project")
+    cont.add_argument("project", help="Project name or directory")
+    cont.add_argument("prompt", nargs="+", help="What to change or add")
+
+    res = sub.add_parser("resume", help="Resume an interrupted project run")
+    res.add_argument("project", help="Project name or directory")
+
     sub.add_parser("list-projects", help="List existing projects")
 
     delp = sub.add_parser("delete-project", help="Delete a project")
@@ -98,10 +138,18 @@ def main():
     ref = sub.add_parser("refactor", help="Suggest refactors for code")
     ref.add_argument("path")
 
+    use = sub.add_parser("usage", help="Show LLM token, latency and cost usage")
+    use.add_argument("--by", default="stage", choices=["project", "stage", "agent", "provider", "model"])
+    use.add_argument("--project", help="Only include this project")
+
     args = parser.parse_args()
 
     if args.command == "generate":
         run_agency(" ".join(args.prompt))
+    elif args.command == "continue":
+        continue_agency(args.project, " ".join(args.prompt))
+    elif args.command == "resume":
+        resume_agency(args.project)
     elif args.command == "list-projects":
         projects = os.listdir(Config.PROJECTS_DIR)
         for p in projects:
@@ -113,6 +161,8 @@ def main():
     elif args.command == "refactor":
         from tools.refactor import suggest_refactors
         print(suggest_refactors(args.path))
+    elif args.command == "usage":
+        print_usage(by=args.by, project=args.project)
     else:
         launch_cli()
 
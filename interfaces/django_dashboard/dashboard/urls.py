@@ -5,4 +5,5 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('run/', views.run_prompt, name='run_prompt'),
     path('nodes/', views.node_editor, name='node_editor'),
+    path('usage/', views.usage, name='usage'),
 ]
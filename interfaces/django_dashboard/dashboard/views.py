@@ -1,5 +1,5 @@
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 import threading
 import time
 import os
@@ -7,6 +7,8 @@ import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 from main import run_agency
+from config import Config
+from tools.usage_ledger import UsageLedger
 
 LOG_FILE = os.path.join("logs", "agency.log")
 WATCH_DIR = "tasks"
@@ -27,6 +29,15 @@ def run_prompt(request):
     return HttpResponse("Started", status=202)
 
 
+def usage(request):
+    by = request.GET.get("by", "stage")
+    try:
+        rows = UsageLedger.get(Config).summary(by=by, project=request.GET.get("project"))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(rows, safe=False)
+
+
 def _tail_log(path, lines=20):
     if not os.path.isfile(path):
         return ""
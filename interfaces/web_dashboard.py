@@ -1,4 +1,4 @@
-from flask import Flask, request, render_template_string
+from flask import Flask, request, render_template_string, jsonify
 import threading
 import time
 import os
@@ -8,6 +8,8 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from main import run_agency
+from config import Config
+from tools.usage_ledger import UsageLedger
 
 TEMPLATE = """
 <!doctype html>
@@ -33,6 +35,7 @@ document.addEventListener('drop', e=>{
   fetch('/upload',{method:'POST',body:form});
 });
 </script>
+<p><a href="/usage">LLM usage</a></p>
 <h2>Logs</h2>
 <pre>{{logs}}</pre>
 """
@@ -59,6 +62,16 @@ def run():
     return "Started", 202
 
 
+@app.route("/usage", methods=["GET"])
+def usage():
+    by = request.args.get("by", "stage")
+    try:
+        rows = UsageLedger.get(Config).summary(by=by, project=request.args.get("project"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(rows)
+
+
 @app.route("/upload", methods=["POST"])
 def upload():
     file = request.files.get("file")
@@ -4,26 +4,22 @@ import logging
 import signal
 import sys
 import os
-import importlib
 import pkgutil
 import re
 import time
-import requests
 import json
-from typing import Dict, Optional, List
+import hashlib
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List, Tuple
 from config import Config
 from agents.memory import MemoryManager
-from agents.architect import ArchitectAgent
-from agents.coder import CoderAgent
-from agents.tester import TesterAgent
-from agents.reviewer import ReviewerAgent
-from agents.fixer import FixerAgent
-from agents.deployer import DeployerAgent
-from agents.failsafe import FailsafeAgent
-from agents.evolution_logger import EvolutionLogger
-from agents.self_learner import SelfLearningAgent
-from agents.product_creator import ProductCreatorAgent
-from agents.rl_optimizer import RLOptimizer
+from agents.registry import AgentRegistry
+from agents.agent_base import provider_for_model
+from tools.usage_ledger import UsageLedger, usage_context, set_usage_context, reset_usage_context
+from tools.run_manifest import RunManifest
+from tools.plan_diff import diff_plans, file_dependents
 
 # Configure logging
 logging.basicConfig(
@@ -47,16 +43,83 @@ def handle_interrupt(sig, frame):
 
 signal.signal(signal.SIGINT, handle_interrupt)
 
+# Core agents as (module, class); imported and constructed on first use.
+AGENT_SPECS = {
+    "architect": ("agents.architect", "ArchitectAgent"),
+    "coder": ("agents.coder", "CoderAgent"),
+    "tester": ("agents.tester", "TesterAgent"),
+    "reviewer": ("agents.reviewer", "ReviewerAgent"),
+    "fixer": ("agents.fixer", "FixerAgent"),
+    "deployer": ("agents.deployer", "DeployerAgent"),
+    "failsafe": ("agents.failsafe", "FailsafeAgent"),
+    "evolution": ("agents.evolution_logger", "EvolutionLogger"),
+    "learner": ("agents.self_learner", "SelfLearningAgent"),
+    "product": ("agents.product_creator", "ProductCreatorAgent"),
+    "optimizer": ("agents.rl_optimizer", "RLOptimizer"),
+}
+
+# Agents the pipeline can run without
+OPTIONAL_AGENTS = {"reviewer", "fixer", "learner", "product", "optimizer"}
+
+
+class RunConfig:
+    """
+    Per-run view of the shared Config.
+
+    Settings assigned on the view (such as the run's PROJECTS_DIR) shadow the
+    shared ones and everything else is read from the base config, so
+    concurrent runs never see each other's project directory.
+    """
+
+    def __init__(self, base, **overrides):
+        self.__dict__["_base"] = base
+        self.__dict__.update(overrides)
+
+    def __getattr__(self, name):
+        return getattr(self._base, name)
+
 
 class AgencyOrchestrator:
-    """Main orchestrator that manages the entire Agency workflow."""
+    """
+    Main orchestrator that manages the entire Agency workflow.
+
+    One instance is meant to live for the whole process (see
+    ``get_orchestrator``) and can run several projects concurrently: setup
+    happens once, and each run checks out its own warm set of agents bound
+    to a per-run config, returning it to the pool when done.
+    """
     
     def __init__(self):
-        self.config = Config
-        self.memory = MemoryManager(self.config)
+        self._config = Config
+        self.memory = MemoryManager(self._config)
         self.setup_complete = False
-        self.agents = {}
+        self._agents = {}
         self.model_manager = None
+        self.extensions: List[str] = []
+        self._setup_lock = threading.Lock()
+        self._run_state = threading.local()
+        self._workspaces = queue.LifoQueue()
+        self._run_slots = threading.BoundedSemaphore(getattr(Config, "MAX_CONCURRENT_RUNS", 4))
+
+    @property
+    def config(self):
+        """The current run's config inside ``run_project``, otherwise the shared Config."""
+        run_config = getattr(self._run_state, "config", None)
+        return self._config if run_config is None else run_config
+
+    @config.setter
+    def config(self, value):
+        self._config = value
+
+    @property
+    def agents(self):
+        """The current run's agents inside ``run_project``, otherwise the shared registry."""
+        run_agents = getattr(self._run_state, "agents", None)
+        return self._agents if run_agents is None else run_agents
+
+    @agents.setter
+    def agents(self, value):
+        self._agents = value
         
     def setup(self) -> bool:
         """Initialize all components and verify setup."""
@@ -66,14 +129,17 @@ class AgencyOrchestrator:
         if not self._check_connections():
             return False
         
-        # Initialize model manager
+        # Initialize model manager (discovery is cached process-wide)
         try:
             from tools.model_manager import ModelManager
-            self.model_manager = ModelManager(self.config)
+            self.model_manager = ModelManager.shared(self.config)
             logger.info(f"📊 Available models: {self.model_manager.get_model_info()}")
         except Exception as e:
             logger.warning(f"Model manager initialization failed: {e}")
         
+        # Load extensions
+        self._load_extensions()
+        
         # Initialize agents
         try:
             self._initialize_agents()
@@ -81,9 +147,6 @@ class AgencyOrchestrator:
             logger.error(f"Failed to initialize agents: {e}")
             return False
         
-        # Load extensions
-        self._load_extensions()
-        
         self.setup_complete = True
         logger.info("✅ The Agency is ready!")
         return True
@@ -109,6 +172,7 @@ class AgencyOrchestrator:
     
     def _check_ollama(self) -> bool:
         """Check if Ollama is running and has models."""
+        import requests
         try:
             url = self.config.OLLAMA_API_URL.rstrip("/")
             if "/api/" not in url:
@@ -163,32 +227,29 @@ class AgencyOrchestrator:
             return False
     
     def _initialize_agents(self):
-        """Initialize all core agents."""
+        """Register the core agents; each is imported and constructed on first use."""
         logger.info("🤖 Initializing agents...")
-        
-        agent_classes = {
-            "architect": ArchitectAgent,
-            "coder": CoderAgent,
-            "tester": TesterAgent,
-            "reviewer": ReviewerAgent,
-            "fixer": FixerAgent,
-            "deployer": DeployerAgent,
-            "failsafe": FailsafeAgent,
-            "evolution": EvolutionLogger,
-            "learner": SelfLearningAgent,
-            "product": ProductCreatorAgent,
-            "optimizer": RLOptimizer
-        }
-        
-        for name, agent_class in agent_classes.items():
-            try:
-                self.agents[name] = agent_class(self.config, self.memory)
-                logger.info(f"✅ Initialized {name} agent")
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize {name} agent: {e}")
-                # Only reviewer and fixer are truly optional
-                if name not in ["reviewer", "fixer", "learner", "product", "optimizer"]:
-                    raise
+        self.agents = self._new_registry(self.config)
+        self._workspaces.put(self._new_workspace())
+        logger.info(f"✅ Registered {len(self.agents)} agents (constructed on first use)")
+
+    def _new_registry(self, config) -> AgentRegistry:
+        registry = AgentRegistry(config, self.memory, AGENT_SPECS, OPTIONAL_AGENTS)
+        for module_name in self.extensions:
+            registry.register(f"ext_{module_name}", f"agents.extensions.{module_name}", "Agent")
+        return registry
+
+    def _new_workspace(self) -> Tuple[RunConfig, AgentRegistry]:
+        """A per-run config view and the agents bound to it."""
+        run_config = RunConfig(self._config)
+        return run_config, self._new_registry(run_config)
+
+    def _checkout_workspace(self) -> Tuple[RunConfig, AgentRegistry]:
+        """Reuse an idle workspace (with its already constructed agents) or create one."""
+        try:
+            return self._workspaces.get_nowait()
+        except queue.Empty:
+            return self._new_workspace()
     
     def _load_extensions(self):
         """Load extension agents."""
@@ -196,43 +257,105 @@ class AgencyOrchestrator:
         if not os.path.isdir(ext_dir):
             return
         
-        loaded = 0
-        for _, module_name, _ in pkgutil.iter_modules([ext_dir]):
-            try:
-                full_name = f"agents.extensions.{module_name}"
-                module = importlib.import_module(full_name)
-                if hasattr(module, "Agent"):
-                    agent_cls = getattr(module, "Agent")
-                    self.agents[f"ext_{module_name}"] = agent_cls(self.config, self.memory)
-                    loaded += 1
-            except Exception as e:
-                logger.warning(f"Failed to load extension {module_name}: {e}")
+        # Extensions are optional and, like core agents, imported on first use
+        self.extensions = [module_name for _, module_name, _ in pkgutil.iter_modules([ext_dir])]
         
-        if loaded > 0:
-            logger.info(f"📦 Loaded {loaded} extension agents")
+        if self.extensions:
+            logger.info(f"📦 Registered {len(self.extensions)} extension agents")
     
-    def run_project(self, prompt: str) -> Dict:
+    def run_project(self, prompt: str, projects_dir: Optional[str] = None) -> Dict:
         """
         Execute the complete project generation pipeline.
+
+        Safe to call from several threads at once; each run gets its own
+        agents and project directory.
         
         Args:
             prompt (str): User's project description
+            projects_dir (str): Directory to create the project in (defaults to PROJECTS_DIR)
             
         Returns:
             Dict with status and results
         """
-        if not self.setup_complete:
-            if not self.setup():
+        with self._setup_lock:
+            if not self.setup_complete and not self.setup():
                 return {"status": "failed", "error": "Setup failed"}
         
         # Create project directory
         project_name = self._create_project_name(prompt)
-        project_dir = os.path.join(self.config.PROJECTS_DIR, project_name)
+        project_dir = os.path.join(projects_dir or self._config.PROJECTS_DIR, project_name)
         os.makedirs(project_dir, exist_ok=True)
         
-        # Update config to use this project directory
-        self.config.PROJECTS_DIR = project_dir
-        
+        return self._run_in_workspace(RunManifest.start(project_dir, prompt, project_name))
+
+    def resume_project(self, project_dir: str) -> Dict:
+        """
+        Continue an interrupted run from the manifest in its project directory.
+
+        Stages that completed are not run again and files that were already
+        generated (and are unchanged on disk) are not regenerated.
+
+        Args:
+            project_dir (str): Directory of the project to resume
+
+        Returns:
+            Dict with status and results
+        """
+        with self._setup_lock:
+            if not self.setup_complete and not self.setup():
+                return {"status": "failed", "error": "Setup failed"}
+
+        manifest = RunManifest.load(project_dir)
+        if manifest is None:
+            return {"status": "failed", "error": f"No run to resume in {project_dir}"}
+        logger.info(f"♻️ Resuming {manifest.project_name} (completed: {', '.join(manifest.data['stages']) or 'nothing'})")
+        return self._run_in_workspace(manifest)
+
+    def continue_project(self, project_dir: str, prompt: str) -> Dict:
+        """
+        Apply a follow-up request to an existing project incrementally.
+
+        The architect revises the stored plan, and only files whose specs were
+        added or changed (plus the files that import them) are regenerated,
+        retested and re-reviewed. Projects without a stored plan are generated
+        from scratch in ``project_dir``.
+
+        Args:
+            project_dir (str): Directory of the existing project
+            prompt (str): What to change or add
+
+        Returns:
+            Dict with status and results
+        """
+        with self._setup_lock:
+            if not self.setup_complete and not self.setup():
+                return {"status": "failed", "error": "Setup failed"}
+
+        manifest = RunManifest.load(project_dir)
+        if manifest is None or not manifest.stage_output("planning"):
+            logger.info(f"📁 No stored plan in {project_dir}; generating the project from scratch")
+            os.makedirs(project_dir, exist_ok=True)
+            return self._run_in_workspace(
+                RunManifest.start(project_dir, prompt, os.path.basename(os.path.normpath(project_dir)))
+            )
+        return self._run_in_workspace(manifest, change=prompt)
+
+    def _run_in_workspace(self, manifest: RunManifest, change: Optional[str] = None) -> Dict:
+        """Run the pipeline (or apply ``change``) for ``manifest`` with a checked-out workspace."""
+        with self._run_slots:
+            run_config, agents = self._checkout_workspace()
+            run_config.PROJECTS_DIR = manifest.project_dir
+            self._run_state.config, self._run_state.agents = run_config, agents
+            try:
+                if change is not None:
+                    return self._run_increment(change, manifest)
+                return self._run_pipeline(manifest.prompt, manifest.project_name, manifest.project_dir, manifest)
+            finally:
+                self._run_state.config = self._run_state.agents = None
+                self._workspaces.put((run_config, agents))
+
+    def _run_pipeline(self, prompt: str, project_name: str, project_dir: str, manifest: RunManifest) -> Dict:
+        """Run every stage for one project with the current run's agents, checkpointing to ``manifest``."""
         logger.info(f"📁 Project directory: {project_dir}")
         
         results = {
@@ -241,11 +364,15 @@ class AgencyOrchestrator:
             "project_dir": project_dir,
             "stages": {}
         }
+        usage_token = set_usage_context(project=project_name)
+        preloaded = self._preload_models()
         
         try:
             # Stage 1: Architecture Planning
             logger.info("\n📐 Stage 1: Architecture Planning")
-            plan = self._run_stage("architect", lambda: self.agents["architect"].generate_plan(prompt))
+            plan = self._checkpointed(
+                manifest, "planning", "architect", lambda: self.agents["architect"].generate_plan(prompt)
+            )
             results["stages"]["planning"] = {"status": "success" if plan else "failed", "output": plan}
             
             if not plan or not plan.get("files"):
@@ -256,7 +383,11 @@ class AgencyOrchestrator:
             
             # Stage 2: Code Generation
             logger.info("\n💻 Stage 2: Code Generation")
-            code_files = self._run_stage("coder", lambda: self.agents["coder"].execute_plan(plan))
+            # Only checkpointed once every file holds generated code; a resume
+            # regenerates placeholders written when the LLM failed
+            code_files = self._checkpointed(manifest, "coding", "coder", lambda: self.agents["coder"].execute_plan(
+                plan, done=manifest.completed_files(), on_file=manifest.record_file
+            ), is_complete=lambda files: set(files) <= manifest.completed_files())
             results["stages"]["coding"] = {"status": "success" if code_files else "failed", "output": code_files}
             
             if not code_files:
@@ -276,24 +407,36 @@ class AgencyOrchestrator:
             
             # Stage 4: Testing
             logger.info("\n🧪 Stage 4: Testing")
-            test_results = self._run_stage("tester", lambda: self.agents["tester"].run_tests(code_files))
+            test_results = self._checkpointed(
+                manifest, "testing", "tester", lambda: self.agents["tester"].run_tests(code_files)
+            )
             results["stages"]["testing"] = {"status": "mixed", "output": test_results}
             
             # Stage 5: Fixing (if needed)
-            if self._has_test_failures(test_results) and "fixer" in self.agents:
+            repair = None
+            if manifest.stage_done("fixing"):
+                logger.info("\n⏭️ Stage 5: Auto-Fixing (completed in an earlier run)")
+                repair = manifest.stage_output("fixing")
+                test_results = manifest.stage_output("retesting")
+            elif self._has_test_failures(test_results) and "fixer" in self.agents:
                 logger.info("\n🔧 Stage 5: Auto-Fixing")
-                fixes = self._run_stage("fixer", lambda: self.agents["fixer"].fix_code(code_files, test_results))
-                results["stages"]["fixing"] = {"status": "attempted", "output": fixes}
-                
-                # Re-test after fixes
-                if fixes:
-                    test_results = self._run_stage("tester", lambda: self.agents["tester"].run_tests(code_files))
-                    results["stages"]["retesting"] = {"status": "mixed", "output": test_results}
+                repair = self._run_stage("fixer", lambda: self._run_fix_loop(test_results))
+                if repair:
+                    manifest.update_files(code_files)
+                    manifest.complete_stage("retesting", test_results)
+                    manifest.complete_stage("fixing", repair)
+                else:
+                    results["stages"]["fixing"] = {"status": "failed", "output": None}
+            if repair:
+                results["stages"]["fixing"] = {"status": repair["status"], "output": repair}
+                results["stages"]["retesting"] = {"status": "mixed", "output": test_results}
             
             # Stage 6: Code Review (optional)
             if "reviewer" in self.agents and self.config.USE_GPT4_FOR_QA:
                 logger.info("\n📝 Stage 6: Code Review")
-                reviews = self._run_stage("reviewer", lambda: self.agents["reviewer"].review_code(code_files))
+                reviews = self._checkpointed(
+                    manifest, "review", "reviewer", lambda: self.agents["reviewer"].review_code(code_files)
+                )
                 results["stages"]["review"] = {"status": "success", "output": reviews}
             
             # Stage 7: Documentation
@@ -311,13 +454,189 @@ class AgencyOrchestrator:
             logger.exception(f"❌ Pipeline failed with error: {e}")
             results["status"] = "failed"
             results["error"] = str(e)
+        finally:
+            manifest.finish(results["status"])
+            self._release_models(preloaded)
+            reset_usage_context(usage_token)
+            results["usage"] = UsageLedger.get(self.config).summary(by="stage", project=project_name)
         
         return results
     
+    def _run_increment(self, change: str, manifest: RunManifest) -> Dict:
+        """Revise the stored plan and rebuild only the files the change affects."""
+        project_dir = manifest.project_dir
+        results = {
+            "status": "in_progress",
+            "project_name": manifest.project_name,
+            "project_dir": project_dir,
+            "stages": {}
+        }
+        usage_token = set_usage_context(project=manifest.project_name)
+        preloaded = self._preload_models()
+
+        try:
+            # Stage 1: Plan revision
+            logger.info("\n📐 Stage 1: Plan Revision")
+            old_plan = manifest.stage_output("planning")
+            plan = self._run_stage("architect", lambda: self.agents["architect"].revise_plan(change, old_plan))
+            if not plan or not plan.get("files"):
+                results["status"] = "failed"
+                results["error"] = "Failed to revise project plan"
+                return results
+
+            diff = diff_plans(old_plan, plan)
+            paths = diff["added"] + diff["changed"] + diff["unchanged"]
+            stale = set(diff["added"] + diff["changed"])
+            stale |= {p for p in diff["unchanged"] if not os.path.exists(os.path.join(project_dir, p))}
+            affected = stale | file_dependents(project_dir, paths, stale)
+            results["stages"]["planning"] = {"status": "success", "output": plan, "diff": diff}
+            logger.info(
+                f"♻️ {len(diff['added'])} added, {len(diff['changed'])} changed, {len(diff['removed'])} removed; "
+                f"regenerating {len(affected)} of {len(paths)} files"
+            )
+            self._remove_files(project_dir, diff["removed"])
+            manifest.forget_files(diff["removed"])
+
+            # Stage 2: Code generation for the affected files only; the full plan
+            # is passed so they see the interfaces of unchanged files they use
+            regenerated = []
+            if affected:
+                logger.info("\n💻 Stage 2: Code Generation")
+                regenerated = self._run_stage(
+                    "coder", lambda: self.agents["coder"].execute_plan(plan, on_file=manifest.record_file, only=affected)
+                )
+                if not regenerated:
+                    results["status"] = "failed"
+                    results["error"] = "Failed to regenerate code"
+                    return results
+            results["stages"]["coding"] = {"status": "success", "output": regenerated}
+
+            # Stage 3: Safety check
+            logger.info("\n🛡️ Stage 3: Safety Check")
+            if not self._run_safety_check(regenerated):
+                results["status"] = "failed"
+                results["error"] = "Code failed safety check"
+                return results
+            results["stages"]["safety"] = {"status": "success"}
+
+            # Stages 4-6: Test, fix and review what was regenerated
+            test_results = {}
+            if regenerated:
+                logger.info("\n🧪 Stage 4: Testing")
+                test_results = self._run_stage("tester", lambda: self.agents["tester"].run_tests(regenerated)) or {}
+                if self._has_test_failures(test_results) and "fixer" in self.agents:
+                    logger.info("\n🔧 Stage 5: Auto-Fixing")
+                    repair = self._run_stage("fixer", lambda: self._run_fix_loop(test_results))
+                    results["stages"]["fixing"] = {"status": repair["status"] if repair else "failed", "output": repair}
+                    manifest.update_files(regenerated)
+            results["stages"]["testing"] = {"status": "mixed", "output": test_results}
+
+            reviews = {}
+            if regenerated and "reviewer" in self.agents and self.config.USE_GPT4_FOR_QA:
+                logger.info("\n📝 Stage 6: Code Review")
+                reviews = self._run_stage("reviewer", lambda: self.agents["reviewer"].review_code(regenerated)) or {}
+                results["stages"]["review"] = {"status": "success", "output": reviews}
+
+            # Stage 7: Documentation
+            logger.info("\n📚 Stage 7: Documentation")
+            self._generate_documentation(project_dir, plan, results)
+
+            # Checkpoint the project as it now stands
+            removed = set(diff["removed"])
+            manifest.complete_stage("planning", plan)
+            manifest.complete_stage("coding", [p for p in paths if p not in affected or p in regenerated])
+            for stage, fresh in (("testing", test_results), ("review", reviews)):
+                previous = manifest.stage_output(stage) or {}
+                if isinstance(previous, dict) and isinstance(fresh, dict):
+                    merged = {p: r for p, r in previous.items() if p not in removed and p not in affected}
+                    merged.update(fresh)
+                    manifest.complete_stage(stage, merged)
+            manifest.forget_stages("fixing", "retesting")
+            manifest.add_change(change, diff)
+
+            results["status"] = "success"
+            results["message"] = f"Project '{manifest.project_name}' updated ({len(regenerated)} files regenerated)"
+            self.agents["evolution"].log_event(f"Project updated: {manifest.project_name}")
+
+        except Exception as e:
+            logger.exception(f"❌ Incremental update failed with error: {e}")
+            results["status"] = "failed"
+            results["error"] = str(e)
+        finally:
+            manifest.finish(results["status"])
+            self._release_models(preloaded)
+            reset_usage_context(usage_token)
+            results["usage"] = UsageLedger.get(self.config).summary(by="stage", project=manifest.project_name)
+
+        return results
+
+    def _remove_files(self, project_dir: str, paths: List[str]):
+        """Delete generated files the revised plan no longer contains."""
+        for path in paths:
+            full_path = os.path.join(project_dir, path)
+            if os.path.isfile(full_path):
+                os.remove(full_path)
+                logger.info(f"🗑️ Removed {path} (no longer in the plan)")
+
+    def _run_models(self) -> List[str]:
+        """Ollama models the pipeline will call, including the local fallback."""
+        architect = self.agents.get("architect")
+        models = [
+            getattr(architect, "preferred_model", None),
+            getattr(self.config, "CODE_MODEL", None),
+            getattr(self.config, "FIX_MODEL", None),
+            getattr(self.config, "REVIEW_MODEL", None) if self.config.USE_GPT4_FOR_QA else None,
+            getattr(self.config, "OLLAMA_MODEL", None),
+        ]
+        names = {m.strip().lower() for m in models if m}
+        return sorted(m for m in names if provider_for_model(m) == "ollama")
+
+    def _preload_models(self) -> List[str]:
+        """
+        Load the run's Ollama models in parallel and pin them for the run.
+
+        Returns:
+            List of models that were loaded.
+        """
+        models = self._run_models() if getattr(self.config, "OLLAMA_PRELOAD", False) else []
+        loader = self.agents.get("coder")
+        if not models or loader is None:
+            return []
+
+        logger.info(f"🔥 Preloading Ollama models: {', '.join(models)}")
+        keep_alive = getattr(self.config, "OLLAMA_KEEP_ALIVE", "30m")
+        with ThreadPoolExecutor(max_workers=len(models)) as executor:
+            loaded = list(executor.map(lambda m: loader.load_ollama_model(m, keep_alive), models))
+        return [m for m, ok in zip(models, loaded) if ok]
+
+    def _release_models(self, models: List[str]):
+        """Let preloaded models unload after the idle keep-alive once the run is over."""
+        loader = self.agents.get("coder")
+        if not models or loader is None:
+            return
+        keep_alive = getattr(self.config, "OLLAMA_IDLE_KEEP_ALIVE", "5m")
+        with ThreadPoolExecutor(max_workers=len(models)) as executor:
+            list(executor.map(lambda m: loader.load_ollama_model(m, keep_alive), models))
+
+    def _checkpointed(self, manifest: RunManifest, checkpoint: str, stage_name: str, func,
+                      is_complete=bool) -> any:
+        """
+        Reuse a stage's output checkpointed by an earlier run, or run it and
+        checkpoint it if ``is_complete(output)``.
+        """
+        if manifest.stage_done(checkpoint):
+            logger.info(f"⏭️ Skipping {checkpoint} (completed in an earlier run)")
+            return manifest.stage_output(checkpoint)
+        output = self._run_stage(stage_name, func)
+        if output and is_complete(output):
+            manifest.complete_stage(checkpoint, output)
+        return output
+
     def _run_stage(self, stage_name: str, func) -> any:
-        """Run a pipeline stage with error handling."""
+        """Run a pipeline stage with error handling; its LLM usage is tagged with the stage."""
         try:
-            return func()
+            with usage_context(stage=stage_name):
+                return func()
         except Exception as e:
             logger.error(f"❌ {stage_name} stage failed: {e}")
             return None
@@ -339,6 +658,81 @@ class AgencyOrchestrator:
         
         return True
     
+    def _run_fix_loop(self, test_results: Dict) -> Dict:
+        """
+        Repeatedly fix and retest only the files that are still failing.
+
+        Each file stops when it passes, when its error signature repeats
+        (oscillation), or when it exhausts its attempt or token budget.
+        ``test_results`` is updated in place with the latest results.
+
+        Returns:
+            Dict with the loop status, rounds run, fixed files and files given up on.
+        """
+        fixer = self.agents["fixer"]
+        tester = self.agents["tester"]
+        max_attempts = getattr(self.config, "FIX_MAX_ATTEMPTS", 3)
+        token_budget = getattr(self.config, "FIX_TOKEN_BUDGET", 16000)
+        fixer.reset()
+
+        failing = self._failing_files(test_results)
+        seen_errors = {path: {self._error_hash(test_results[path])} for path in failing}
+        attempts = {}
+        gave_up = {}
+        fixes = {}
+        rounds = 0
+
+        while failing:
+            rounds += 1
+            logger.info(f"🔁 Fix round {rounds}: {len(failing)} failing file(s)")
+            fixes.update(fixer.fix_code(failing, {p: test_results[p] for p in failing}) or {})
+            for path in failing:
+                attempts[path] = attempts.get(path, 0) + 1
+
+            retest = tester.run_tests(failing)
+            test_results.update(retest)
+
+            still_failing = self._failing_files(retest)
+            fixer.forget_fixes(still_failing)
+
+            failing = []
+            for path in still_failing:
+                error_hash = self._error_hash(retest[path])
+                if error_hash in seen_errors[path]:
+                    gave_up[path] = "oscillating"
+                elif attempts[path] >= max_attempts:
+                    gave_up[path] = "attempt budget exhausted"
+                elif fixer.tokens_used.get(path, 0) >= token_budget:
+                    gave_up[path] = "token budget exhausted"
+                else:
+                    seen_errors[path].add(error_hash)
+                    failing.append(path)
+                    continue
+                logger.warning(f"⚠️ Giving up on {path}: {gave_up[path]}")
+
+        fixed = [path for path in attempts if path not in gave_up]
+        logger.info(f"🔧 Fix loop finished after {rounds} round(s): {len(fixed)} fixed, {len(gave_up)} unresolved")
+        return {
+            "status": "success" if not gave_up else "partial",
+            "rounds": rounds,
+            "fixed": fixed,
+            "unresolved": gave_up,
+            "attempts": attempts,
+            "fixes": fixes,
+        }
+
+    def _failing_files(self, test_results: Dict) -> List[str]:
+        """Return the paths whose latest test result is a failure."""
+        return [
+            path for path, result in (test_results or {}).items()
+            if isinstance(result, dict) and result.get("status") == "failed"
+        ]
+
+    def _error_hash(self, result) -> str:
+        """Hash the normalized error signature of a test result."""
+        from tools.fix_cache import error_signature
+        return hashlib.sha256(error_signature(result).encode("utf-8")).hexdigest()
+
     def _has_test_failures(self, test_results: Dict) -> bool:
         """Check if any tests failed."""
         if not test_results:
@@ -428,12 +822,39 @@ class AgencyOrchestrator:
         return f"{name}-{timestamp}"[:50]  # Limit length
 
 
-def run_agency(prompt: str) -> None:
+def _print_usage(usage: Optional[List[Dict]]) -> None:
+    """Print per-stage LLM usage for a finished run."""
+    if not usage:
+        return
+    print("\n💰 LLM Usage:")
+    for row in usage:
+        print(
+            f"  {row['stage']}: {row['calls']} call(s), "
+            f"{row['prompt_tokens'] + row['completion_tokens']} tokens, "
+            f"{row['avg_latency']:.1f}s avg, ${row['cost']:.4f}"
+        )
+
+
+_orchestrator: Optional[AgencyOrchestrator] = None
+_orchestrator_lock = threading.Lock()
+
+
+def get_orchestrator() -> AgencyOrchestrator:
+    """Return the process-wide orchestrator shared by every front-end."""
+    global _orchestrator
+    with _orchestrator_lock:
+        if _orchestrator is None:
+            _orchestrator = AgencyOrchestrator()
+        return _orchestrator
+
+
+def run_agency(prompt: str, projects_dir: Optional[str] = None) -> None:
     """
     Main entry point for The Agency.
     
     Args:
         prompt (str): User's project description
+        projects_dir (str): Directory to create the project in (defaults to PROJECTS_DIR)
     """
     if not prompt or not prompt.strip():
         logger.error("❌ Prompt cannot be empty")
@@ -441,10 +862,48 @@ def run_agency(prompt: str) -> None:
     
     logger.info(f"📋 Project Request: {prompt}")
     
-    orchestrator = AgencyOrchestrator()
-    results = orchestrator.run_project(prompt)
+    orchestrator = get_orchestrator()
+    results = orchestrator.run_project(prompt, projects_dir)
+    _print_results(results)
+
+
+def resume_agency(project: str) -> Dict:
+    """
+    Resume an interrupted run, skipping the stages and files it completed.
     
-    # Print summary
+    Args:
+        project (str): Project directory, or a project name under PROJECTS_DIR
+        
+    Returns:
+        Dict with status and results
+    """
+    project_dir = project if os.path.isdir(project) else os.path.join(Config.PROJECTS_DIR, project)
+    logger.info(f"♻️ Resume Request: {project_dir}")
+    results = get_orchestrator().resume_project(project_dir)
+    _print_results(results)
+    return results
+
+
+def continue_agency(project: str, prompt: str) -> Dict:
+    """
+    Apply a follow-up request to an existing project, regenerating only affected files.
+    
+    Args:
+        project (str): Project directory, or a project name under PROJECTS_DIR
+        prompt (str): What to change or add
+        
+    Returns:
+        Dict with status and results
+    """
+    project_dir = project if os.path.isdir(project) else os.path.join(Config.PROJECTS_DIR, project)
+    logger.info(f"📋 Change Request for {project_dir}: {prompt}")
+    results = get_orchestrator().continue_project(project_dir, prompt)
+    _print_results(results)
+    return results
+
+
+def _print_results(results: Dict):
+    """Print a run's summary."""
     print("\n" + "="*50)
     print(f"🏁 Project Generation {'Completed' if results['status'] == 'success' else 'Failed'}")
     print("="*50)
@@ -456,6 +915,7 @@ def run_agency(prompt: str) -> None:
         for stage, info in results["stages"].items():
             status_icon = "✅" if info["status"] == "success" else "⚠️"
             print(f"  {status_icon} {stage.title()}: {info['status']}")
+        _print_usage(results.get("usage"))
         print(f"\n💡 Next Steps:")
         print(f"  1. cd {results['project_dir']}")
         print(f"  2. Read README.md for setup instructions")
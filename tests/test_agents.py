@@ -4,7 +4,7 @@ import pytest
 from agents.architect import ArchitectAgent
 from agents.deployer import DeployerAgent
 from agents.coder import CoderAgent
-from agents.agent_base import BaseAgent
+from agents.agent_base import BaseAgent, LLM_ERROR_PREFIX
 from agents.memory import MemoryManager
 from agents.main_agent import MainAgent
 from agents.supervisor import SupervisorAgent
@@ -17,6 +17,7 @@ class DummyConfig:
     ANTHROPIC_API_KEY = "test"
     PROJECTS_DIR = tempfile.mkdtemp()
     CONTAINER_TOOL = "docker"
+    SQLITE_PATH = ":memory:"
 
 
 class DummyAgent(BaseAgent):
@@ -28,7 +29,7 @@ def test_architect_plan_with_fallback(monkeypatch):
     mem = MemoryManager()
     agent = ArchitectAgent(DummyConfig, mem)
 
-    def fake_llm(prompt: str, model: str = "gpt-4o", system: str = ""):
+    def fake_llm(prompt: str, model: str = "gpt-4o", system: str = "", **kwargs):
         return '{"components": ["web"], "tech_stack": {"frontend": "React"}}'
 
     monkeypatch.setattr(agent, "call_llm", fake_llm)
@@ -69,19 +70,33 @@ def test_coder_generate_code_fallback(monkeypatch, tmp_path):
     assert "TODO" in code
 
 
+def test_coder_does_not_report_llm_error_output(monkeypatch, tmp_path):
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    coder = CoderAgent(DummyConfig, MemoryManager())
+    monkeypatch.setattr(coder, "call_llm", lambda *a, **k: f"{LLM_ERROR_PREFIX}: timeout")
+
+    recorded = []
+    files = coder.execute_plan({"files": [{"path": "app.py", "description": "an app"}]}, on_file=recorded.append)
+
+    assert files == ["app.py"]
+    assert recorded == []
+    content = (tmp_path / "app.py").read_text()
+    assert LLM_ERROR_PREFIX not in content and "TODO" in content
+
+
 def test_call_llm_routes(monkeypatch):
     agent = DummyAgent(DummyConfig, MemoryManager())
     called = {}
 
-    def fake_openai(model, prompt, system=""):
+    def fake_openai(model, prompt, system="", **kwargs):
         called["openai"] = True
         return "ok"
 
-    def fake_ollama(model, prompt, system=""):
+    def fake_ollama(model, prompt, system="", **kwargs):
         called["ollama"] = True
         return "ok"
 
-    def fake_anthropic(model, prompt, system=""):
+    def fake_anthropic(model, prompt, system="", **kwargs):
         called["anthropic"] = True
         return "ok"
 
@@ -123,3 +138,112 @@ def test_main_agent_pipeline(monkeypatch, tmp_path):
     result = agent.run_pipeline("test")
     assert result["status"] == "success"
     assert (tmp_path / "app.py").exists()
+
+
+def test_call_llm_falls_back_to_ollama(monkeypatch):
+    class NoKeyConfig(DummyConfig):
+        GPT4_API_KEY = ""
+        ANTHROPIC_API_KEY = ""
+        OLLAMA_MODEL = "qwen:7b"
+
+    agent = DummyAgent(NoKeyConfig, MemoryManager())
+    used = []
+    monkeypatch.setattr(agent, "_call_ollama_chat", lambda m, p, s="", **kw: used.append(m) or "local")
+
+    assert agent.call_llm("hi", model="gpt-4o") == "local"
+    assert used == ["qwen:7b"]
+
+
+def test_reviewer_uses_call_llm(monkeypatch, tmp_path):
+    from agents.reviewer import ReviewerAgent
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    (tmp_path / "app.py").write_text("print('hi')")
+    reviewer = ReviewerAgent(DummyConfig, MemoryManager())
+    monkeypatch.setattr(reviewer, "call_llm", lambda p, model="", system="", **kw: "### FILE: app.py (lines 1-1)\nlooks fine")
+    assert reviewer.review_code(["app.py"]) == {"app.py": "looks fine"}
+
+
+def test_architect_reuses_template_and_stored_plans(monkeypatch, tmp_path):
+    class StoreConfig(DummyConfig):
+        SQLITE_PATH = str(tmp_path / "plans.db")
+        PLAN_STORE = {"enabled": True, "reuse_threshold": 0.85, "adapt_threshold": 0.6, "use_templates": True}
+
+    agent = ArchitectAgent(StoreConfig, MemoryManager())
+    calls = []
+
+    def fake_llm(prompt, model="gpt-4o", system="", **kw):
+        calls.append(prompt)
+        return '{"project_name": "inventory", "files": [{"path": "app/main.py", "description": "entry"}]}'
+
+    monkeypatch.setattr(agent, "call_llm", fake_llm)
+
+    snake = agent.generate_plan("Build a snake game")
+    assert calls == []
+    assert any(f["path"] == "game/snake.py" for f in snake["files"])
+
+    agent.generate_plan("inventory tracking REST API with barcode scanning")
+    assert len(calls) == 1
+
+    # A fresh agent (new process) finds the stored plan for a near-duplicate prompt
+    again = ArchitectAgent(StoreConfig, MemoryManager())
+    monkeypatch.setattr(again, "call_llm", fake_llm)
+    plan = again.generate_plan("an inventory tracking rest api with barcodes scanning")
+    assert len(calls) == 1
+    assert plan["files"][0]["path"] == "app/main.py"
+    assert again._get_default_files_for_type("desktop")[0]["path"] == "app/__init__.py"
+
+
+def test_coder_generates_in_dependency_waves(monkeypatch, tmp_path):
+    from tools.plan_graph import infer_dependencies, topological_waves
+
+    plan = {"files": [
+        {"path": "app/routes.py", "description": "CRUD endpoints using the Todo model from app/models.py"},
+        {"path": "app/models.py", "description": "SQLAlchemy Todo model"},
+        {"path": "README.md", "description": "Usage of routes.py"},
+        {"path": "tests/test_routes.py", "description": "Endpoint tests"},
+    ]}
+    deps = infer_dependencies(plan["files"])
+    assert deps["app/routes.py"] == ["app/models.py"]
+    assert deps["tests/test_routes.py"] == ["app/routes.py"]
+    assert topological_waves(deps) == [
+        ["app/models.py", "README.md"], ["app/routes.py"], ["tests/test_routes.py"],
+    ]
+    assert topological_waves({"a.py": ["b.py"], "b.py": ["a.py"], "c.py": []}) == [["c.py"], ["a.py", "b.py"]]
+
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    coder = CoderAgent(DummyConfig, MemoryManager())
+    prompts = {}
+
+    def fake_llm(prompt, model="", system="", **kwargs):
+        path = next(f["path"] for f in plan["files"] if f["description"] in prompt)
+        prompts[path] = prompt
+        return "class Todo:\n    def done(self, flag: bool) -> None:\n        pass\n" if path == "app/models.py" else "x = 1"
+
+    monkeypatch.setattr(coder, "call_llm", fake_llm)
+    written = []
+    files = coder.execute_plan(plan, on_file=written.append)
+
+    assert files == ["app/routes.py", "app/models.py", "README.md", "tests/test_routes.py"]
+    assert written.index("app/models.py") < written.index("app/routes.py") < written.index("tests/test_routes.py")
+    assert "def done(self, flag: bool) -> None" in prompts["app/routes.py"]
+    assert "already written project files" not in prompts["app/models.py"]
+
+
+def test_coder_regenerates_only_given_files_with_unchanged_interfaces(monkeypatch, tmp_path):
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "models.py").write_text("class Todo:\n    def done(self, flag: bool) -> None:\n        pass\n")
+    plan = {"files": [
+        {"path": "app/models.py", "description": "SQLAlchemy Todo model"},
+        {"path": "app/routes.py", "description": "CRUD endpoints using the Todo model from app/models.py"},
+    ]}
+    coder = CoderAgent(DummyConfig, MemoryManager())
+    prompts = []
+    monkeypatch.setattr(coder, "call_llm", lambda prompt, **kwargs: prompts.append(prompt) or "x = 1")
+
+    files = coder.execute_plan(plan, only={"app/routes.py"})
+
+    assert files == ["app/routes.py"]
+    assert len(prompts) == 1
+    assert "def done(self, flag: bool) -> None" in prompts[0]
+    assert "def done" in (tmp_path / "app" / "models.py").read_text()
@@ -12,7 +12,7 @@ class DummyConfig:
 def test_check_api_connections_failure(monkeypatch, caplog):
     def fail(url, timeout):
         raise requests.ConnectionError("fail")
-    monkeypatch.setattr("main.requests.get", fail)
+    monkeypatch.setattr("requests.get", fail)
     with caplog.at_level(logging.ERROR):
         ok = check_api_connections(DummyConfig)
     assert not ok
@@ -21,7 +21,7 @@ def test_check_api_connections_failure(monkeypatch, caplog):
 def test_check_api_connections_success(monkeypatch, caplog):
     class Resp:
         status_code = 200
-    monkeypatch.setattr("main.requests.get", lambda url, timeout: Resp())
+    monkeypatch.setattr("requests.get", lambda url, timeout: Resp())
     with caplog.at_level(logging.ERROR):
         ok = check_api_connections(DummyConfig)
     assert ok
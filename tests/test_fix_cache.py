@@ -0,0 +1,115 @@
+import tempfile
+import pytest
+
+from agents.fixer import FixerAgent
+from agents.memory import MemoryManager
+from tools.fix_cache import FixCache, PersistentLRUCache, error_signature, make_fix_key
+
+
+class DummyConfig:
+    GPT4_API_KEY = "test-key"
+    OLLAMA_API_URL = "http://localhost"
+    PROJECTS_DIR = tempfile.mkdtemp()
+    CACHE_DIR = tempfile.mkdtemp()
+    SQLITE_PATH = ":memory:"
+
+
+def test_error_signature_ignores_paths_and_lines():
+    a = 'Traceback:\n  File "/tmp/proj-1/app.py", line 3, in <module>\nNameError: name \'os\' is not defined'
+    b = 'Traceback:\n  File "/home/x/proj-2/app.py", line 17, in <module>\nNameError: name \'os\' is not defined'
+    assert error_signature(a) == error_signature(b)
+    assert make_fix_key("print(os)\n", a) == make_fix_key("print(os)", {"message": b})
+
+
+def test_fix_cache_persists_and_evicts(tmp_path):
+    db = str(tmp_path / "cache.db")
+    cache = FixCache(db_path=db, max_entries=2)
+    cache.put("a", "fix-a")
+    cache.put("b", "fix-b")
+    assert cache.get("a") == "fix-a"
+    cache.put("c", "fix-c")  # evicts "b", the least recently used
+    cache.close()
+
+    reopened = FixCache(db_path=db, max_entries=2)
+    assert reopened.get("b") is None
+    assert reopened.get("a") == "fix-a"
+    assert reopened.stats()["hit_rate"] == 0.5
+
+
+def test_persistent_cache_requires_table_and_setting():
+    with pytest.raises(TypeError):
+        PersistentLRUCache(db_path=":memory:")
+
+
+def test_fixer_replays_cached_fix(tmp_path, monkeypatch):
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    (tmp_path / "app.py").write_text("print(os.getcwd())\n")
+    fixer = FixerAgent(DummyConfig, MemoryManager())
+    failure = {"status": "failed", "message": "NameError: name 'os' is not defined"}
+    fixer.fix_cache.put(make_fix_key("print(os.getcwd())", failure), "import os\nprint(os.getcwd())")
+
+    def no_llm(prompt, model="", system="", **kwargs):
+        raise AssertionError("LLM should not be called for a cached fix")
+
+    monkeypatch.setattr(fixer, "call_llm", no_llm)
+    fixes = fixer.fix_code(["app.py"], {"app.py": failure})
+    assert fixes["app.py"].startswith("import os")
+    assert (tmp_path / "app.py").read_text().startswith("import os")
+
+
+def test_fixer_caps_max_tokens_and_skips_files_too_large_to_rewrite(tmp_path, monkeypatch):
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    (tmp_path / "mid.py").write_text("x = 1\n" * 2000)
+    (tmp_path / "huge.py").write_text("x = 1\n" * 20000)
+    fixer = FixerAgent(DummyConfig, MemoryManager())
+    fixer.model = "claude-3-haiku"
+    budgets = []
+    monkeypatch.setattr(fixer, "call_llm", lambda prompt, **kwargs: budgets.append(kwargs["max_tokens"]) or "x = 2\n")
+
+    failure = {"status": "failed", "message": "AssertionError"}
+    fixes = fixer.fix_code(["mid.py", "huge.py"], {"mid.py": failure, "huge.py": failure})
+
+    assert budgets == [4096]
+    assert "Skipped" in fixes["huge.py"]
+    assert (tmp_path / "huge.py").read_text().startswith("x = 1")
+
+
+def test_fix_prompt_includes_imported_interfaces(tmp_path, monkeypatch):
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    (tmp_path / "store.py").write_text("def save(item, *, overwrite=False):\n    return item\n")
+    (tmp_path / "app.py").write_text("from store import save\nsave(1, True)\n")
+    fixer = FixerAgent(DummyConfig, MemoryManager())
+    prompts = []
+
+    def fake_llm(prompt, model="", system="", **kwargs):
+        prompts.append(prompt)
+        return "from store import save\nsave(1, overwrite=True)\n"
+
+    monkeypatch.setattr(fixer, "call_llm", fake_llm)
+    failure = {"status": "failed", "message": "TypeError: save() takes 1 positional argument but 2 were given"}
+    fixer.fix_code(["app.py"], {"app.py": failure})
+
+    assert "# store.py\ndef save(item, *, overwrite=False)" in prompts[0]
+
+
+def test_fix_prompt_pulls_traceback_definitions(tmp_path, monkeypatch):
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    (tmp_path / "billing.py").write_text(
+        "def unrelated():\n    pass\n\n\ndef charge(amount, currency):\n    return f'{amount} {currency}'\n"
+    )
+    (tmp_path / "main.py").write_text("import billing\nprint(billing.charge(5))\n")
+    fixer = FixerAgent(DummyConfig, MemoryManager())
+    prompts = []
+    monkeypatch.setattr(fixer, "call_llm", lambda prompt, **kwargs: prompts.append(prompt) or "print('ok')\n")
+
+    traceback = (
+        "Runtime error:\nTraceback (most recent call last):\n"
+        f'  File "{tmp_path / "main.py"}", line 2, in <module>\n'
+        "TypeError: charge() missing 1 required positional argument: 'currency'\n"
+    )
+    fixer.fix_code(["main.py"], {"main.py": {"status": "failed", "message": traceback}})
+
+    assert "# billing.py:5 (function charge)\ndef charge(amount, currency):" in prompts[0]
+    definitions = prompts[0].split("--- Definitions Referenced in the Traceback ---")[1]
+    assert "def unrelated" not in definitions
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["billing.py", "main.py"]  # index kept outside the project
@@ -38,3 +38,22 @@ def test_cli_continue_menu(tmp_path, monkeypatch):
     assert 'proj1' in joined
     assert 'Shutting down' in joined
 
+
+
+def test_cli_usage_report(tmp_path, monkeypatch):
+    from tools.usage_ledger import UsageLedger, usage_context
+    monkeypatch.setattr(cli_interface.Config, 'SQLITE_PATH', str(tmp_path / 'usage.db'), raising=False)
+    with usage_context(project='proj1', stage='coder'):
+        UsageLedger.get(cli_interface.Config).record('openai', 'gpt-4o', 1000, 500, latency=2.0)
+    outputs = []
+    cli_interface.print_usage(by='stage', project='proj1', output_func=outputs.append)
+    assert 'coder' in outputs[1]
+    assert '0.0075' in outputs[1]
+    UsageLedger.reset_all()
+
+
+def test_cli_import_defers_pipeline_and_sdks():
+    from tools.import_benchmark import measure_import
+    result = measure_import('interfaces.cli_interface', runs=1)
+    # Checked by what got imported rather than wall time, which varies by machine
+    assert result['heavy'] == []
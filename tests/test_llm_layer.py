@@ -0,0 +1,411 @@
+import pytest
+import threading
+import time
+import types
+
+from agents.agent_base import BaseAgent
+from agents.memory import MemoryManager
+from tools.rate_limiter import RateLimiter, TokenBucket, backoff_delay, retry_after_seconds
+
+
+class DummyConfig:
+    GPT4_API_KEY = "test-key"
+    OLLAMA_API_URL = "http://localhost"
+    SQLITE_PATH = ":memory:"
+    RETRY_DELAY = 0
+    LLM_RATE_LIMITS = {"ollama": {"rpm": 0, "tpm": 0, "concurrency": 1}}
+
+
+class DummyAgent(BaseAgent):
+    def generate_plan(self, user_prompt: str):
+        return {}
+
+
+def test_token_bucket_reports_wait_when_empty():
+    bucket = TokenBucket(60, capacity=2)  # one token per second
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert 0.9 < bucket.reserve() <= 1.0
+
+
+def test_retry_after_and_backoff():
+    err = types.SimpleNamespace(response=types.SimpleNamespace(headers={"retry-after": "3"}))
+    assert retry_after_seconds(err) == 3.0
+    err = types.SimpleNamespace(response=types.SimpleNamespace(headers={"retry-after-ms": "250"}))
+    assert retry_after_seconds(err) == 0.25
+    assert retry_after_seconds(RuntimeError("no response")) is None
+    assert 0 <= backoff_delay(3, base=1, cap=5) <= 5
+
+
+def test_call_llm_respects_backend_concurrency(monkeypatch):
+    from tools.circuit_breaker import CircuitBreaker
+    RateLimiter.reset()
+    CircuitBreaker.reset_all()
+    agent = DummyAgent(DummyConfig, MemoryManager())
+    active = []
+    peak = []
+
+    def slow_ollama(model, prompt, system="", **kwargs):
+        active.append(1)
+        peak.append(len(active))
+        time.sleep(0.05)
+        active.pop()
+        return "ok"
+
+    monkeypatch.setattr(agent, "_call_ollama_chat", slow_ollama)
+    threads = [threading.Thread(target=agent.call_llm, args=(f"hi {i}", "qwen:7b")) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(peak) == 1
+    RateLimiter.reset()
+
+
+def test_circuit_breaker_opens_and_recovers(monkeypatch):
+    from tools.circuit_breaker import CircuitBreaker
+    breaker = CircuitBreaker("test", window=4, min_calls=2, error_threshold=0.5, open_seconds=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    time.sleep(0.06)
+    assert breaker.allow_request()       # half-open trial
+    assert not breaker.allow_request()   # only one trial at a time
+    breaker.record_success(0.1)
+    assert breaker.state == "closed"
+
+
+def test_circuit_breaker_slow_calls_judged_by_request_timeout():
+    from tools.circuit_breaker import CircuitBreaker
+    breaker = CircuitBreaker("test", window=4, min_calls=1, error_threshold=0.5, slow_call_seconds=90)
+    breaker.record_success(300, timeout=600)   # slow, but within its own timeout
+    assert breaker.error_rate() == 0
+    breaker.record_success(30, timeout=20)     # overran its timeout
+    assert breaker.error_rate() == 0.5
+
+
+def test_missing_model_does_not_count_against_provider(monkeypatch):
+    from agents.agent_base import ModelNotFoundError
+    from tools.circuit_breaker import CircuitBreaker
+    CircuitBreaker.reset_all()
+
+    class Cfg(DummyConfig):
+        OLLAMA_MODEL = "qwen:7b"
+
+    agent = DummyAgent(Cfg, MemoryManager())
+    calls = []
+
+    def missing(m, p, s="", **kw):
+        calls.append(m)
+        raise ModelNotFoundError(f"Model '{m}' not found")
+
+    monkeypatch.setattr(agent, "_call_ollama_chat", missing)
+    monkeypatch.setattr(agent, "_call_openai_chat", lambda m, p, s="", **kw: "cloud")
+
+    assert agent.call_llm("hi", model="llama3:8b") == "cloud"
+    assert calls == ["llama3:8b"]             # no retries of a missing model
+    assert CircuitBreaker.get("ollama").error_rate() == 0
+    CircuitBreaker.reset_all()
+
+
+def test_open_breaker_fails_over_without_retrying(monkeypatch):
+    from tools.circuit_breaker import CircuitBreaker
+    CircuitBreaker.reset_all()
+
+    class Cfg(DummyConfig):
+        OLLAMA_MODEL = "qwen:7b"
+
+    agent = DummyAgent(Cfg, MemoryManager())
+    calls = []
+    monkeypatch.setattr(agent, "_call_ollama_chat", lambda m, p, s="", **kw: calls.append(m) or "local")
+    monkeypatch.setattr(agent, "_call_openai_chat", lambda m, p, s="", **kw: calls.append(m) or "cloud")
+    openai_breaker = CircuitBreaker.get("openai")
+    for _ in range(openai_breaker.min_calls):
+        openai_breaker.record_failure()
+
+    assert agent.call_llm("hi", model="gpt-4o") == "local"
+    assert calls == ["qwen:7b"]
+    CircuitBreaker.reset_all()
+
+
+def test_hedged_request_wins_when_primary_is_slow(monkeypatch):
+    from tools.hedging import HedgeStats
+    from tools.latency_tracker import LatencyTracker
+    LatencyTracker.reset()
+    HedgeStats.reset()
+
+    class Cfg(DummyConfig):
+        HEDGING = {"enabled": True, "min_samples": 3, "max_fraction": 1.0}
+
+    agent = DummyAgent(Cfg, MemoryManager())
+    for _ in range(3):
+        LatencyTracker.record("gpt-4o", 0.05)
+    released = threading.Event()
+
+    def slow_openai(m, p, s="", **kw):
+        released.wait(2)
+        return "slow primary"
+
+    monkeypatch.setattr(agent, "_call_openai_chat", slow_openai)
+    monkeypatch.setattr(agent, "_call_ollama_chat", lambda m, p, s="", **kw: "fast hedge")
+    monkeypatch.setattr(agent, "_hedge_candidates", lambda m: ["gpt-4o", "qwen:7b"])
+
+    assert agent.call_llm("hi", model="gpt-4o") == "fast hedge"
+    released.set()
+    stats = HedgeStats.snapshot()
+    assert stats["fired"] == 1 and stats["hedge_wins"] == 1
+    deadline = time.monotonic() + 2
+    while not HedgeStats.snapshot()["overhead_tokens"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert HedgeStats.snapshot()["overhead_tokens"] > 0  # the slow primary was still billed
+
+    # Cost cap: once the hedged fraction is reached no further hedges are sent.
+    Cfg.HEDGING = {"enabled": True, "min_samples": 3, "max_fraction": 0.5}
+    assert agent.call_llm("hi", model="gpt-4o") == "slow primary"
+    assert HedgeStats.snapshot()["fired"] == 1
+    LatencyTracker.reset()
+    HedgeStats.reset()
+
+
+def test_hedge_loser_waiting_for_a_slot_is_not_sent():
+    from tools.hedging import HedgeCancelledError, HedgeStats, hedged_call
+    HedgeStats.reset()
+    cancelled = threading.Event()
+    slot_free = threading.Event()
+    sent = []
+
+    def queued_primary():
+        slot_free.wait(2)  # stands in for waiting on the rate limiter
+        if cancelled.is_set():
+            raise HedgeCancelledError("no longer needed")
+        sent.append("primary")
+        return "late"
+
+    result = hedged_call(queued_primary, lambda: "hedge", 0.01, cancelled=cancelled, tokens=lambda r: 10)
+    slot_free.set()
+    time.sleep(0.05)
+
+    assert result == "hedge" and sent == []
+    assert HedgeStats.snapshot()["overhead_tokens"] == 0
+    HedgeStats.reset()
+
+
+def test_identical_concurrent_requests_share_one_call(monkeypatch):
+    from tools.single_flight import llm_request_key
+    assert llm_request_key("GPT-4o", "hi  \n", "sys") == llm_request_key("gpt-4o", "hi", "sys")
+    assert llm_request_key("gpt-4o", "hi", "sys") != llm_request_key("gpt-4o", "hello", "sys")
+
+    agent = DummyAgent(DummyConfig, MemoryManager())
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_openai(m, p, s="", **kw):
+        calls.append(p)
+        started.set()
+        release.wait(2)
+        return f"answer {len(calls)}"
+
+    monkeypatch.setattr(agent, "_call_openai_chat", slow_openai)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(agent.call_llm("same", model="gpt-4o")))
+               for _ in range(3)]
+    threads[0].start()
+    started.wait(2)
+    for t in threads[1:]:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == ["same"]
+    assert results == ["answer 1"] * 3
+
+
+def test_usage_ledger_records_calls_per_stage(monkeypatch):
+    from tools.circuit_breaker import CircuitBreaker
+    from tools.usage_ledger import UsageLedger, usage_context, estimate_cost
+    UsageLedger.reset_all()
+    CircuitBreaker.reset_all()
+    agent = DummyAgent(DummyConfig, MemoryManager())
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"message": {"content": "done"}, "prompt_eval_count": 12, "eval_count": 40,
+                    "eval_duration": 2_000_000_000, "load_duration": 100_000_000,
+                    "prompt_eval_duration": 400_000_000}
+
+    monkeypatch.setattr("requests.post", lambda **kw: FakeResponse())
+    monkeypatch.setattr(agent, "_call_openai_chat", lambda m, p, s="", **kw: "x" * 400)
+    with usage_context(project="demo", stage="coder"):
+        assert agent.call_llm("write code", model="qwen:7b") == "done"
+        agent.call_llm("review code", model="gpt-4o")
+
+    ledger = UsageLedger.get(DummyConfig)
+    by_model = {row["model"]: row for row in ledger.summary(by="model", project="demo")}
+    assert by_model["qwen:7b"]["prompt_tokens"] == 12
+    assert by_model["qwen:7b"]["avg_tokens_per_sec"] == 20
+    assert by_model["qwen:7b"]["cost"] == 0
+    assert by_model["gpt-4o"]["completion_tokens"] == 100  # estimated from the text
+    assert by_model["gpt-4o"]["cost"] == estimate_cost("gpt-4o", by_model["gpt-4o"]["prompt_tokens"], 100)
+    assert [row["stage"] for row in ledger.summary(by="stage", project="demo")] == ["coder"]
+    UsageLedger.reset_all()
+
+
+def test_usage_ledger_keeps_only_newest_rows(tmp_path):
+    from tools.usage_ledger import UsageLedger, usage_context
+    ledger = UsageLedger(str(tmp_path / "usage.db"), max_rows=3)
+    for i in range(5):
+        with usage_context(project="demo", stage="coder" if i < 2 else "fixer"):
+            ledger.record("ollama", "qwen:7b", 10, 20 + i, latency=1.0)
+
+    assert ledger.conn.execute("SELECT COUNT(*) FROM llm_usage").fetchone()[0] == 3
+    assert ledger.summary(by="stage") == [{
+        "stage": "fixer", "prompt_tokens": 30, "completion_tokens": 69, "cost": 0.0,
+        "calls": 3, "avg_latency": 1.0, "avg_tokens_per_sec": 23.0,
+    }]
+
+    memory_only = UsageLedger(str(tmp_path / "missing" / "usage.db"), max_rows=2)
+    assert memory_only.conn is None
+    for _ in range(4):
+        memory_only.record("ollama", "qwen:7b", 10, 20, latency=1.0)
+    assert len(memory_only.rows) == 2
+    assert memory_only.summary(by="model")[0]["calls"] == 2
+
+
+def test_ollama_requests_pin_model_with_stable_options(monkeypatch):
+    from tools.circuit_breaker import CircuitBreaker
+    CircuitBreaker.reset_all()
+
+    class Cfg(DummyConfig):
+        OLLAMA_KEEP_ALIVE = "30m"
+        OLLAMA_NUM_CTX = 8192
+
+    agent = DummyAgent(Cfg, MemoryManager())
+    posts = []
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"message": {"content": "ok"}}
+
+    monkeypatch.setattr("requests.post", lambda url, **kw: posts.append((url, kw["json"])) or FakeResponse())
+    assert agent.load_ollama_model("qwen:7b")
+    agent.call_llm("first", model="qwen:7b", system="same system")
+
+    (load_url, load), (chat_url, chat) = posts
+    assert load_url == "http://localhost/api/generate"
+    assert chat_url == "http://localhost/api/chat"
+    assert load["keep_alive"] == chat["keep_alive"] == "30m"
+    assert load["options"] == chat["options"] and chat["options"]["num_ctx"] == 8192
+
+
+def test_adaptive_timeout_scales_with_observed_latency_and_output_budget():
+    from tools.latency_tracker import LatencyTracker, adaptive_timeout
+    from tools.output_budget import output_budget_for
+    LatencyTracker.reset()
+
+    class Cfg:
+        REQUEST_TIMEOUT = 60
+        ADAPTIVE_TIMEOUT = {"enabled": True, "quantile": 0.95, "multiplier": 2.0,
+                            "min_seconds": 5, "max_seconds": 600, "min_samples": 3}
+
+    # No data yet: the configured timeout, stretched only for large budgets.
+    assert adaptive_timeout("qwen:7b", "code", 500, Cfg) == 60
+    assert adaptive_timeout("qwen:7b", "code", 8000, Cfg) == 240
+
+    for _ in range(5):
+        LatencyTracker.record("qwen:7b", 4.0, "code", output_tokens=500)
+    assert adaptive_timeout("qwen:7b", "code", 500, Cfg) == 8.0      # small calls fail fast
+    assert adaptive_timeout("qwen:7b", "code", 5000, Cfg) == 80.0    # large ones get more time
+    assert adaptive_timeout("qwen:7b", "review", 100, Cfg) == 8.0    # other tasks use the model's data
+    assert adaptive_timeout("qwen:7b", "code", 500000, Cfg) == 600   # clamped
+
+    assert output_budget_for("requirements.txt") < output_budget_for("config.json") < output_budget_for("app.py")
+    assert output_budget_for(task="architecture") == 1500
+    LatencyTracker.reset()
+
+
+def test_call_llm_passes_budget_and_timeout_to_provider(monkeypatch):
+    from tools.circuit_breaker import CircuitBreaker
+    CircuitBreaker.reset_all()
+    agent = DummyAgent(DummyConfig, MemoryManager())
+    seen = {}
+
+    def fake_ollama(m, p, s="", max_tokens=None, timeout=None, schema=None):
+        seen.update(options=agent._ollama_options(max_tokens), timeout=timeout, schema=schema)
+        return "ok"
+
+    monkeypatch.setattr(agent, "_call_ollama_chat", fake_ollama)
+    agent.call_llm("budget", model="qwen:7b", max_tokens=300, task="code")
+    assert seen["options"]["num_predict"] == 300
+    assert seen["timeout"] == 60
+    assert seen["schema"] is None
+
+
+def test_extract_json_handles_nesting_prose_and_trailing_commas():
+    agent = DummyAgent(DummyConfig, MemoryManager())
+    response = (
+        "Here is the plan:\n```json\n"
+        '{"project_name": "x", "tech_stack": {"backend": "fastapi",}, '
+        '"files": [{"path": "app.py", "description": "uses {braces}"},],}\n```'
+    )
+    plan = agent.extract_json_from_response(response)
+    assert plan["tech_stack"] == {"backend": "fastapi"}
+    assert plan["files"] == [{"path": "app.py", "description": "uses {braces}"}]
+
+
+def test_json_extractor_yields_values_early_and_repairs_truncation():
+    from tools.json_stream import JsonStreamExtractor, extract_json
+    extractor = JsonStreamExtractor()
+    assert extractor.feed('noise {"a": [1, {"b"') == []
+    assert extractor.feed(': 2}]} more') == [{"a": [1, {"b": 2}]}]
+
+    truncated = '{"files": [{"path": "a.py"}, {"path": "b.py", "descr'
+    assert extract_json(truncated) == {"files": [{"path": "a.py"}, {"path": "b.py"}]}
+
+    agent = DummyAgent(DummyConfig, MemoryManager())
+    listing = 'Files:\n[{"path": "a.py"}, {"path": "b.py"}]'
+    assert agent.extract_json_from_response(listing) == {"path": "a.py"}
+    assert agent.extract_json_from_response(listing, "[") == [{"path": "a.py"}, {"path": "b.py"}]
+
+
+def test_call_llm_json_constrains_ollama_output_and_validates_it(monkeypatch):
+    from tools.circuit_breaker import CircuitBreaker
+    from tools.output_schemas import PRODUCT_SCHEMA
+    CircuitBreaker.reset_all()
+    agent = DummyAgent(DummyConfig, MemoryManager())
+    payloads = []
+    replies = iter(['{"title": "Mug", "description": "A mug", "tags": ["kitchen"]}', '{"title": 3}', "plain"])
+
+    class FakeResponse:
+        def __init__(self, content):
+            self.content = content
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"message": {"content": self.content}}
+
+    monkeypatch.setattr(
+        "requests.post",
+        lambda url, **kw: payloads.append(kw["json"]) or FakeResponse(next(replies)),
+    )
+    spec = agent.call_llm_json("a mug", PRODUCT_SCHEMA, model="qwen:7b")
+    assert spec["tags"] == ["kitchen"]
+    assert payloads[0]["format"] == PRODUCT_SCHEMA
+
+    with pytest.raises(ValueError):
+        agent.call_llm_json("a bad mug", PRODUCT_SCHEMA, model="qwen:7b")
+    agent.call_llm("no schema", model="qwen:7b")
+    assert "format" not in payloads[-1]  # only the structured calls are constrained
+
+    assert BaseAgent._openai_response_format("gpt-4o", PRODUCT_SCHEMA)["json_schema"]["name"] == "product_spec"
+    assert BaseAgent._openai_response_format("gpt-3.5-turbo", PRODUCT_SCHEMA) == {"type": "json_object"}
@@ -1,3 +1,4 @@
+import pytest
 import os
 import types
 import io
@@ -61,3 +62,71 @@ def test_dashboard_upload_route(tmp_path):
     data = {'file': (io.BytesIO(b'test prompt'), 'bp.txt')}
     resp = client.post('/upload', data=data, content_type='multipart/form-data')
     assert resp.status_code == 202
+
+
+def test_retriever_bm25_passages_and_incremental_index(tmp_path):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    filler = '\n\n'.join('general notes about the project and its layout ' * 5 for _ in range(20))
+    (docs / 'guide.md').write_text(filler + '\n\nDeploy with docker compose and set the DATABASE_URL.\n')
+    (docs / 'faq.txt').write_text('Questions about deploy scripts.\n')
+    (docs / 'other.md').write_text('Unrelated text.\n')
+    index_path = str(tmp_path / 'index.json')
+
+    r = SimpleRetriever(index_path=index_path, passage_words=50)
+    assert len(r.index_folder(str(docs))) == 3
+    assert r.search('docker database') == [str(docs / 'guide.md')]
+    assert r.search('deploy', top_k=5)[:2] == [str(docs / 'faq.txt'), str(docs / 'guide.md')]
+    assert len(r.documents[str(docs / 'guide.md')]['passages']) > 1
+
+    reloaded = SimpleRetriever(index_path=index_path, passage_words=50)
+    assert reloaded.search('docker database') == [str(docs / 'guide.md')]
+    assert reloaded.index_folder(str(docs)) == []  # nothing changed on disk
+
+    (docs / 'faq.txt').unlink()
+    (docs / 'other.md').write_text('Kubernetes manifests live here.\n')
+    assert sorted(reloaded.index_folder(str(docs))) == [str(docs / 'faq.txt'), str(docs / 'other.md')]
+    assert reloaded.search('deploy') == [str(docs / 'guide.md')]
+    assert reloaded.search('kubernetes') == [str(docs / 'other.md')]
+    assert 'unrelated' not in reloaded.postings
+
+
+def test_retriever_hybrid_rerank_with_hashing_embedder(tmp_path):
+    np = pytest.importorskip('numpy')
+    from tools.embeddings import HashingEmbedder
+
+    vectors = HashingEmbedder(dim=64).embed(['deployment guide', 'deployment guide', ''])
+    assert vectors.dtype == np.float32 and np.allclose(vectors[0], vectors[1])
+    assert np.isclose(np.linalg.norm(vectors[0]), 1.0) and not vectors[2].any()
+
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    # BM25 prefers the shorter a.md; only b.md shares close word forms with the query
+    (docs / 'a.md').write_text('deploy the cache\n')
+    (docs / 'b.md').write_text('deploy deployments deployed today\n')
+    index_path = str(tmp_path / 'index.json')
+
+    lexical = SimpleRetriever()
+    lexical.index_folder(str(docs))
+    assert lexical.search('deploy deployment', top_k=2)[0] == str(docs / 'a.md')
+    hybrid = SimpleRetriever(index_path=index_path, embedder='hashing', dense_weight=0.8, lexical_weight=0.2)
+    hybrid.index_folder(str(docs))
+    assert hybrid.search('deploy deployment', top_k=2)[0] == str(docs / 'b.md')
+    assert hybrid.vectors.dtype == np.float32
+
+    reloaded = SimpleRetriever(index_path=index_path, embedder='hashing', dense_weight=0.8, lexical_weight=0.2)
+    assert isinstance(reloaded.vectors, np.memmap)
+    assert reloaded.search('deploy deployment', top_k=2) == hybrid.search('deploy deployment', top_k=2)
+    (docs / 'a.md').write_text('deploy deploy the deployment cache\n')
+    reloaded.index_folder(str(docs))
+    assert reloaded.row_count == 2 and not reloaded.free_rows
+
+
+def test_retriever_without_numpy_stays_lexical(tmp_path, monkeypatch):
+    import tools.retriever as retriever
+    monkeypatch.setattr(retriever, 'np', None)
+    (tmp_path / 'a.txt').write_text('hello world')
+    r = SimpleRetriever(embedder='hashing')
+    assert r.embedder is None
+    r.index_folder(str(tmp_path))
+    assert r.search('hello') == [str(tmp_path / 'a.txt')]
@@ -0,0 +1,281 @@
+import main
+
+
+class FakeFixer:
+    def __init__(self):
+        self.tokens_used = {}
+        self.forgotten = []
+        self.calls = []
+
+    def fix_code(self, paths, results):
+        self.calls.append(list(paths))
+        return {p: "fixed" for p in paths}
+
+    def forget_fixes(self, paths):
+        self.forgotten.extend(paths)
+
+    def reset(self):
+        self.tokens_used = {}
+
+
+class FakeTester:
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.calls = []
+
+    def run_tests(self, paths):
+        self.calls.append(list(paths))
+        return {p: self.outcomes[p].pop(0) for p in paths}
+
+
+def _failed(msg):
+    return {"status": "failed", "message": msg}
+
+
+def test_fix_loop_retests_only_failing_files_and_detects_oscillation():
+    orch = main.AgencyOrchestrator()
+    fixer = FakeFixer()
+    tester = FakeTester({
+        "a.py": [{"status": "passed"}],
+        "b.py": [_failed("TypeError: x"), _failed("NameError: y")],
+    })
+    orch.agents = {"fixer": fixer, "tester": tester}
+    results = {"a.py": _failed("NameError: y"), "b.py": _failed("NameError: y"), "c.py": {"status": "passed"}}
+
+    repair = orch._run_fix_loop(results)
+
+    assert tester.calls == [["a.py", "b.py"], ["b.py"]]
+    assert repair["fixed"] == ["a.py"]
+    assert repair["unresolved"] == {"b.py": "oscillating"}
+    assert results["a.py"]["status"] == "passed"
+    assert "b.py" in fixer.forgotten
+
+
+def test_fix_loop_respects_attempt_budget(monkeypatch):
+    orch = main.AgencyOrchestrator()
+    monkeypatch.setattr(orch.config, "FIX_MAX_ATTEMPTS", 2, raising=False)
+    fixer = FakeFixer()
+    tester = FakeTester({"a.py": [_failed("E1"), _failed("E2")]})
+    orch.agents = {"fixer": fixer, "tester": tester}
+
+    repair = orch._run_fix_loop({"a.py": _failed("E0")})
+
+    assert repair["rounds"] == 2
+    assert repair["unresolved"] == {"a.py": "attempt budget exhausted"}
+
+
+def test_fix_loop_starts_with_fresh_token_budget():
+    orch = main.AgencyOrchestrator()
+    fixer = FakeFixer()
+    fixer.tokens_used = {"a.py": 10 ** 9}  # spent by an earlier run of the pooled agent
+    tester = FakeTester({"a.py": [_failed("E1"), {"status": "passed"}]})
+    orch.agents = {"fixer": fixer, "tester": tester}
+
+    repair = orch._run_fix_loop({"a.py": _failed("E0")})
+
+    assert repair["fixed"] == ["a.py"]
+    assert repair["rounds"] == 2
+
+
+def test_run_preloads_local_models_in_parallel_and_releases_them():
+    orch = main.AgencyOrchestrator()
+
+    class FakeLoader:
+        def __init__(self):
+            self.loads = []
+
+        def load_ollama_model(self, model, keep_alive=None):
+            self.loads.append((model, keep_alive))
+            return model != "missing:1b"
+
+    class Cfg:
+        OLLAMA_PRELOAD = True
+        OLLAMA_KEEP_ALIVE = "30m"
+        OLLAMA_IDLE_KEEP_ALIVE = "5m"
+        CODE_MODEL = "qwen:7b"
+        FIX_MODEL = "gpt-4o"
+        REVIEW_MODEL = "missing:1b"
+        USE_GPT4_FOR_QA = True
+        OLLAMA_MODEL = "QWEN:7b"
+
+    loader = FakeLoader()
+    orch.config = Cfg
+    orch.agents = {"coder": loader}
+    assert orch._run_models() == ["missing:1b", "qwen:7b"]
+
+    preloaded = orch._preload_models()
+    assert preloaded == ["qwen:7b"]
+    orch._release_models(preloaded)
+    assert sorted(loader.loads) == [("missing:1b", "30m"), ("qwen:7b", "30m"), ("qwen:7b", "5m")]
+
+
+def test_agent_registry_constructs_agents_on_first_use():
+    from agents.registry import AgentRegistry
+
+    class Cfg:
+        OLLAMA_API_URL = "http://localhost"
+        SQLITE_PATH = ":memory:"
+
+    registry = AgentRegistry(Cfg, None, {
+        "tester": ("agents.tester", "TesterAgent"),
+        "broken": ("agents.does_not_exist", "Agent"),
+    }, optional={"broken"})
+    assert registry.loaded() == []
+    assert "broken" not in registry
+    assert registry.get("broken") is None
+
+    tester = registry["tester"]
+    assert registry["tester"] is tester
+    assert registry.loaded() == ["tester"]
+    assert sorted(registry) == ["broken", "tester"]
+
+
+def test_orchestrator_is_shared_and_runs_use_separate_project_dirs(tmp_path, monkeypatch):
+    import threading
+
+    assert main.get_orchestrator() is main.get_orchestrator()
+
+    orch = main.AgencyOrchestrator()
+    orch.setup_complete = True
+    base_dir = orch.config.PROJECTS_DIR
+    barrier = threading.Barrier(2)
+    seen = {}
+
+    def fake_pipeline(prompt, project_name, project_dir, manifest):
+        barrier.wait(timeout=5)
+        seen[prompt] = (orch.config.PROJECTS_DIR, orch.agents)
+        return {"status": "completed"}
+
+    monkeypatch.setattr(orch, "_run_pipeline", fake_pipeline)
+    threads = [threading.Thread(target=orch.run_project, args=(p, str(tmp_path))) for p in ("alpha app", "beta app")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert seen["alpha app"][0] != seen["beta app"][0]
+    assert all(d.startswith(str(tmp_path)) for d, _ in seen.values())
+    assert seen["alpha app"][1] is not seen["beta app"][1]
+    assert orch.config.PROJECTS_DIR == base_dir
+
+
+def test_resume_skips_completed_stages_and_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.Config, "SQLITE_PATH", str(tmp_path / "usage.db"), raising=False)
+    orch = main.AgencyOrchestrator()
+    orch.setup_complete = True
+    monkeypatch.setattr(orch, "_preload_models", lambda: [])
+    calls = {"architect": 0, "coder": []}
+    crash = {"on": "b.py"}
+
+    class Architect:
+        def generate_plan(self, prompt):
+            calls["architect"] += 1
+            return {"files": [{"path": "a.py"}, {"path": "b.py"}]}
+
+    class Coder:
+        def execute_plan(self, plan, done=(), on_file=None):
+            written = list(done)
+            for spec in plan["files"]:
+                path = spec["path"]
+                if path in done:
+                    continue
+                if path == crash["on"]:
+                    raise RuntimeError("connection reset")
+                (tmp_path / "proj" / path).write_text("print(1)\n")
+                calls["coder"].append(path)
+                on_file(path)
+                written.append(path)
+            return written
+
+    class Passthrough:
+        def check_text(self, text):
+            return True
+
+        def run_tests(self, paths):
+            return {p: {"status": "passed"} for p in paths}
+
+        def log_event(self, event):
+            pass
+
+    agents = {"architect": Architect(), "coder": Coder(), "failsafe": Passthrough(),
+              "tester": Passthrough(), "evolution": Passthrough()}
+    monkeypatch.setattr(orch, "_checkout_workspace", lambda: (main.RunConfig(main.Config), agents))
+    project_dir = tmp_path / "proj"
+    project_dir.mkdir()
+
+    first = orch._run_in_workspace(main.RunManifest.start(str(project_dir), "two files", "proj"))
+    assert first["status"] == "failed"
+
+    crash["on"] = None
+    resumed = orch.resume_project(str(project_dir))
+
+    assert resumed["status"] == "success"
+    assert calls == {"architect": 1, "coder": ["a.py", "b.py"]}
+    assert main.RunManifest.load(str(project_dir)).data["status"] == "success"
+
+
+def test_continue_project_regenerates_only_changed_files_and_dependents(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.Config, "SQLITE_PATH", str(tmp_path / "usage.db"), raising=False)
+    monkeypatch.setattr(main.Config, "USE_GPT4_FOR_QA", False, raising=False)
+    project_dir = tmp_path / "proj"
+    (project_dir / "app").mkdir(parents=True)
+    (project_dir / "app" / "models.py").write_text("class User: pass\n")
+    (project_dir / "app" / "routes.py").write_text("from app.models import User\n")
+    (project_dir / "cli.py").write_text("print('hi')\n")
+    (project_dir / "old.py").write_text("pass\n")
+    old_plan = {"files": [
+        {"path": "app/models.py", "description": "User model"},
+        {"path": "app/routes.py", "description": "Routes"},
+        {"path": "cli.py", "description": "CLI"},
+        {"path": "old.py", "description": "Legacy"},
+    ]}
+    manifest = main.RunManifest.start(str(project_dir), "user app", "proj")
+    manifest.complete_stage("planning", old_plan)
+    manifest.complete_stage("testing", {p["path"]: {"status": "passed"} for p in old_plan["files"]})
+
+    new_plan = {"files": [
+        {"path": "app/models.py", "description": "User model with email"},
+        {"path": "app/routes.py", "description": "Routes"},
+        {"path": "cli.py", "description": "CLI"},
+    ]}
+    generated, tested = [], []
+
+    class Architect:
+        def revise_plan(self, change, previous):
+            assert previous == old_plan
+            return new_plan
+
+    class Coder:
+        def execute_plan(self, plan, done=(), on_file=None, only=None):
+            assert plan == new_plan
+            paths = [f["path"] for f in plan["files"] if f["path"] in only]
+            generated.extend(paths)
+            return paths
+
+    class Passthrough:
+        def check_text(self, text):
+            return True
+
+        def run_tests(self, paths):
+            tested.extend(paths)
+            return {p: {"status": "passed"} for p in paths}
+
+        def log_event(self, event):
+            pass
+
+    orch = main.AgencyOrchestrator()
+    orch.setup_complete = True
+    monkeypatch.setattr(orch, "_preload_models", lambda: [])
+    agents = {"architect": Architect(), "coder": Coder(), "failsafe": Passthrough(),
+              "tester": Passthrough(), "evolution": Passthrough()}
+    monkeypatch.setattr(orch, "_checkout_workspace", lambda: (main.RunConfig(main.Config), agents))
+
+    results = orch.continue_project(str(project_dir), "add an email field to users")
+
+    assert results["status"] == "success"
+    assert sorted(generated) == ["app/models.py", "app/routes.py"]
+    assert sorted(tested) == ["app/models.py", "app/routes.py"]
+    assert not (project_dir / "old.py").exists()
+    stored = main.RunManifest.load(str(project_dir))
+    assert stored.stage_output("planning") == new_plan
+    assert sorted(stored.stage_output("testing")) == ["app/models.py", "app/routes.py", "cli.py"]
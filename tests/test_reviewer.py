@@ -0,0 +1,106 @@
+from agents.memory import MemoryManager
+from agents.reviewer import ReviewerAgent, review_policy
+from tools.review_packer import pack_files, split_code, split_review
+
+
+class DummyConfig:
+    GPT4_API_KEY = "test-key"
+    OLLAMA_API_URL = "http://localhost"
+    PROJECTS_DIR = ""
+    SQLITE_PATH = ":memory:"
+    REVIEW_TOKEN_BUDGET = 6000
+
+
+def test_review_policy():
+    assert review_policy(".gitignore") == "skip"
+    assert review_policy("docs/README.md") == "skip"
+    assert review_policy("requirements.txt") == "review"
+    assert review_policy("app/main.py") == "review"
+
+
+def test_split_code_on_ast_boundaries():
+    code = "import os\n\n" + "\n".join(f"def f{i}():\n    return {i}\n" for i in range(20))
+    chunks = split_code("big.py", code, 40)
+    assert len(chunks) > 1
+    assert chunks[0]["start"] == 1 and chunks[-1]["end"] == len(code.splitlines())
+    for chunk in chunks[1:]:
+        assert chunk["code"].startswith("def ")
+
+
+def test_pack_and_split_review():
+    requests = pack_files({"a.json": "{}", "b.yml": "a: 1"}, 1000)
+    assert len(requests) == 1
+    response = "### FILE: a.json (lines 1-1)\nfine\n### FILE: b.yml (lines 1-1)\nindent issue"
+    reviews = split_review(response, requests[0])
+    assert reviews[("a.json", 1, 1)] == "fine"
+    assert reviews[("b.yml", 1, 1)] == "indent issue"
+
+
+def test_split_review_never_shares_a_section_between_chunks():
+    chunks = [
+        {"path": "big.py", "start": 1, "end": 40, "code": ""},
+        {"path": "big.py", "start": 41, "end": 80, "code": ""},
+    ]
+    ranged = "### FILE: big.py (lines 41-80)\nlate\n### FILE: big.py (lines 1-40)\nearly"
+    assert split_review(ranged, chunks) == {("big.py", 1, 40): "early", ("big.py", 41, 80): "late"}
+    assert split_review("### FILE: big.py\nwhole file", chunks) == {("big.py", 1, 40): "whole file"}
+
+
+def test_pack_files_limits_chunks_per_request():
+    files = {f"f{i}.json": "{}" for i in range(5)}
+    requests = pack_files(files, 1000, max_chunks=2)
+    assert [len(r) for r in requests] == [2, 2, 1]
+
+
+def test_review_max_tokens_capped_at_model_limit(tmp_path, monkeypatch):
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    reviewer = ReviewerAgent(DummyConfig, MemoryManager())
+    reviewer.model = "claude-3-haiku"
+    budgets = []
+    monkeypatch.setattr(reviewer, "_call_review_llm", lambda label, prompt, max_tokens: budgets.append(max_tokens) or "")
+    chunks = [{"path": f"f{i}.py", "start": 1, "end": 1, "code": "x = 1"} for i in range(4)]
+    reviewer._review_packed(chunks)
+    assert budgets[0] == 4096
+
+
+def test_unmatched_chunks_are_re_requested_alone(tmp_path, monkeypatch):
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    reviewer = ReviewerAgent(DummyConfig, MemoryManager())
+    chunks = pack_files({"a.json": "{}", "b.yml": "a: 1"}, 1000)[0]
+    assert split_review("### FILE: a.json (lines 1-1)\nfine", chunks) == {("a.json", 1, 1): "fine"}
+
+    prompts = []
+
+    def fake_llm(prompt, model="", system="", **kwargs):
+        prompts.append(prompt)
+        return "### FILE: a.json (lines 1-1)\nfine" if len(prompts) == 1 else "indent issue"
+
+    monkeypatch.setattr(reviewer, "call_llm", fake_llm)
+    reviews = reviewer._review_packed(chunks)
+    assert reviews == {("a.json", 1, 1): "fine", ("b.yml", 1, 1): "indent issue"}
+    assert len(prompts) == 2 and "a.json" not in prompts[1]
+
+
+def test_review_skips_unchanged_and_trivial_files(tmp_path, monkeypatch):
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    (tmp_path / "app.py").write_text("print('hi')")
+    (tmp_path / ".gitignore").write_text("*.pyc")
+    (tmp_path / "package.json").write_text("{}")
+    reviewer = ReviewerAgent(DummyConfig, MemoryManager())
+    prompts = []
+
+    def fake_llm(prompt, model="", system="", **kwargs):
+        prompts.append(prompt)
+        return "### FILE: app.py (lines 1-1)\nlooks fine\n### FILE: package.json (lines 1-1)\nok json"
+
+    monkeypatch.setattr(reviewer, "call_llm", fake_llm)
+    files = ["app.py", ".gitignore", "package.json"]
+    first = reviewer.review_code(files)
+    assert first["app.py"] == "looks fine"
+    assert first["package.json"] == "ok json"
+    assert "Skipped" in first[".gitignore"]
+    assert len(prompts) == 1
+
+    second = reviewer.review_code(files)
+    assert second == first
+    assert len(prompts) == 1
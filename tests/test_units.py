@@ -79,3 +79,108 @@ def test_rl_optimizer_update():
     rl.update("s1", "a1", 1.0, "s2")
     rl.update("s1", "a1", 1.0, "s2")
     assert rl.select_action("s1", ["a1", "a2"]) == "a1"
+
+
+def test_interface_summaries_cached_and_packed(tmp_path, monkeypatch):
+    import tools.context_loader as context_loader
+    from tools.context_loader import ContextLoader
+
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    (tmp_path / "models.py").write_text(
+        "import os\nLIMIT = 5\n\nclass Todo:\n    title: str\n\n    def done(self, flag: bool = True) -> None:\n"
+        "        self._mark(flag)\n\n    def _mark(self, flag):\n        pass\n\ndef _helper():\n    pass\n"
+    )
+    (tmp_path / "api.ts").write_text(
+        "// export function hidden() {}\nimport { Todo } from './models';\n"
+        "export async function fetchTodos(url: string): Promise<Todo[]> {\n  return [];\n}\n"
+        "export class Client {\n  base = '';\n  #token = '';\n  get(path) { return fetch(path); }\n}\n"
+        "export const parse = (raw, strict) => JSON.parse(raw);\nfunction internal() {}\n"
+    )
+    loader = ContextLoader(DummyConfig, None)
+
+    python = loader.summarize_interface("models.py", (tmp_path / "models.py").read_text())
+    assert python.splitlines() == [
+        "LIMIT = ...", "class Todo:", "    title: str", "    def done(self, flag: bool=True) -> None",
+    ]
+    assert loader.summarize_interface("api.ts", (tmp_path / "api.ts").read_text()).splitlines() == [
+        "export async function fetchTodos(url: string): Promise<Todo[]>",
+        "export class Client { base; get(path) }",
+        "export const parse = (raw, strict) =>",
+    ]
+
+    calls = []
+    monkeypatch.setattr(context_loader, "python_interface", lambda code: calls.append(code) or ["x"])
+    assert loader.summarize_interface("other.py", (tmp_path / "models.py").read_text()) == python
+    assert calls == []  # same content: served from the hash cache
+
+    packed = loader.build_interface_context(["models.py", "api.ts"], max_tokens=1000)
+    assert packed.startswith("# models.py\nLIMIT = ...") and "# api.ts" in packed
+    tight = loader.build_interface_context(["models.py", "api.ts"], max_tokens=16)
+    assert tight == "# models.py\nLIMIT = ...\nclass Todo:"
+
+
+def test_symbol_index_incremental_and_persistent(tmp_path, monkeypatch):
+    import tools.symbol_index as symbol_index
+    from tools.symbol_index import SymbolIndex
+
+    (tmp_path / "shop").mkdir()
+    (tmp_path / "shop" / "cart.py").write_text(
+        "TAX = 0.2\n\nclass Cart:\n    def total(self):\n        return price(1) * TAX\n"
+    )
+    (tmp_path / "shop" / "prices.py").write_text("def price(n):\n    return n\n")
+    (tmp_path / "ui.js").write_text("import { total } from './cart';\nexport function render(cart) {\n  return total(cart);\n}\n")
+
+    cache = str(tmp_path / "cache")
+    index = SymbolIndex.load(str(tmp_path), cache)
+    assert sorted(index.refresh()) == [os.path.join("shop", "cart.py"), os.path.join("shop", "prices.py"), "ui.js"]
+    total = index.definitions("Cart.total")[0]
+    assert (total["path"], total["line"], total["end_line"], total["kind"]) == (os.path.join("shop", "cart.py"), 4, 5, "method")
+    assert index.definitions("render")[0]["kind"] == "function"
+    assert index.symbol_at(os.path.join("shop", "cart.py"), 5)["qualname"] == "Cart.total"
+    index.save()
+
+    parsed = []
+    original = symbol_index._python_entries
+    monkeypatch.setattr(symbol_index, "_python_entries", lambda code: parsed.append(code) or original(code))
+    assert os.path.dirname(index.path).startswith(cache)
+    reloaded = SymbolIndex.load(str(tmp_path), cache)
+    assert reloaded.refresh() == [] and parsed == []
+    assert reloaded.definitions("price")[0]["end_line"] == 2
+
+    (tmp_path / "shop" / "prices.py").write_text("def cost(n):\n    return n\n")
+    (tmp_path / "ui.js").unlink()
+    assert sorted(reloaded.refresh()) == [os.path.join("shop", "prices.py"), "ui.js"]
+    assert len(parsed) == 1
+    assert reloaded.definitions("price") == [] and reloaded.definitions("cost")
+    assert reloaded.definitions("render") == []
+
+
+def test_load_code_snippets_parallel_cached_and_mapped(tmp_path, monkeypatch):
+    import tools.context_loader as context_loader
+    from tools.context_loader import ContextLoader
+
+    DummyConfig.PROJECTS_DIR = str(tmp_path)
+    (tmp_path / "a.py").write_bytes(b"one\r\ntwo\r\nthree\r\n")
+    (tmp_path / "big.txt").write_text("".join(f"line {i}\n" for i in range(1, 2001)))
+    loader = ContextLoader(DummyConfig, None)
+
+    decoded = []
+    original = context_loader._decode
+    monkeypatch.setattr(context_loader, "_decode", lambda raw: decoded.append(len(raw)) or original(raw))
+    monkeypatch.setattr(context_loader, "MMAP_THRESHOLD", 1024)
+
+    snippets = loader.load_code_snippets(["big.txt", "missing.py", "a.py"], line_ranges={"big.txt": (1999, 2005)})
+    assert list(snippets) == ["big.txt", "missing.py", "a.py"]
+    assert snippets["big.txt"] == "line 1999\nline 2000"
+    assert snippets["missing.py"] is None
+    assert snippets["a.py"] == "one\ntwo\nthree\n"
+    # Only the requested slice of the mapped file is decoded
+    assert sorted(decoded) == [len(b"one\r\ntwo\r\nthree\r\n"), len("line 1999\nline 2000\n")]
+
+    decoded.clear()
+    assert loader.read_lines("a.py", 2, 3) == "two\nthree"
+    assert loader.load_code_snippets(["a.py"])["a.py"] == "one\ntwo\nthree\n"
+    assert decoded == []  # unchanged file served from the cache
+
+    (tmp_path / "a.py").write_bytes(b"changed\n")
+    assert loader.load_code_snippets(["a.py"])["a.py"] == "changed\n"
@@ -0,0 +1,189 @@
+# circuit_breaker.py
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker driven by a rolling error rate and latency.
+
+    * closed: requests flow; outcomes are recorded in a rolling window.
+    * open: requests are rejected immediately so callers fail over at once.
+      After ``open_seconds`` a background probe (if registered) checks the
+      provider, otherwise the breaker moves to half-open on the next request.
+    * half_open: a single trial request is let through; success closes the
+      breaker, failure opens it again.
+
+    Calls that overrun their own request timeout (``slow_call_seconds`` when
+    the caller gives none) count as failures, so a provider that hangs past
+    the timeout trips the breaker even if it eventually answers.
+    """
+
+    _registry: Dict[str, "CircuitBreaker"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name: str, window: int = 20, min_calls: int = 4, error_threshold: float = 0.5,
+                 slow_call_seconds: float = 0, open_seconds: float = 30):
+        self.name = name
+        self.window = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.probe: Optional[Callable[[], bool]] = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name: str, config=None) -> "CircuitBreaker":
+        """Return the process-wide breaker for a provider."""
+        with cls._registry_lock:
+            if name not in cls._registry:
+                settings = getattr(config, "CIRCUIT_BREAKER", None) or {}
+                cls._registry[name] = cls(name, **settings)
+            return cls._registry[name]
+
+    @classmethod
+    def reset_all(cls) -> None:
+        """Forget every breaker (used by tests and after config changes)."""
+        with cls._registry_lock:
+            cls._registry.clear()
+
+    def set_probe(self, probe: Callable[[], bool]) -> None:
+        """Register a cheap health check used to detect recovery while open."""
+        self.probe = probe
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent to this provider now."""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+            # half-open: let exactly one trial request through
+            if self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def record_success(self, latency: float = 0.0, timeout: float = 0) -> None:
+        limit = timeout or self.slow_call_seconds
+        if limit and latency > limit:
+            logger.warning(f"🐢 {self.name} answered in {latency:.1f}s; counting as a failure")
+            self.record_failure(latency)
+            return
+        with self.lock:
+            self.latencies.append(latency)
+            if self.state != CLOSED:
+                logger.info(f"✅ Circuit for {self.name} closed")
+                self.window.clear()
+            self.state = CLOSED
+            self.trial_in_flight = False
+            self.window.append(True)
+
+    def record_failure(self, latency: float = 0.0) -> None:
+        with self.lock:
+            self.latencies.append(latency)
+            self.window.append(False)
+            if self.state == HALF_OPEN or self._should_trip():
+                self._open()
+
+    def release(self) -> None:
+        """
+        Finish a request without counting it for or against the provider.
+
+        Used for errors that say nothing about the provider's health, such
+        as a request for a model it does not have.
+        """
+        with self.lock:
+            self.trial_in_flight = False
+
+    def _should_trip(self) -> bool:
+        return self.state == CLOSED and len(self.window) >= self.min_calls and self.error_rate() >= self.error_threshold
+
+    def _open(self) -> None:
+        """Open the breaker and start background probing. Caller holds the lock."""
+        if self.state != OPEN:
+            logger.warning(f"🚫 Circuit for {self.name} opened (error rate {self.error_rate():.0%})")
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+        if self.probe and not self.probing:
+            self.probing = True
+            threading.Thread(target=self._probe_loop, daemon=True).start()
+
+    def _probe_loop(self) -> None:
+        """Probe an open provider in the background until it recovers."""
+        try:
+            while True:
+                time.sleep(self.open_seconds)
+                with self.lock:
+                    if self.state != OPEN:
+                        return
+                try:
+                    healthy = bool(self.probe())
+                except Exception as e:
+                    logger.debug(f"Probe for {self.name} failed: {e}")
+                    healthy = False
+                with self.lock:
+                    if self.state != OPEN:
+                        return
+                    if healthy:
+                        logger.info(f"✅ Probe succeeded; circuit for {self.name} closed")
+                        self.state = CLOSED
+                        self.window.clear()
+                        return
+                    self.opened_at = time.monotonic()
+        finally:
+            self.probing = False
+
+    def is_open(self) -> bool:
+        """True while the breaker rejects requests (open and not yet due for a trial)."""
+        with self.lock:
+            return self.state == OPEN and time.monotonic() - self.opened_at < self.open_seconds
+
+    def error_rate(self) -> float:
+        if not self.window:
+            return 0.0
+        return self.window.count(False) / len(self.window)
+
+    def avg_latency(self) -> float:
+        if not self.latencies:
+            return 0.0
+        return sum(self.latencies) / len(self.latencies)
+
+    def health(self) -> float:
+        """Score in [0, 1] combining success rate and latency; 0 while open."""
+        if self.state == OPEN:
+            return 0.0
+        return (1.0 - self.error_rate()) / (1.0 + self.avg_latency() / 10.0)
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "error_rate": self.error_rate(),
+            "avg_latency": self.avg_latency(),
+            "health": self.health(),
+        }
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a request is rejected because the provider's breaker is open."""
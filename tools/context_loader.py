@@ -3,11 +3,80 @@
 import os
 import logging
 import ast
-from typing import List, Dict, Optional
+import hashlib
+import mmap
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+
+from agents.agent_base import estimate_tokens
+from tools.interface_summary import JS_EXTENSIONS, js_interface, python_interface
+from tools.plan_diff import file_references, module_key
+from tools.symbol_index import SKIPPED_DIRS, SymbolIndex
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Interface summaries by content hash, shared by all loaders in the process
+SUMMARY_CACHE_SIZE = 2048
+_summary_cache: "OrderedDict[str, List[str]]" = OrderedDict()
+_summary_lock = threading.Lock()
+
+# File contents by absolute path: (mtime_ns, size, sha256, text). Files of
+# MMAP_THRESHOLD bytes or more are memory-mapped on demand instead.
+FILE_CACHE_SIZE = 512
+MMAP_THRESHOLD = 1024 * 1024
+_file_cache: "OrderedDict[str, Tuple[int, int, str, str]]" = OrderedDict()
+_file_lock = threading.Lock()
+
+
+def _decode(raw: bytes) -> str:
+    # Same text a text-mode read would give: strict UTF-8, universal newlines
+    return raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _read_cached(full_path: str, stat: os.stat_result) -> str:
+    with _file_lock:
+        cached = _file_cache.get(full_path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            _file_cache.move_to_end(full_path)
+            return cached[3]
+
+    with open(full_path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    # Touched but unchanged (e.g. rewritten with the same code): keep the decoded text
+    text = cached[3] if cached and cached[2] == digest else _decode(raw)
+
+    with _file_lock:
+        _file_cache[full_path] = (stat.st_mtime_ns, stat.st_size, digest, text)
+        _file_cache.move_to_end(full_path)
+        while len(_file_cache) > FILE_CACHE_SIZE:
+            _file_cache.popitem(last=False)
+    return text
+
+
+def _read_mapped(full_path: str, line_range: Optional[Tuple[int, int]]) -> str:
+    with open(full_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if line_range is None:
+            return _decode(mapped[:])
+        start, end = line_range
+        offset = 0
+        for _ in range(max(start, 1) - 1):
+            offset = mapped.find(b"\n", offset) + 1
+            if offset == 0:
+                return ""
+        stop = offset
+        for _ in range(max(end - max(start, 1) + 1, 0)):
+            newline = mapped.find(b"\n", stop)
+            if newline == -1:
+                stop = len(mapped)
+                break
+            stop = newline + 1
+        return _decode(mapped[offset:stop]).rstrip("\n")
+
+
 class ContextLoader:
     """
     Loads source code files and extracts useful information for agent context prompts.
@@ -23,38 +92,83 @@ class ContextLoader:
         """
         self.config = config
         self.memory = memory
+        self._symbols = None
+        self._symbols_lock = threading.Lock()
 
-    def load_code_snippets(self, file_paths: List[str]) -> Dict[str, Optional[str]]:
+    def load_code_snippets(self, file_paths: List[str],
+                           line_ranges: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict[str, Optional[str]]:
         """
         Reads the contents of each file path, storing as dictionary entries.
 
+        Files are read in parallel (``CONTEXT_LOAD_WORKERS`` threads). Contents
+        are cached per process and reused while a file's modification time and
+        size are unchanged, or when a re-read shows the same content hash.
+        Files of ``MMAP_THRESHOLD`` bytes or more are memory-mapped and never
+        cached, and a requested line range is sliced straight out of the map.
+
         Args:
             file_paths (List[str]): List of relative file paths under config.PROJECTS_DIR.
+            line_ranges (Dict[str, Tuple[int, int]]): Optional 1-based, inclusive
+                ``(start, end)`` line ranges for some of the paths; only those
+                lines are returned for them.
 
         Returns:
             Dict[str, str | None]: Mapping of file path to contents, or None if unreadable.
         """
-        context = {}
+        line_ranges = line_ranges or {}
+        paths = list(dict.fromkeys(file_paths))
+        workers = getattr(self.config, "CONTEXT_LOAD_WORKERS", 8)
+        if len(paths) > 1 and workers > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+                contents = list(executor.map(lambda p: self._load_file(p, line_ranges.get(p)), paths))
+        else:
+            contents = [self._load_file(p, line_ranges.get(p)) for p in paths]
+        return dict(zip(paths, contents))
 
-        for path in file_paths:
-            full_path = os.path.join(self.config.PROJECTS_DIR, path)
+    def read_lines(self, path: str, start: int, end: int) -> Optional[str]:
+        """Lines ``start`` to ``end`` (1-based, inclusive) of a project file, or None if unreadable."""
+        return self._load_file(path, (start, end))
 
-            if not os.path.isfile(full_path):
-                logger.warning(f"⚠️ Skipped (not a file): {path}")
-                context[path] = None
-                continue
+    def _load_file(self, path: str, line_range: Optional[Tuple[int, int]] = None) -> Optional[str]:
+        full_path = os.path.join(self.config.PROJECTS_DIR, path)
+
+        if not os.path.isfile(full_path):
+            logger.warning(f"⚠️ Skipped (not a file): {path}")
+            return None
+
+        try:
+            stat = os.stat(full_path)
+            if stat.st_size >= MMAP_THRESHOLD:
+                return _read_mapped(full_path, line_range)
+            text = _read_cached(full_path, stat)
+        except FileNotFoundError:
+            logger.warning(f"❌ File not found: {path}")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Error loading {path}: {e}")
+            return None
+
+        if line_range is None:
+            return text
+        start, end = line_range
+        return "\n".join(text.split("\n")[max(start, 1) - 1:end])
 
-            try:
-                with open(full_path, "r", encoding="utf-8") as f:
-                    context[path] = f.read()
-            except FileNotFoundError:
-                logger.warning(f"❌ File not found: {path}")
-                context[path] = None
-            except Exception as e:
-                logger.error(f"❌ Error loading {path}: {e}")
-                context[path] = None
+    def symbol_index(self) -> SymbolIndex:
+        """
+        The project's symbol index, updated for files changed since last use.
+
+        The index is loaded from ``CACHE_DIR`` once per loader and saved back
+        whenever a refresh changed it.
 
-        return context
+        Returns:
+            SymbolIndex: Index of config.PROJECTS_DIR.
+        """
+        with self._symbols_lock:
+            if self._symbols is None or self._symbols.project_dir != self.config.PROJECTS_DIR:
+                self._symbols = SymbolIndex.load(self.config.PROJECTS_DIR, getattr(self.config, "CACHE_DIR", "./cache"))
+            if self._symbols.refresh():
+                self._symbols.save()
+            return self._symbols
 
     def extract_definitions(self, code: str) -> List[str]:
         """
@@ -71,4 +185,98 @@ class ContextLoader:
             return [node.name for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.ClassDef))]
         except SyntaxError as e:
             logger.error(f"❌ Failed to parse code: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def summarize_interface(self, path: str, code: str, max_chars: int = 1500) -> str:
+        """
+        Compact summary of what a file offers to the files that use it.
+
+        Python files are reduced (via ``ast``) to their constants, public
+        signatures and class members; JavaScript and TypeScript files to their
+        export declarations. Other files, or code that yields nothing, are
+        represented by their first lines. Summaries are cached by content
+        hash, so unchanged files are only summarized once per process.
+
+        Args:
+            path (str): File path, used to pick the language.
+            code (str): File contents.
+            max_chars (int): Upper bound on the summary length.
+
+        Returns:
+            str: The summary.
+        """
+        ext = os.path.splitext(path)[1].lower()
+        key = hashlib.sha256(f"{ext}\0{code}".encode("utf-8", "replace")).hexdigest()
+        with _summary_lock:
+            lines = _summary_cache.get(key)
+            if lines is not None:
+                _summary_cache.move_to_end(key)
+
+        if lines is None:
+            if ext == ".py":
+                lines = python_interface(code)
+            elif ext in JS_EXTENSIONS:
+                lines = js_interface(code)
+            if not lines:
+                lines = code.strip().splitlines()[:20]
+            with _summary_lock:
+                _summary_cache[key] = lines
+                while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+                    _summary_cache.popitem(last=False)
+
+        summary = "\n".join(lines)
+        if len(summary) > max_chars:
+            summary = summary[:max_chars].rsplit("\n", 1)[0] + "\n..."
+        return summary
+
+    def build_interface_context(self, file_paths: List[str], max_tokens: int) -> str:
+        """
+        Pack interface summaries of ``file_paths`` into a prompt section.
+
+        Files are added in the given order, most important first. A summary
+        that does not fit the remaining budget is cut down to its top-level
+        lines, and dropped if even that does not fit.
+
+        Args:
+            file_paths (List[str]): Relative paths under config.PROJECTS_DIR.
+            max_tokens (int): Token budget for the whole section.
+
+        Returns:
+            str: One ``# path`` section per included file; empty if none fit.
+        """
+        sections, used = [], 0
+        for path, code in self.load_code_snippets(file_paths).items():
+            if code is None:
+                continue
+            summary = self.summarize_interface(path, code)
+            for candidate in (summary, "\n".join(l for l in summary.splitlines() if not l.startswith(" "))):
+                section = f"# {path}\n{candidate}"
+                tokens = estimate_tokens(section)
+                if used + tokens <= max_tokens:
+                    sections.append(section)
+                    used += tokens
+                    break
+            else:
+                logger.info(f"✂️ Interface of {path} left out of the prompt (token budget {max_tokens})")
+        return "\n\n".join(sections)
+
+    def referenced_files(self, path: str, code: str) -> List[str]:
+        """
+        Project files that the file at ``path`` imports or links to.
+
+        Args:
+            path (str): Relative path of the file.
+            code (str): Its contents.
+
+        Returns:
+            List[str]: Relative paths under config.PROJECTS_DIR, sorted.
+        """
+        refs = file_references(path, code)
+        found = set()
+        for root, dirs, files in os.walk(self.config.PROJECTS_DIR):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d not in SKIPPED_DIRS]
+            for name in files:
+                rel = os.path.relpath(os.path.join(root, name), self.config.PROJECTS_DIR)
+                if rel != path and module_key(rel) in refs:
+                    found.add(rel)
+        return sorted(found)
@@ -0,0 +1,76 @@
+# embeddings.py
+
+import re
+import zlib
+import logging
+from typing import Callable, Dict, List
+
+try:
+    import numpy as np
+except ImportError:  # dense retrieval is optional
+    np = None
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+_WORD_RE = re.compile(r"[a-z0-9_]+")
+
+
+class HashingEmbedder:
+    """
+    Deterministic, offline text embedder.
+
+    Words and their character trigrams are hashed (CRC32, so vectors are the
+    same in every process) into ``dim`` signed buckets and the result is L2
+    normalized. It captures lexical overlap and close word forms rather than
+    meaning, which makes it a dependable default and test double for a
+    model-backed embedder.
+
+    Any object with a ``dim`` attribute and an ``embed(texts)`` method that
+    returns a ``(len(texts), dim)`` float32 array can be used in its place.
+    """
+
+    def __init__(self, dim: int = 256):
+        if np is None:
+            raise ImportError("numpy is required for embeddings")
+        self.dim = dim
+
+    def _features(self, text: str):
+        for word in _WORD_RE.findall(text.lower()):
+            yield word, 1.0
+            padded = f"<{word}>"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3], 0.5
+
+    def embed(self, texts: List[str]):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                digest = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, digest % self.dim] += weight if digest & 0x80000000 else -weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+# Embedder factories by name, for settings that name an embedder
+EMBEDDERS: Dict[str, Callable[[], object]] = {
+    "hashing": HashingEmbedder,
+}
+
+
+def register_embedder(name: str, factory: Callable[[], object]) -> None:
+    """Make an embedder available to ``get_embedder`` under ``name``."""
+    EMBEDDERS[name] = factory
+
+
+def get_embedder(name: str):
+    """
+    Create the embedder registered as ``name``.
+
+    Raises:
+        ValueError: If no embedder has that name.
+    """
+    if name not in EMBEDDERS:
+        raise ValueError(f"Unknown embedder '{name}'. Available: {', '.join(sorted(EMBEDDERS))}")
+    return EMBEDDERS[name]()
@@ -0,0 +1,226 @@
+# fix_cache.py
+
+import re
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Optional, Dict
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Patterns stripped from test output so the same failure hashes identically
+# regardless of where the project lives or which line it landed on.
+_PATH_RE = re.compile(r'File "[^"]+"')
+_LINE_RE = re.compile(r"\bline \d+")
+_ADDR_RE = re.compile(r"0x[0-9a-fA-F]+")
+_ABS_PATH_RE = re.compile(r"(?:[A-Za-z]:)?(?:[\\/][\w.\-]+){2,}")
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_code(code: str) -> str:
+    """Strip trailing whitespace and blank lines so cosmetic edits don't miss the cache."""
+    lines = [line.rstrip() for line in code.splitlines()]
+    return "\n".join(line for line in lines if line.strip())
+
+
+def error_signature(test_output) -> str:
+    """
+    Reduce test output to a stable error signature.
+
+    File paths, line numbers and memory addresses are removed and only the
+    traceback frames and final exception lines are kept.
+
+    Args:
+        test_output: Raw tester output, either a string or a result dict
+            with a ``message`` key.
+
+    Returns:
+        str: Normalized signature (empty if there is no output).
+    """
+    if isinstance(test_output, dict):
+        test_output = test_output.get("message", "")
+    text = str(test_output or "")
+
+    lines = []
+    for raw in text.splitlines():
+        line = _PATH_RE.sub('File "<path>"', raw)
+        line = _LINE_RE.sub("line <n>", line)
+        line = _ADDR_RE.sub("0x<addr>", line)
+        line = _ABS_PATH_RE.sub("<path>", line)
+        line = _WS_RE.sub(" ", line).strip()
+        if line:
+            lines.append(line)
+
+    # The exception line(s) at the bottom carry the signal; keep a short tail.
+    return "\n".join(lines[-6:])
+
+
+def make_fix_key(code: str, test_output) -> str:
+    """Build the cache key from the failing code and its error signature."""
+    digest = hashlib.sha256()
+    digest.update(normalize_code(code).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(error_signature(test_output).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PersistentLRUCache:
+    """
+    SQLite-backed string cache with LRU eviction and hit-rate metrics.
+
+    Entries live in the database configured by ``SQLITE_PATH`` so they
+    survive across runs and projects. Every cache table shares one schema
+    (key, value, meta, created, last_used, uses); subclasses must set the
+    table name and the config setting that bounds the number of entries.
+    """
+
+    TABLE: str = ""
+    MAX_ENTRIES_SETTING: str = ""
+
+    def __init__(self, config=None, db_path: Optional[str] = None, max_entries: Optional[int] = None):
+        if not self.TABLE or not self.MAX_ENTRIES_SETTING:
+            raise TypeError(f"{type(self).__name__} must set TABLE and MAX_ENTRIES_SETTING")
+        self.lock = threading.Lock()
+        self.max_entries = max_entries or getattr(config, self.MAX_ENTRIES_SETTING, 500)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.entries: Dict[str, str] = {}
+        self.conn = None
+
+        path = db_path or getattr(config, "SQLITE_PATH", "the_agency.db")
+        try:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+                "key TEXT PRIMARY KEY, value TEXT, meta TEXT, "
+                "created REAL, last_used REAL, uses INTEGER DEFAULT 0)"
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"❌ {type(self).__name__} DB connection failed, using memory only: {e}")
+            self.conn = None
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for ``key`` or None, updating hit statistics."""
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None and self.conn:
+                try:
+                    row = self.conn.execute(
+                        f"SELECT value FROM {self.TABLE} WHERE key=?", (key,)
+                    ).fetchone()
+                    if row:
+                        value = row[0]
+                        self.entries[key] = value
+                except sqlite3.Error as e:
+                    logger.error(f"❌ {type(self).__name__} read error: {e}")
+
+            if value is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.entries[key] = self.entries.pop(key)
+            if self.conn:
+                try:
+                    self.conn.execute(
+                        f"UPDATE {self.TABLE} SET last_used=?, uses=uses+1 WHERE key=?",
+                        (time.time(), key),
+                    )
+                    self.conn.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"❌ {type(self).__name__} update error: {e}")
+            return value
+
+    def put(self, key: str, value: str, meta: str = "") -> None:
+        """Store a value and evict the least recently used entries if needed."""
+        now = time.time()
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = value
+            if self.conn:
+                try:
+                    self.conn.execute(
+                        f"INSERT OR REPLACE INTO {self.TABLE} "
+                        "(key, value, meta, created, last_used, uses) VALUES (?, ?, ?, ?, ?, 0)",
+                        (key, value, meta, now, now),
+                    )
+                    self.conn.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"❌ {type(self).__name__} write error: {e}")
+            self._evict()
+
+    def discard(self, key: str) -> None:
+        """Forget an entry, e.g. when replaying it turned out to be wrong."""
+        with self.lock:
+            self.entries.pop(key, None)
+            if self.conn:
+                try:
+                    self.conn.execute(f"DELETE FROM {self.TABLE} WHERE key=?", (key,))
+                    self.conn.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"❌ {type(self).__name__} delete error: {e}")
+
+    def _evict(self) -> None:
+        """Drop least recently used entries beyond ``max_entries``. Caller holds the lock."""
+        if self.conn:
+            try:
+                count = self.conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+                overflow = count - self.max_entries
+                if overflow > 0:
+                    rows = self.conn.execute(
+                        f"SELECT key FROM {self.TABLE} ORDER BY last_used ASC LIMIT ?", (overflow,)
+                    ).fetchall()
+                    for (old_key,) in rows:
+                        self.entries.pop(old_key, None)
+                    self.conn.executemany(f"DELETE FROM {self.TABLE} WHERE key=?", rows)
+                    self.conn.commit()
+                    self.evictions += len(rows)
+            except sqlite3.Error as e:
+                logger.error(f"❌ {type(self).__name__} eviction error: {e}")
+        else:
+            # entries are re-inserted on every get/put, so the first key is the LRU one
+            while len(self.entries) > self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current hit rate."""
+        lookups = self.hits + self.misses
+        size = len(self.entries)
+        if self.conn:
+            try:
+                size = self.conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+            except sqlite3.Error:
+                pass
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": size,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if self.conn:
+            try:
+                self.conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"❌ Error closing {type(self).__name__} DB connection: {e}")
+            self.conn = None
+
+
+class FixCache(PersistentLRUCache):
+    """
+    Persistent cache of known fixes keyed on (code hash, error signature).
+
+    A fix learned in one project can be replayed in another without an LLM
+    round-trip. Bounded by ``FIX_CACHE_MAX_ENTRIES``.
+    """
+
+    TABLE = "fix_cache"
+    MAX_ENTRIES_SETTING = "FIX_CACHE_MAX_ENTRIES"
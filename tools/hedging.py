@@ -0,0 +1,126 @@
+# hedging.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+
+class HedgeCancelledError(RuntimeError):
+    """Raised by a hedged request that was still waiting to be sent when the other one won."""
+
+
+class HedgeStats:
+    """Process-wide counters for hedged LLM requests."""
+
+    _lock = threading.Lock()
+    calls = 0      # requests eligible for hedging
+    fired = 0      # hedges actually sent
+    hedge_wins = 0  # hedges that answered first
+    tokens = 0     # tokens of the answers used
+    overhead_tokens = 0  # tokens spent on losing requests that were already sent
+
+    @classmethod
+    def record(cls, fired: bool = False, hedge_won: bool = False, tokens: int = 0) -> None:
+        with cls._lock:
+            cls.calls += 1
+            cls.fired += int(fired)
+            cls.hedge_wins += int(hedge_won)
+            cls.tokens += tokens
+
+    @classmethod
+    def record_overhead(cls, tokens: int) -> None:
+        with cls._lock:
+            cls.overhead_tokens += tokens
+
+    @classmethod
+    def fired_fraction(cls) -> float:
+        with cls._lock:
+            return cls.fired / cls.calls if cls.calls else 0.0
+
+    @classmethod
+    def overhead_fraction(cls) -> float:
+        """Tokens spent on losing requests relative to the tokens of the answers used."""
+        with cls._lock:
+            return cls.overhead_tokens / cls.tokens if cls.tokens else 0.0
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        with cls._lock:
+            return {
+                "calls": cls.calls,
+                "fired": cls.fired,
+                "hedge_wins": cls.hedge_wins,
+                "win_rate": cls.hedge_wins / cls.fired if cls.fired else 0.0,
+                "tokens": cls.tokens,
+                "overhead_tokens": cls.overhead_tokens,
+            }
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls.calls = cls.fired = cls.hedge_wins = cls.tokens = cls.overhead_tokens = 0
+
+
+def _record_loser(future, tokens: Callable[[Optional[str]], int]) -> None:
+    """Count a losing request's tokens as hedge overhead once it finishes."""
+    if future.cancelled() or isinstance(future.exception(), HedgeCancelledError):
+        return
+    HedgeStats.record_overhead(tokens(None if future.exception() else future.result()))
+
+
+def hedged_call(primary: Callable[[], str], hedge: Callable[[], str], delay: float,
+                is_usable: Callable[[str], bool] = lambda r: True,
+                cancelled: Optional[threading.Event] = None,
+                tokens: Callable[[Optional[str]], int] = lambda r: 0) -> str:
+    """
+    Run ``primary``; if it has not finished after ``delay`` seconds, also run
+    ``hedge`` and return whichever usable answer arrives first.
+
+    Once there is a winner ``cancelled`` is set, so a loser still waiting for
+    a rate-limit slot gives up (raising ``HedgeCancelledError``) instead of
+    being sent. A loser already in flight cannot be interrupted; it is still
+    billed, so its ``tokens`` (of its response, or None if it failed) are
+    recorded as hedge overhead when it finishes.
+
+    Raises:
+        Exception: The primary's error if neither request produced a usable answer.
+    """
+    first = _executor.submit(primary)
+    done, _ = wait([first], timeout=delay)
+    if done:
+        result = first.result()
+        HedgeStats.record(tokens=tokens(result))
+        return result
+
+    logger.info(f"🏁 Primary slower than {delay:.2f}s; firing hedge request")
+    second = _executor.submit(hedge)
+    pending = {first, second}
+    primary_error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                result = future.result()
+            except Exception as e:
+                if future is first:
+                    primary_error = e
+                continue
+            if is_usable(result):
+                if cancelled is not None:
+                    cancelled.set()
+                for other in pending:
+                    if not other.cancel():
+                        other.add_done_callback(lambda f: _record_loser(f, tokens))
+                HedgeStats.record(fired=True, hedge_won=future is second, tokens=tokens(result))
+                return result
+
+    HedgeStats.record(fired=True)
+    if primary_error:
+        raise primary_error
+    return first.result()
@@ -0,0 +1,64 @@
+# import_benchmark.py
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Entry points whose startup time matters to users.
+DEFAULT_MODULES = ["config", "interfaces.cli_interface", "main", "agents.agent_base"]
+
+# Heavy SDKs and HTTP clients that should only be imported once an agent
+# actually needs them.
+HEAVY_MODULES = ["openai", "anthropic", "requests"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, runs: int = 3) -> Dict:
+    """
+    Time ``import module`` in fresh interpreters.
+
+    Args:
+        module (str): Dotted module name, importable from the repository root.
+        runs (int): Number of fresh processes; the fastest run is reported.
+
+    Returns:
+        Dict: ``seconds`` (best wall time) and ``heavy`` (SDKs the import pulled in).
+    """
+    best = None
+    for _ in range(max(runs, 1)):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Measure import time of The Agency entry points")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        result = measure_import(module, args.runs)
+        heavy = f"  (imports {', '.join(result['heavy'])})" if result["heavy"] else ""
+        print(f"{module:<30} {result['seconds'] * 1000:8.1f} ms{heavy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# interface_summary.py
+
+import re
+import ast
+from typing import List, Optional, Tuple
+
+# Summaries keep only what other files can use: public signatures, class
+# members and exported names. Bodies, comments and private helpers are dropped.
+
+JS_EXTENSIONS = (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx")
+
+_JS_TOKEN_RE = re.compile(
+    r"(?P<skip>//[^\n]*|/\*.*?\*/|\s+)"
+    r"|(?P<string>\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)"
+    r"|(?P<word>[A-Za-z_$][\w$]*)"
+    r"|(?P<number>\d[\w.]*)"
+    r"|(?P<punct>=>|\.\.\.|\S)",
+    re.DOTALL,
+)
+_CLASS_MODIFIERS = {"static", "async", "get", "set", "public", "protected", "readonly", "override", "abstract", "declare"}
+
+
+def python_interface(code: str) -> Optional[List[str]]:
+    """
+    Top-level constants, public function signatures and classes with their
+    public members, or None if ``code`` does not parse. ``__all__`` is kept
+    when present since it names the module's exports.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    def signature(node, indent=""):
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+        return f"{indent}{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not node.name.startswith("_"):
+            lines.append(signature(node))
+        elif isinstance(node, ast.ClassDef):
+            bases = ", ".join(ast.unparse(b) for b in node.bases)
+            lines.append(f"class {node.name}({bases}):" if bases else f"class {node.name}:")
+            members = []
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and \
+                        (not item.name.startswith("_") or item.name == "__init__"):
+                    members.append(signature(item, "    "))
+                elif isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
+                    members.append(f"    {item.target.id}: {ast.unparse(item.annotation)}")
+                elif isinstance(item, ast.Assign):
+                    members.extend(
+                        f"    {t.id} = ..." for t in item.targets
+                        if isinstance(t, ast.Name) and not t.id.startswith("_")
+                    )
+            lines.extend(members or ["    ..."])
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                if target.id == "__all__" and node.value is not None:
+                    lines.append(f"__all__ = {ast.unparse(node.value)}")
+                elif target.id.isupper():
+                    lines.append(f"{target.id} = ...")
+    return lines
+
+
+class _JsScanner:
+    """Token-level scanner for JavaScript/TypeScript export declarations."""
+
+    def __init__(self, code: str):
+        self.code = code
+        self.tokens: List[Tuple[str, str, int, int]] = [
+            (m.lastgroup, m.group(), m.start(), m.end())
+            for m in _JS_TOKEN_RE.finditer(code) if m.lastgroup != "skip"
+        ]
+
+    def value(self, i: int) -> str:
+        return self.tokens[i][1] if 0 <= i < len(self.tokens) else ""
+
+    def is_word(self, i: int) -> bool:
+        return 0 <= i < len(self.tokens) and self.tokens[i][0] == "word"
+
+    def close(self, i: int) -> int:
+        """Index of the bracket closing the one at ``i`` (the last token if unbalanced)."""
+        depth = 0
+        for j in range(i, len(self.tokens)):
+            kind, value = self.tokens[j][:2]
+            if kind != "punct":
+                continue
+            if value in ("(", "[", "{"):
+                depth += 1
+            elif value in (")", "]", "}"):
+                depth -= 1
+                if depth == 0:
+                    return j
+        return len(self.tokens) - 1
+
+    def text(self, i: int, j: int) -> str:
+        """Source from token ``i`` through token ``j`` with whitespace collapsed."""
+        if i > j or i >= len(self.tokens):
+            return ""
+        j = min(j, len(self.tokens) - 1)
+        return re.sub(r"\s+", " ", self.code[self.tokens[i][2]:self.tokens[j][3]])
+
+    def starts_line(self, i: int) -> bool:
+        previous_end = self.tokens[i - 1][3] if i > 0 else 0
+        return "\n" in self.code[previous_end:self.tokens[i][2]] or self.value(i - 1) in (";", "{", "}")
+
+    def signature_end(self, name: int) -> int:
+        """Last token of the signature whose name is at ``name`` (parameters and return type)."""
+        k = name + 1
+        if self.value(k) == "<":
+            while k < len(self.tokens) and self.value(k) != ">":
+                k += 1
+            k += 1
+        if self.value(k) != "(":
+            return name
+        end = self.close(k)
+        if self.value(end + 1) == ":":
+            while end + 1 < len(self.tokens) and self.value(end + 1) not in ("{", ";", "=>"):
+                end += 1
+        return end
+
+    def summary(self) -> List[str]:
+        lines, i, depth = [], 0, 0
+        while i < len(self.tokens):
+            kind, value = self.tokens[i][:2]
+            if kind == "punct" and value in ("(", "[", "{"):
+                depth += 1
+            elif kind == "punct" and value in (")", "]", "}"):
+                depth = max(0, depth - 1)
+            elif depth == 0 and value == "export" and kind == "word" and self.value(i - 1) != ".":
+                line, i = self.export(i)
+                if line:
+                    lines.append(line)
+                continue
+            elif depth == 0 and value == "module" and self.value(i + 1) == "." and \
+                    self.value(i + 2) == "exports" and self.value(i + 3) == "=":
+                line, i = self.module_exports(i + 4)
+                lines.append(line)
+                continue
+            elif depth == 0 and value == "exports" and self.value(i + 1) == "." and \
+                    self.is_word(i + 2) and self.value(i + 3) == "=" and self.value(i - 1) != ".":
+                lines.append(f"exports.{self.value(i + 2)}")
+                i += 3
+                continue
+            i += 1
+        return lines
+
+    def export(self, i: int) -> Tuple[str, int]:
+        """Describe the export statement starting at ``i``; returns it and where to continue."""
+        j = i + 1
+        prefix = "export"
+        if self.value(j) == "default":
+            prefix, j = "export default", j + 1
+        while self.value(j) in ("declare", "async", "abstract"):
+            prefix, j = f"{prefix} {self.value(j)}", j + 1
+        keyword = self.value(j)
+
+        if keyword == "function":
+            j += 1
+            if self.value(j) == "*":
+                j += 1
+            if not self.is_word(j):
+                return f"{prefix} function", j
+            end = self.signature_end(j)
+            return f"{prefix} function {self.text(j, end)}", end + 1
+        if keyword == "class":
+            body = j
+            while body < len(self.tokens) and self.value(body) != "{":
+                body += 1
+            header = self.text(j, body - 1)
+            members = self.class_members(body)
+            return f"{prefix} {header} {{ {'; '.join(members)} }}" if members else f"{prefix} {header}", self.close(body) + 1
+        if keyword in ("const", "let", "var"):
+            name, k = self.value(j + 1), j + 3
+            if self.value(j + 2) == "=":
+                if self.value(k) == "async":
+                    k += 1
+                if self.value(k) == "(" and self.value(self.close(k) + 1) == "=>":
+                    return f"{prefix} {keyword} {name} = {self.text(k, self.close(k))} =>", self.close(k) + 2
+                if self.is_word(k) and self.value(k + 1) == "=>":
+                    return f"{prefix} {keyword} {name} = {self.value(k)} =>", k + 2
+                if self.value(k) == "function":
+                    end = self.signature_end(k) if self.value(k + 1) == "(" else self.signature_end(k + 1)
+                    return f"{prefix} {keyword} {name} = {self.text(k, end)}", end + 1
+            return f"{prefix} {keyword} {name}", j + 2
+        if keyword in ("interface", "type", "enum", "namespace"):
+            return f"{prefix} {keyword} {self.value(j + 1)}", j + 2
+        if keyword == "{" and prefix == "export":
+            end = self.close(j)
+            if self.value(end + 1) == "from":
+                end += 2
+            return self.text(i, end), end + 1
+        if keyword == "*":
+            end = j + 3 if self.value(j + 1) == "as" else j + 2
+            return self.text(i, min(end, len(self.tokens) - 1)), end + 1
+        if keyword == "{":
+            return f"{prefix} {{ ... }}", j
+        if self.is_word(j):
+            return f"{prefix} {keyword}", j + 1
+        return "", j
+
+    def class_members(self, body: int) -> List[str]:
+        members, depth, end = [], 0, self.close(body)
+        k = body + 1
+        while k < end:
+            value = self.value(k)
+            if value in ("(", "[", "{"):
+                depth += 1
+            elif value in (")", "]", "}"):
+                depth -= 1
+            elif depth == 0 and self.is_word(k) and self.starts_line(k):
+                start = k
+                while self.value(k) in _CLASS_MODIFIERS and self.is_word(k + 1):
+                    k += 1
+                name = self.value(k)
+                private = name.startswith("_") or self.value(start - 1) == "#"
+                if self.value(k + 1) in ("(", "<"):
+                    sig_end = self.signature_end(k)
+                    if not private:
+                        members.append(self.text(start, sig_end))
+                    k = sig_end + 1
+                    continue
+                if self.value(k + 1) in ("=", ";", ":", "?") and not private:
+                    members.append(self.text(start, k))
+            k += 1
+        return members
+
+    def module_exports(self, i: int) -> Tuple[str, int]:
+        if self.value(i) != "{":
+            return f"module.exports = {self.value(i)}", i + 1
+        end, names, depth = self.close(i), [], 0
+        for k in range(i + 1, end):
+            value = self.value(k)
+            if value in ("(", "[", "{"):
+                depth += 1
+            elif value in (")", "]", "}"):
+                depth -= 1
+            elif depth == 0 and self.is_word(k) and self.value(k - 1) in ("{", ",") and \
+                    self.value(k + 1) in (",", ":", "(", "}"):
+                names.append(self.value(k))
+        return f"module.exports = {{ {', '.join(names)} }}", end + 1
+
+
+def js_interface(code: str) -> List[str]:
+    """Export declarations of JavaScript/TypeScript ``code``, one per line."""
+    return _JsScanner(code).summary()
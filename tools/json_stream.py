@@ -0,0 +1,178 @@
+# json_stream.py
+
+import json
+import logging
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JsonStreamExtractor:
+    """
+    Incremental, brace-balancing extractor for JSON embedded in LLM output.
+
+    Text is consumed in a single pass, in whatever chunks it arrives, so it
+    can run on a token stream. Prose and markdown fences around the JSON are
+    skipped, nested objects are tracked with a bracket stack and every
+    top-level value is parsed as soon as its closing bracket arrives.
+    Trailing commas are dropped as they are seen, and ``close`` repairs a
+    value cut off by truncation by closing its open string and brackets.
+    """
+
+    def __init__(self, start: str = "{"):
+        self.start = start
+        self.values: List[Any] = []
+        self._reset()
+
+    def _reset(self) -> None:
+        self.buffer: List[str] = []
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escape = False
+        self.expect_key = False
+        self.pending_comma: Optional[int] = None
+        self.string_is_key = False
+        # (buffer length, open brackets) where the text so far plus closers is valid JSON
+        self.safe_point: Optional[Tuple[int, Tuple[str, ...]]] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume more text.
+
+        Returns:
+            List[Any]: Top-level values completed by this chunk.
+        """
+        completed = []
+        for char in chunk:
+            if not self.stack:
+                if char in self.start:
+                    self._open(char)
+                continue
+
+            if self.in_string:
+                self.buffer.append(char)
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if not self.string_is_key:
+                        self._mark_safe()
+                continue
+
+            if char in " \t\r\n":
+                self.buffer.append(char)
+            elif char == '"':
+                self._settle_comma()
+                self.in_string = True
+                self.string_is_key = self.stack[-1] == "{" and self.expect_key
+                self.buffer.append(char)
+            elif char in "{[":
+                self._settle_comma()
+                self._open(char)
+            elif char in "}]":
+                if _CLOSERS[self.stack[-1]] != char:
+                    # Mismatched bracket: this was not JSON after all
+                    self._reset()
+                    continue
+                if self.pending_comma is not None:
+                    self.buffer[self.pending_comma] = " "
+                    self.pending_comma = None
+                self.buffer.append(char)
+                self.stack.pop()
+                self.expect_key = False
+                if not self.stack:
+                    value = self._parse("".join(self.buffer))
+                    if value is not None:
+                        completed.append(value)
+                    self._reset()
+                else:
+                    self._mark_safe()
+            elif char == ",":
+                self._settle_comma()
+                self._mark_safe()
+                self.pending_comma = len(self.buffer)
+                self.buffer.append(char)
+                self.expect_key = self.stack[-1] == "{"
+            elif char == ":":
+                self._settle_comma()
+                self.buffer.append(char)
+                self.expect_key = False
+            else:
+                self._settle_comma()
+                self.buffer.append(char)
+
+        self.values.extend(completed)
+        return completed
+
+    def close(self) -> Optional[Any]:
+        """
+        Finish the stream, repairing a top-level value left open by truncation.
+
+        Returns:
+            Optional[Any]: The repaired value, or None if nothing was left open
+            or it could not be repaired.
+        """
+        if not self.stack:
+            return None
+
+        text = "".join(self.buffer)
+        if self.in_string:
+            text = (text[:-1] if self.escape else text) + '"'
+        if self.pending_comma is not None and not self.in_string:
+            text = text[:self.pending_comma] + text[self.pending_comma + 1:]
+        candidates = [text.rstrip().rstrip(",") + self._closers(self.stack)]
+        if self.safe_point:
+            length, stack = self.safe_point
+            candidates.append("".join(self.buffer[:length]) + self._closers(stack))
+
+        self._reset()
+        for candidate in candidates:
+            value = self._parse(candidate)
+            # An empty repair means nothing of the value survived
+            if value not in (None, {}, []):
+                logger.warning("⚠️ Repaired truncated JSON response")
+                self.values.append(value)
+                return value
+        return None
+
+    def _open(self, char: str) -> None:
+        self.buffer.append(char)
+        self.stack.append(char)
+        self.expect_key = char == "{"
+        if len(self.stack) == 1:
+            self._mark_safe()
+
+    def _settle_comma(self) -> None:
+        """A token other than whitespace or a closer followed the last comma, so it stays."""
+        self.pending_comma = None
+
+    def _mark_safe(self) -> None:
+        self.safe_point = (len(self.buffer), tuple(self.stack))
+
+    @staticmethod
+    def _closers(stack) -> str:
+        return "".join(_CLOSERS[c] for c in reversed(stack))
+
+    @staticmethod
+    def _parse(text: str) -> Optional[Any]:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
+
+
+def extract_json(text: str, start: str = "{") -> Optional[Any]:
+    """
+    First JSON value in ``text`` (repaired if truncated), or None.
+
+    ``start`` holds the brackets a value may open with: ``"{"`` for an
+    object, ``"["`` for an array.
+    """
+    extractor = JsonStreamExtractor(start)
+    values = extractor.feed(text)
+    return values[0] if values else extractor.close()
@@ -0,0 +1,105 @@
+# latency_tracker.py
+
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def _quantile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class LatencyTracker:
+    """
+    Process-wide rolling window of observed LLM latencies.
+
+    Samples are kept per model (used for hedging) and per model and task
+    type together with the number of tokens generated (used for timeouts).
+    """
+
+    WINDOW = 200
+
+    _lock = threading.Lock()
+    _samples: Dict[str, deque] = {}
+    _task_samples: Dict[Tuple[str, str], deque] = {}
+
+    @classmethod
+    def record(cls, model: str, seconds: float, task: Optional[str] = None, output_tokens: int = 0) -> None:
+        with cls._lock:
+            cls._samples.setdefault(model, deque(maxlen=cls.WINDOW)).append(seconds)
+            if task:
+                cls._task_samples.setdefault((model, task), deque(maxlen=cls.WINDOW)).append(
+                    (seconds, max(int(output_tokens), 1))
+                )
+
+    @classmethod
+    def percentile(cls, model: str, q: float, min_samples: int = 5) -> Optional[float]:
+        """
+        Return the ``q`` quantile (0-1) of recent latencies for ``model``.
+
+        Returns None until at least ``min_samples`` calls have been observed.
+        """
+        with cls._lock:
+            samples = list(cls._samples.get(model, ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        return _quantile(samples, q)
+
+    @classmethod
+    def expected_seconds(cls, model: str, task: str, max_tokens: int, q: float = 0.95,
+                         min_samples: int = 5) -> Optional[float]:
+        """
+        Predict how long a call generating up to ``max_tokens`` may take.
+
+        The ``q`` quantile of latency for this model and task is scaled by how
+        much larger the requested output budget is than the typical (median)
+        output observed, so big generations get proportionally more time.
+        Falls back to every task of the model when the task has few samples.
+
+        Returns:
+            Optional[float]: Seconds, or None while there is too little data.
+        """
+        with cls._lock:
+            samples = list(cls._task_samples.get((model, task), ()))
+            if len(samples) < max(min_samples, 1):
+                samples = [s for (m, _), values in cls._task_samples.items() if m == model for s in values]
+        if len(samples) < max(min_samples, 1):
+            return None
+        latency = _quantile([seconds for seconds, _ in samples], q)
+        typical_tokens = _quantile([tokens for _, tokens in samples], 0.5)
+        return latency * max(1.0, max_tokens / typical_tokens)
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._samples.clear()
+            cls._task_samples.clear()
+
+
+def adaptive_timeout(model: str, task: str, max_tokens: int, config=None, default_max_tokens: int = 2000) -> float:
+    """
+    Request timeout for one call, from observed latency and the output budget.
+
+    Until enough calls have been observed the configured ``REQUEST_TIMEOUT``
+    is used, stretched for budgets above ``default_max_tokens`` but never
+    shortened. Afterwards the predicted latency times ``multiplier`` is used,
+    clamped to ``[min_seconds, max_seconds]`` of ``ADAPTIVE_TIMEOUT``.
+    """
+    base = getattr(config, "REQUEST_TIMEOUT", 60)
+    settings = getattr(config, "ADAPTIVE_TIMEOUT", None) or {}
+    cold = base * max(1.0, max_tokens / default_max_tokens)
+    if not settings.get("enabled"):
+        return cold
+
+    expected = LatencyTracker.expected_seconds(
+        model, task, max_tokens, settings.get("quantile", 0.95), settings.get("min_samples", 5)
+    )
+    if expected is None:
+        return min(cold, settings.get("max_seconds", 600))
+    timeout = expected * settings.get("multiplier", 2.0)
+    return max(settings.get("min_seconds", 10), min(timeout, settings.get("max_seconds", 600)))
@@ -1,7 +1,9 @@
 # tools/model_manager.py - Intelligent model selection and management
 
 import os
+import time
 import logging
+import threading
 import requests
 from typing import List, Dict, Optional, Tuple
 
@@ -9,6 +11,9 @@ logger = logging.getLogger(__name__)
 
 class ModelManager:
     """Manages available models and selects the best one for each task."""
+
+    _shared: Dict[tuple, "ModelManager"] = {}
+    _shared_lock = threading.Lock()
     
     def __init__(self, config):
         self.config = config
@@ -36,10 +41,34 @@ class ModelManager:
             "claude-3-haiku-20240307": {"type": "anthropic", "good_for": ["fast", "general"], "quality": 7},
         }
         
+        self.refreshed_at = 0.0
         self.refresh_available_models()
+
+    @classmethod
+    def shared(cls, config) -> "ModelManager":
+        """
+        Return a process-wide instance so model discovery is not repeated.
+
+        Instances are shared by every config with the same Ollama URL and API
+        keys, and rediscover models once ``MODEL_DISCOVERY_TTL`` seconds old.
+        """
+        key = (
+            getattr(config, "OLLAMA_API_URL", ""),
+            getattr(config, "GPT4_API_KEY", ""),
+            getattr(config, "ANTHROPIC_API_KEY", ""),
+        )
+        ttl = getattr(config, "MODEL_DISCOVERY_TTL", 300)
+        with cls._shared_lock:
+            manager = cls._shared.get(key)
+            if manager is None:
+                manager = cls._shared[key] = cls(config)
+            elif time.monotonic() - manager.refreshed_at > ttl:
+                manager.refresh_available_models()
+            return manager
     
     def refresh_available_models(self):
         """Check which models are actually available."""
+        self.refreshed_at = time.monotonic()
         # Check Ollama models
         self._check_ollama_models()
         
@@ -114,6 +143,28 @@ class ModelManager:
         logger.error(f"No models available for task: {task_type}")
         return None
     
+    def get_ranked_models_for_task(self, task_type: str) -> List[str]:
+        """
+        List every available model suited to a task, best first.
+
+        Args:
+            task_type: One of "code", "review", "architecture", "general", "fast"
+
+        Returns:
+            Model names ordered by quality (highest first)
+        """
+        candidates = []
+        for model_name, info in self.model_capabilities.items():
+            if task_type in info["good_for"] and model_name in self.available_models.get(info["type"], []):
+                candidates.append((model_name, info["quality"]))
+        candidates.sort(key=lambda x: x[1], reverse=True)
+        return [name for name, _ in candidates]
+
+    def get_task_for_model(self, model_name: str) -> str:
+        """Primary task type a known model is suited to ("general" if unknown)."""
+        info = self.model_capabilities.get(model_name)
+        return info["good_for"][0] if info else "general"
+    
     def pull_ollama_model(self, model_name: str) -> bool:
         """Pull an Ollama model if not already available."""
         import subprocess
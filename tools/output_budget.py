@@ -0,0 +1,90 @@
+# output_budget.py
+
+import os
+
+# Completion tokens to request when generating a file, by name or extension.
+# Config files and manifests are short; source files may be long.
+FILE_NAME_BUDGETS = {
+    "requirements.txt": 300,
+    "dockerfile": 400,
+    ".gitignore": 200,
+    ".env.example": 200,
+    "package.json": 600,
+    "readme.md": 1500,
+}
+
+FILE_EXT_BUDGETS = {
+    ".json": 800,
+    ".yml": 600,
+    ".yaml": 600,
+    ".toml": 400,
+    ".ini": 300,
+    ".cfg": 300,
+    ".txt": 500,
+    ".md": 1500,
+    ".css": 1500,
+    ".html": 3000,
+    ".py": 3000,
+    ".js": 3000,
+    ".jsx": 3000,
+    ".ts": 3000,
+    ".tsx": 3000,
+}
+
+# Completion tokens for non-file tasks.
+TASK_BUDGETS = {
+    "architecture": 1500,
+    "review": 1500,
+}
+
+
+def output_budget_for(path: str = "", task: str = "", default: int = 2000) -> int:
+    """
+    Suggested ``max_tokens`` for generating ``path`` or running ``task``.
+
+    Args:
+        path (str): File being generated or fixed, if any.
+        task (str): Task type such as "architecture" or "review".
+        default (int): Budget when nothing more specific is known.
+
+    Returns:
+        int: Completion token budget.
+    """
+    if path:
+        name = os.path.basename(path).lower()
+        if name in FILE_NAME_BUDGETS:
+            return FILE_NAME_BUDGETS[name]
+        ext = os.path.splitext(name)[1]
+        if ext in FILE_EXT_BUDGETS:
+            return FILE_EXT_BUDGETS[ext]
+    return TASK_BUDGETS.get(task, default)
+
+
+# Most completion tokens a model will return in one response, by model name
+# prefix (the longest matching prefix wins).
+MODEL_OUTPUT_LIMITS = {
+    "gpt-4o": 16384,
+    "gpt-4-turbo": 4096,
+    "gpt-4": 8192,
+    "gpt-3.5": 4096,
+    "claude-3-5": 8192,
+    "claude-3": 4096,
+}
+
+
+def model_output_limit(model: str, default: int = 4096) -> int:
+    """
+    Largest ``max_tokens`` ``model`` accepts for one response.
+
+    Args:
+        model (str): Model name.
+        default (int): Limit for models not in ``MODEL_OUTPUT_LIMITS``.
+
+    Returns:
+        int: Completion token limit.
+    """
+    name = (model or "").lower()
+    matches = [prefix for prefix in MODEL_OUTPUT_LIMITS if name.startswith(prefix)]
+    if not matches:
+        return default
+    return MODEL_OUTPUT_LIMITS[max(matches, key=len)]
@@ -0,0 +1,122 @@
+# output_schemas.py
+
+from typing import Any, List
+
+# JSON schemas for structured LLM output. The ``title`` names the schema in
+# provider requests (OpenAI response_format name, Anthropic tool name).
+
+PLAN_SCHEMA = {
+    "title": "project_plan",
+    "type": "object",
+    "required": ["project_name", "project_type", "components", "tech_stack", "files"],
+    "properties": {
+        "project_name": {"type": "string"},
+        "project_type": {"type": "string"},
+        "components": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["name", "description"],
+                "properties": {
+                    "name": {"type": "string"},
+                    "description": {"type": "string"},
+                    "technology": {"type": "string"},
+                },
+            },
+        },
+        "tech_stack": {
+            "type": "object",
+            "properties": {
+                "frontend": {"type": ["string", "null"]},
+                "backend": {"type": ["string", "null"]},
+                "database": {"type": ["string", "null"]},
+                "other": {"type": "array", "items": {"type": "string"}},
+            },
+        },
+        "files": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["path", "description"],
+                "properties": {
+                    "path": {"type": "string"},
+                    "description": {"type": "string"},
+                    "component": {"type": "string"},
+                    "depends_on": {"type": "array", "items": {"type": "string"}},
+                },
+            },
+        },
+        "dependencies": {
+            "type": "object",
+            "properties": {
+                "python": {"type": "array", "items": {"type": "string"}},
+                "npm": {"type": "array", "items": {"type": "string"}},
+                "system": {"type": "array", "items": {"type": "string"}},
+            },
+        },
+        "architecture_notes": {"type": "string"},
+        "security_notes": {"type": "string"},
+        "deployment_notes": {"type": "string"},
+    },
+}
+
+PRODUCT_SCHEMA = {
+    "title": "product_spec",
+    "type": "object",
+    "required": ["title", "description", "tags"],
+    "properties": {
+        "title": {"type": "string"},
+        "description": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+}
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def _is_type(value: Any, name: str) -> bool:
+    if name == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if name == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, _TYPES.get(name, object))
+
+
+def validate_schema(data: Any, schema: dict, path: str = "$") -> List[str]:
+    """
+    Check ``data`` against the subset of JSON Schema used for LLM output
+    (type, enum, required, properties, additionalProperties and items).
+
+    Returns:
+        List[str]: One message per violation; empty if ``data`` is valid.
+    """
+    expected = schema.get("type")
+    if expected:
+        types = expected if isinstance(expected, list) else [expected]
+        if not any(_is_type(data, t) for t in types):
+            return [f"{path}: expected {' or '.join(types)}, got {type(data).__name__}"]
+
+    errors = []
+    if "enum" in schema and data not in schema["enum"]:
+        errors.append(f"{path}: {data!r} is not one of {schema['enum']}")
+
+    if isinstance(data, dict):
+        properties = schema.get("properties", {})
+        errors += [f"{path}: missing '{key}'" for key in schema.get("required", []) if key not in data]
+        for key, value in data.items():
+            if key in properties:
+                errors += validate_schema(value, properties[key], f"{path}.{key}")
+            elif schema.get("additionalProperties") is False:
+                errors.append(f"{path}: unexpected '{key}'")
+
+    if isinstance(data, list) and "items" in schema:
+        for index, item in enumerate(data):
+            errors += validate_schema(item, schema["items"], f"{path}[{index}]")
+
+    return errors
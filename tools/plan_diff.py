@@ -0,0 +1,115 @@
+# plan_diff.py
+
+import os
+import re
+import posixpath
+import logging
+from typing import Dict, Iterable, List, Set
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Fields of a file spec that affect what gets generated
+SPEC_FIELDS = ("description", "component")
+
+_PY_IMPORT_RE = re.compile(r"^\s*(?:from\s+([\w.]+)\s+import|import\s+([\w.]+))", re.M)
+_JS_IMPORT_RE = re.compile(r"""(?:\bfrom\s+|\brequire\(\s*|\bimport\s+)['"]([^'"]+)['"]""")
+_HTML_REF_RE = re.compile(r"""\b(?:src|href)\s*=\s*['"]([^'"#?]+)""")
+
+
+def spec_path(spec: dict) -> str:
+    """Normalized project-relative path of a plan file spec."""
+    return os.path.normpath(str(spec.get("path", "")).strip())
+
+
+def diff_plans(old_plan: dict, new_plan: dict) -> Dict[str, List[str]]:
+    """
+    Compare the file specs of two plans.
+
+    Returns:
+        Dict[str, List[str]]: Paths that were ``added``, ``changed``,
+        ``removed`` or left ``unchanged`` by ``new_plan``.
+    """
+    old = {spec_path(s): s for s in (old_plan or {}).get("files", []) if isinstance(s, dict)}
+    new = {spec_path(s): s for s in (new_plan or {}).get("files", []) if isinstance(s, dict)}
+
+    diff = {"added": [], "changed": [], "removed": [], "unchanged": []}
+    for path, spec in new.items():
+        if path not in old:
+            diff["added"].append(path)
+        elif any(str(spec.get(f, "")).strip() != str(old[path].get(f, "")).strip() for f in SPEC_FIELDS):
+            diff["changed"].append(path)
+        else:
+            diff["unchanged"].append(path)
+    diff["removed"] = [path for path in old if path not in new]
+    return diff
+
+
+def module_key(path: str) -> str:
+    """Path without extension (and without a trailing ``__init__``), with ``/`` separators."""
+    key = posixpath.splitext(path.replace(os.sep, "/"))[0]
+    return key[: -len("/__init__")] if key.endswith("/__init__") else key
+
+
+def file_references(path: str, text: str) -> Set[str]:
+    """
+    Module keys that the file at ``path`` imports or links to.
+
+    Python imports, JS/TS imports and requires, and HTML ``src``/``href``
+    attributes are recognised. Both absolute and file-relative forms are
+    returned so callers can match them against ``module_key`` of each file.
+    """
+    base = posixpath.dirname(path.replace(os.sep, "/"))
+    refs = set()
+    for absolute, plain in _PY_IMPORT_RE.findall(text):
+        module = absolute or plain
+        dots = len(module) - len(module.lstrip("."))
+        parts = module.lstrip(".").replace(".", "/")
+        if dots:
+            parent = posixpath.normpath(posixpath.join(base, *[".."] * (dots - 1))) if base else ""
+            refs.add(posixpath.join(parent, parts).lstrip("./"))
+        else:
+            refs.add(parts)
+            refs.add(posixpath.join(base, parts))
+    for spec in _JS_IMPORT_RE.findall(text) + _HTML_REF_RE.findall(text):
+        if spec.startswith(("http:", "https:", "//", "data:", "mailto:")):
+            continue
+        target = posixpath.normpath(posixpath.join(base, spec)) if spec.startswith(".") else spec.lstrip("/")
+        refs.add(module_key(target))
+    return refs
+
+
+def file_dependents(project_dir: str, paths: Iterable[str], targets: Iterable[str]) -> Set[str]:
+    """
+    Files among ``paths`` that depend, directly or transitively, on ``targets``.
+
+    Args:
+        project_dir (str): Project root the paths are relative to.
+        paths (Iterable[str]): Files of the project.
+        targets (Iterable[str]): Files that changed.
+
+    Returns:
+        Set[str]: Dependent paths, not including ``targets`` themselves.
+    """
+    paths = list(paths)
+    by_key = {module_key(p): p for p in paths}
+    dependents: Dict[str, Set[str]] = {}
+    for path in paths:
+        try:
+            with open(os.path.join(project_dir, path), "r", encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+        except OSError:
+            continue
+        for ref in file_references(path, text):
+            target = by_key.get(ref)
+            if target and target != path:
+                dependents.setdefault(target, set()).add(path)
+
+    targets = set(targets)
+    found, stack = set(), list(targets)
+    while stack:
+        for dependent in dependents.get(stack.pop(), ()):
+            if dependent not in found and dependent not in targets:
+                found.add(dependent)
+                stack.append(dependent)
+    return found
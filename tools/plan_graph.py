@@ -0,0 +1,108 @@
+# plan_graph.py
+
+import os
+import re
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# File names too generic to infer a dependency from a mention in a description
+_GENERIC_STEMS = {"main", "index", "app", "init", "__init__", "readme", "setup", "config", "test", "tests"}
+
+# Files that describe the project rather than import from it
+_NON_CODE_EXTS = {".md", ".txt", ".toml", ".ini", ".cfg", ".yml", ".yaml", ".json", ".lock"}
+_NON_CODE_NAMES = {"dockerfile", ".gitignore", ".env.example", ".dockerignore", "makefile"}
+
+
+def _is_code(path: str) -> bool:
+    name = os.path.basename(path).lower()
+    return name not in _NON_CODE_NAMES and os.path.splitext(name)[1] not in _NON_CODE_EXTS
+
+
+def _stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0].lower()
+
+
+def _mentions(text: str, word: str) -> bool:
+    return re.search(rf"(?<![\w/.-]){re.escape(word)}(?![\w-])", text) is not None
+
+
+def infer_dependencies(files: List[dict]) -> Dict[str, List[str]]:
+    """
+    Dependency edges between the files of a plan.
+
+    A spec's ``depends_on`` list, when the architect provided one, is used as
+    is. Otherwise a code file depends on the code files its description names
+    (by path, file name or, for distinctive names, module name), and a test
+    file also depends on the file it is named after (``test_models.py`` on
+    ``models.py``). Unknown and self references are ignored.
+
+    Args:
+        files (List[dict]): Plan file specs with ``path`` and ``description``.
+
+    Returns:
+        Dict[str, List[str]]: Each path mapped to the paths it depends on.
+    """
+    paths = [os.path.normpath(f.get("path", "")) for f in files]
+    code_paths = [p for p in paths if _is_code(p)]
+    by_name = {}
+    for path in code_paths:
+        by_name.setdefault(os.path.basename(path).lower(), []).append(path)
+
+    deps: Dict[str, List[str]] = {}
+    for spec, path in zip(files, paths):
+        explicit = spec.get("depends_on")
+        if isinstance(explicit, list):
+            wanted = [os.path.normpath(str(d)) for d in explicit]
+            deps[path] = [d for d in wanted if d in paths and d != path]
+            continue
+
+        found = []
+        if _is_code(path):
+            text = str(spec.get("description", "")).lower()
+            stem = _stem(path)
+            tested = stem[5:] if stem.startswith("test_") else stem[:-5] if stem.endswith(".test") else ""
+            for other in code_paths:
+                if other == path:
+                    continue
+                name, other_stem = os.path.basename(other).lower(), _stem(other)
+                if _mentions(text, other.lower().replace(os.sep, "/")) or \
+                        (len(by_name[name]) == 1 and _mentions(text, name)) or \
+                        (other_stem not in _GENERIC_STEMS and len(other_stem) > 3 and _mentions(text, other_stem)) or \
+                        (tested and other_stem == tested):
+                    found.append(other)
+        deps[path] = found
+    return deps
+
+
+def topological_waves(deps: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    Group files into waves that can be generated concurrently.
+
+    Every file comes after all of its dependencies. Files caught in a
+    dependency cycle are placed in one final wave.
+
+    Args:
+        deps (Dict[str, List[str]]): Output of ``infer_dependencies``.
+
+    Returns:
+        List[List[str]]: Waves in generation order, each in plan order.
+    """
+    order = list(deps)
+    remaining = {path: set(d for d in found if d in deps) for path, found in deps.items()}
+    waves = []
+    while remaining:
+        wave = [p for p in order if p in remaining and not remaining[p]]
+        if not wave:
+            cycle = [p for p in order if p in remaining]
+            logger.warning(f"⚠️ Dependency cycle between {', '.join(cycle)}; generating them together")
+            waves.append(cycle)
+            break
+        waves.append(wave)
+        for path in wave:
+            del remaining[path]
+        for pending in remaining.values():
+            pending.difference_update(wave)
+    return waves
@@ -0,0 +1,137 @@
+# plan_store.py
+
+import re
+import copy
+import json
+import hashlib
+import logging
+import sqlite3
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from tools.fix_cache import PersistentLRUCache
+from tools.plan_templates import PLAN_TEMPLATES
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Words that say nothing about what to build
+_STOP_WORDS = {
+    "a", "an", "the", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "from",
+    "i", "me", "my", "we", "our", "you", "it", "that", "this", "is", "be", "want", "need", "please",
+    "build", "create", "make", "write", "develop", "generate", "implement", "simple", "basic", "small",
+    "some", "can", "should", "would", "using", "use",
+}
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def prompt_terms(prompt: str) -> FrozenSet[str]:
+    """Normalized content words of a prompt (lowercased, stop words and plural 's' removed)."""
+    terms = set()
+    for word in _WORD_RE.findall(prompt.lower().replace("to-do", "todo")):
+        if word in _STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.add(word)
+    return frozenset(terms)
+
+
+def prompt_similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two term sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def make_plan_key(terms: FrozenSet[str], project_type: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(project_type.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(" ".join(sorted(terms)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PlanStore(PersistentLRUCache):
+    """
+    Persistent store of architecture plans indexed by normalized prompt and
+    project type.
+
+    ``lookup`` finds the most similar earlier prompt of the same project type
+    (or a shipped template) so near-duplicate requests can reuse or adapt an
+    existing plan instead of planning from scratch. Bounded by
+    ``PLAN_STORE_MAX_ENTRIES``.
+    """
+
+    TABLE = "plan_store"
+    MAX_ENTRIES_SETTING = "PLAN_STORE_MAX_ENTRIES"
+
+    def __init__(self, config=None, db_path: Optional[str] = None, max_entries: Optional[int] = None):
+        super().__init__(config, db_path, max_entries)
+        # project type -> {key: prompt terms}, loaded once and kept in step with put()
+        self.index: Dict[str, Dict[str, FrozenSet[str]]] = {}
+        if self.conn:
+            try:
+                for key, meta in self.conn.execute(f"SELECT key, meta FROM {self.TABLE}").fetchall():
+                    self._index(key, meta)
+            except sqlite3.Error as e:
+                logger.error(f"❌ PlanStore index load error: {e}")
+
+    def _index(self, key: str, meta: str) -> None:
+        try:
+            info = json.loads(meta)
+        except ValueError:
+            return
+        self.index.setdefault(info.get("project_type", ""), {})[key] = frozenset(info.get("terms", []))
+
+    def put_plan(self, prompt: str, project_type: str, plan: dict) -> None:
+        """Store ``plan`` for ``prompt``."""
+        terms = prompt_terms(prompt)
+        if not terms:
+            return
+        key = make_plan_key(terms, project_type)
+        meta = json.dumps({"project_type": project_type, "terms": sorted(terms), "prompt": prompt[:200]})
+        self.put(key, json.dumps(plan), meta)
+        with self.lock:
+            self._index(key, meta)
+
+    def lookup(self, prompt: str, project_type: str,
+               use_templates: bool = True) -> Optional[Tuple[float, dict, str]]:
+        """
+        Find the stored plan (or template) whose prompt is most similar to ``prompt``.
+
+        Args:
+            prompt (str): The new request.
+            project_type (str): Only plans of this project type are considered.
+            use_templates (bool): Also consider the shipped template library.
+
+        Returns:
+            Optional[Tuple[float, dict, str]]: Similarity, a copy of the plan and
+            where it came from, or None if nothing shares a term with the prompt.
+        """
+        terms = prompt_terms(prompt)
+        if not terms:
+            return None
+
+        candidates: List[Tuple[float, str, str]] = []
+        with self.lock:
+            stored = dict(self.index.get(project_type, {}))
+        for key, stored_terms in stored.items():
+            candidates.append((prompt_similarity(terms, stored_terms), "stored", key))
+        if use_templates:
+            for name, template in PLAN_TEMPLATES.items():
+                if template["project_type"] == project_type:
+                    candidates.append((prompt_similarity(terms, prompt_terms(template["prompt"])), "template", name))
+
+        for score, source, ref in sorted(candidates, key=lambda c: (-c[0], c[1] != "stored")):
+            if score <= 0:
+                break
+            if source == "template":
+                return score, copy.deepcopy(PLAN_TEMPLATES[ref]["plan"]), f"template:{ref}"
+            value = self.get(ref)
+            if value is None:
+                # Evicted since it was indexed
+                with self.lock:
+                    self.index.get(project_type, {}).pop(ref, None)
+                continue
+            return score, json.loads(value), "stored"
+        return None
@@ -0,0 +1,211 @@
+# plan_templates.py
+
+import copy
+from typing import Dict, List, Optional
+
+
+def _plan(name: str, project_type: str, components, tech_stack: dict, files, dependencies: dict,
+          architecture: str, security: str, deployment: str) -> dict:
+    return {
+        "project_name": name,
+        "project_type": project_type,
+        "components": [{"name": n, "description": d, "technology": t} for n, d, t in components],
+        "tech_stack": tech_stack,
+        "files": [{"path": p, "description": d, "component": c} for p, d, c in files],
+        "dependencies": dependencies,
+        "architecture_notes": architecture,
+        "security_notes": security,
+        "deployment_notes": deployment,
+    }
+
+
+# Ready-made plans for common requests. The plan store matches new prompts
+# against each template's ``prompt`` and ``_get_default_files_for_type``
+# uses their files for project types without a built-in structure.
+PLAN_TEMPLATES: Dict[str, dict] = {
+    "snake-game": {
+        "prompt": "snake game",
+        "project_type": "game",
+        "plan": _plan(
+            "snake-game", "game",
+            [
+                ("game-loop", "Event handling, update and render loop", "pygame"),
+                ("entities", "Snake, food and board state", "Python"),
+            ],
+            {"frontend": None, "backend": "python", "database": None, "other": ["pygame"]},
+            [
+                ("main.py", "Entry point: initialises pygame, runs the game loop at a fixed tick rate and handles restart/quit", "game-loop"),
+                ("game/__init__.py", "Game package marker", "entities"),
+                ("game/snake.py", "Snake class: body segments, direction changes (no reversing), movement, growth and self-collision", "entities"),
+                ("game/food.py", "Food class: spawns on a random free cell of the board", "entities"),
+                ("game/board.py", "Board class: grid size, wall collision, score keeping and drawing the grid, snake, food and score", "entities"),
+                ("requirements.txt", "Python dependencies (pygame)", "configuration"),
+                ("README.md", "How to install, run and play the game", "documentation"),
+                ("tests/test_snake.py", "Unit tests for snake movement, growth and collisions", "testing"),
+            ],
+            {"python": ["pygame"], "npm": [], "system": []},
+            "A fixed-timestep pygame loop drives pure-Python game entities, which keeps game rules testable without a display.",
+            "No network or file access; validate any saved high-score file before reading it.",
+            "Run locally with `python main.py`; package with PyInstaller for distribution.",
+        ),
+    },
+    "todo-api": {
+        "prompt": "todo rest api",
+        "project_type": "api",
+        "plan": _plan(
+            "todo-api", "api",
+            [
+                ("api", "CRUD endpoints for todo items", "FastAPI"),
+                ("persistence", "Todo storage", "SQLAlchemy + SQLite"),
+            ],
+            {"frontend": None, "backend": "fastapi", "database": "SQLite", "other": ["pydantic", "uvicorn"]},
+            [
+                ("app/__init__.py", "Application package marker", "api"),
+                ("app/main.py", "FastAPI application: creates tables on startup and includes the todo router", "api"),
+                ("app/database.py", "SQLAlchemy engine, session factory and get_db dependency", "persistence"),
+                ("app/models.py", "SQLAlchemy Todo model: id, title, description, completed, created_at", "persistence"),
+                ("app/schemas.py", "Pydantic schemas for creating, updating and returning todos", "api"),
+                ("app/routes.py", "Todo router: list, get, create, update and delete endpoints with 404 handling", "api"),
+                ("requirements.txt", "Python dependencies", "configuration"),
+                (".env.example", "Example environment variables (DATABASE_URL)", "configuration"),
+                ("Dockerfile", "Container image running uvicorn", "deployment"),
+                ("README.md", "API documentation with example requests", "documentation"),
+                ("tests/test_todos.py", "API tests for every endpoint using TestClient and a temporary database", "testing"),
+            ],
+            {"python": ["fastapi", "uvicorn", "sqlalchemy", "pydantic"], "npm": [], "system": ["docker"]},
+            "Layered FastAPI service: routes depend on a session dependency and map between Pydantic schemas and ORM models.",
+            "Validate input with Pydantic, limit page sizes and never build SQL from strings.",
+            "Build the Dockerfile and run behind a reverse proxy; set DATABASE_URL for production databases.",
+        ),
+    },
+    "landing-page": {
+        "prompt": "landing page website",
+        "project_type": "static_site",
+        "plan": _plan(
+            "landing-page", "static_site",
+            [("site", "Responsive single-page site", "HTML/CSS/JavaScript")],
+            {"frontend": "html", "backend": None, "database": None, "other": []},
+            [
+                ("index.html", "Semantic landing page with hero, features, testimonials, call to action and footer", "site"),
+                ("css/styles.css", "Responsive, mobile-first styles with CSS variables for the colour scheme", "site"),
+                ("js/main.js", "Smooth scrolling, mobile navigation toggle and contact form validation", "site"),
+                ("README.md", "How to preview and deploy the site", "documentation"),
+            ],
+            {"python": [], "npm": [], "system": []},
+            "Static files only; no build step.",
+            "Escape any user-provided content and serve over HTTPS.",
+            "Deploy to any static host such as GitHub Pages or Netlify.",
+        ),
+    },
+    "web-scraper": {
+        "prompt": "web scraper data pipeline",
+        "project_type": "data_pipeline",
+        "plan": _plan(
+            "web-scraper", "data_pipeline",
+            [
+                ("fetcher", "Polite HTTP fetching with retries", "requests"),
+                ("parser", "Extracts records from HTML", "BeautifulSoup"),
+                ("storage", "Writes records to CSV or SQLite", "Python"),
+            ],
+            {"frontend": None, "backend": "python", "database": "SQLite", "other": ["requests", "beautifulsoup4"]},
+            [
+                ("scraper/__init__.py", "Scraper package marker", "fetcher"),
+                ("scraper/main.py", "CLI entry point: takes start URLs and output path, runs fetch -> parse -> store", "fetcher"),
+                ("scraper/fetch.py", "HTTP session with user agent, timeouts, retries with backoff and rate limiting", "fetcher"),
+                ("scraper/parse.py", "HTML parsing functions that turn a page into a list of record dicts", "parser"),
+                ("scraper/storage.py", "Writers for CSV and SQLite output with de-duplication", "storage"),
+                ("requirements.txt", "Python dependencies", "configuration"),
+                ("README.md", "Usage, configuration and robots.txt etiquette", "documentation"),
+                ("tests/test_parse.py", "Parser tests against saved HTML fixtures", "testing"),
+            ],
+            {"python": ["requests", "beautifulsoup4"], "npm": [], "system": []},
+            "A linear fetch -> parse -> store pipeline with each step in its own module.",
+            "Respect robots.txt and rate limits; never execute scraped content.",
+            "Run on a schedule with cron or a container job.",
+        ),
+    },
+    "automation-bot": {
+        "prompt": "automation bot",
+        "project_type": "automation",
+        "plan": _plan(
+            "automation-bot", "automation",
+            [
+                ("scheduler", "Runs tasks on a schedule", "schedule"),
+                ("tasks", "The automated jobs", "Python"),
+            ],
+            {"frontend": None, "backend": "python", "database": None, "other": ["schedule", "python-dotenv"]},
+            [
+                ("bot/__init__.py", "Bot package marker", "tasks"),
+                ("bot/main.py", "Entry point: loads configuration, registers tasks and starts the scheduler", "scheduler"),
+                ("bot/scheduler.py", "Schedules tasks, catches and logs task failures so one failure does not stop the bot", "scheduler"),
+                ("bot/tasks.py", "Task functions performing the requested automation", "tasks"),
+                ("bot/config.py", "Configuration from environment variables", "tasks"),
+                ("requirements.txt", "Python dependencies", "configuration"),
+                (".env.example", "Example environment variables", "configuration"),
+                ("README.md", "Setup, configuration and how to run the bot", "documentation"),
+            ],
+            {"python": ["schedule", "python-dotenv"], "npm": [], "system": []},
+            "A long-running scheduler process invoking small, independent task functions.",
+            "Keep credentials in environment variables and log without secrets.",
+            "Run as a systemd service or container with restart on failure.",
+        ),
+    },
+    "desktop-app": {
+        "prompt": "desktop gui application",
+        "project_type": "desktop",
+        "plan": _plan(
+            "desktop-app", "desktop",
+            [
+                ("ui", "Windows and widgets", "tkinter"),
+                ("logic", "Application logic independent of the UI", "Python"),
+            ],
+            {"frontend": "tkinter", "backend": "python", "database": None, "other": []},
+            [
+                ("app/__init__.py", "Application package marker", "logic"),
+                ("app/main.py", "Entry point: creates the Tk root and main window", "ui"),
+                ("app/ui.py", "Main window layout, widgets and event handlers calling into the logic module", "ui"),
+                ("app/logic.py", "Application logic as plain functions and classes with no UI imports", "logic"),
+                ("requirements.txt", "Python dependencies", "configuration"),
+                ("README.md", "How to install and run the application", "documentation"),
+                ("tests/test_logic.py", "Unit tests for the application logic", "testing"),
+            ],
+            {"python": [], "npm": [], "system": ["python3-tk"]},
+            "UI and logic are separated so the logic can be tested without a display.",
+            "Validate file paths and user input before acting on them.",
+            "Package with PyInstaller for each target platform.",
+        ),
+    },
+    "mobile-app": {
+        "prompt": "mobile app",
+        "project_type": "mobile",
+        "plan": _plan(
+            "mobile-app", "mobile",
+            [
+                ("screens", "Navigable app screens", "React Native"),
+                ("components", "Reusable UI components", "React Native"),
+            ],
+            {"frontend": "react native", "backend": None, "database": None, "other": ["expo", "react-navigation"]},
+            [
+                ("App.js", "Root component setting up navigation between screens", "screens"),
+                ("src/screens/HomeScreen.js", "Home screen presenting the app's main content", "screens"),
+                ("src/screens/DetailScreen.js", "Detail screen for a selected item", "screens"),
+                ("src/components/Header.js", "Reusable header component", "components"),
+                ("package.json", "Dependencies and Expo scripts", "configuration"),
+                ("app.json", "Expo app configuration", "configuration"),
+                ("README.md", "How to run the app with Expo", "documentation"),
+            ],
+            {"python": [], "npm": ["expo", "react", "react-native", "@react-navigation/native"], "system": []},
+            "Expo-managed React Native app with stack navigation.",
+            "Store tokens in secure storage, never in plain AsyncStorage.",
+            "Build with EAS and publish to the app stores.",
+        ),
+    },
+}
+
+
+def template_files(project_type: str) -> Optional[List[Dict[str, str]]]:
+    """File specs of the first template for ``project_type``, or None if there is none."""
+    for template in PLAN_TEMPLATES.values():
+        if template["project_type"] == project_type:
+            return copy.deepcopy(template["plan"]["files"])
+    return None
@@ -0,0 +1,175 @@
+# rate_limiter.py
+
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Used when the config has no LLM_RATE_LIMITS entry for a provider.
+# rpm/tpm of 0 means unlimited.
+DEFAULT_LIMITS = {
+    "openai": {"rpm": 500, "tpm": 150000, "concurrency": 8},
+    "anthropic": {"rpm": 50, "tpm": 40000, "concurrency": 4},
+    "ollama": {"rpm": 0, "tpm": 0, "concurrency": 2},
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at ``rate_per_minute``.
+
+    ``reserve`` debits immediately and returns how long the caller must wait
+    before its reservation is covered, so concurrent callers queue up in
+    arrival order instead of all retrying at once.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        """Take ``amount`` tokens and return the seconds to wait before using them."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= min(amount, self.capacity)
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class BackendLimiter:
+    """Request and token budgets for one (provider, model) pair."""
+
+    def __init__(self, provider: str, model: str, rpm: int = 0, tpm: int = 0):
+        self.provider = provider
+        self.model = model
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.cooldown_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until one request of ``tokens`` tokens fits the budget. Returns seconds waited."""
+        waits = [0.0]
+        if self.requests:
+            waits.append(self.requests.reserve(1))
+        if self.tokens and tokens:
+            waits.append(self.tokens.reserve(tokens))
+        with self.lock:
+            waits.append(self.cooldown_until - time.monotonic())
+        wait = max(waits)
+        if wait > 0:
+            logger.info(f"⏳ Rate limit for {self.provider}/{self.model}: waiting {wait:.2f}s")
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    def defer(self, seconds: float) -> None:
+        """Pause every caller of this backend, e.g. after a Retry-After header."""
+        with self.lock:
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """
+    Process-wide registry of rate limiters and concurrency semaphores.
+
+    Budgets are tracked per (provider, model); the concurrency cap is shared
+    by every model of a provider, since that is what the backend (an API
+    account or a single Ollama GPU) can actually serve.
+    """
+
+    _lock = threading.Lock()
+    _limiters: Dict[Tuple[str, str], BackendLimiter] = {}
+    _semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    @classmethod
+    def _limits(cls, provider: str, config=None) -> dict:
+        limits = dict(DEFAULT_LIMITS.get(provider, {"rpm": 0, "tpm": 0, "concurrency": 4}))
+        limits.update((getattr(config, "LLM_RATE_LIMITS", None) or {}).get(provider, {}))
+        return limits
+
+    @classmethod
+    def get(cls, provider: str, model: str, config=None) -> BackendLimiter:
+        """Return the shared limiter for a provider and model."""
+        with cls._lock:
+            key = (provider, model)
+            if key not in cls._limiters:
+                limits = cls._limits(provider, config)
+                cls._limiters[key] = BackendLimiter(provider, model, limits["rpm"], limits["tpm"])
+            return cls._limiters[key]
+
+    @classmethod
+    def semaphore(cls, provider: str, config=None) -> threading.BoundedSemaphore:
+        """Return the shared concurrency semaphore for a provider."""
+        with cls._lock:
+            if provider not in cls._semaphores:
+                concurrency = max(1, int(cls._limits(provider, config)["concurrency"]))
+                cls._semaphores[provider] = threading.BoundedSemaphore(concurrency)
+            return cls._semaphores[provider]
+
+    @classmethod
+    @contextmanager
+    def slot(cls, provider: str, model: str, tokens: int = 0, config=None):
+        """Hold a concurrency slot and budget for one request."""
+        limiter = cls.get(provider, model, config)
+        with cls.semaphore(provider, config):
+            limiter.acquire(tokens)
+            yield limiter
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget all limiters (used by tests and after config changes)."""
+        with cls._lock:
+            cls._limiters.clear()
+            cls._semaphores.clear()
+
+
+def retry_after_seconds(error) -> Optional[float]:
+    """
+    Extract the Retry-After delay from an HTTP error, if the server sent one.
+
+    Works with ``requests`` errors and the OpenAI/Anthropic SDK errors, which
+    all expose the HTTP response as ``error.response``.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    def header(name):
+        return headers.get(name) or headers.get(name.title())
+
+    value = header("retry-after-ms")
+    if value:
+        try:
+            return max(float(value) / 1000.0, 0.0)
+        except ValueError:
+            pass
+
+    value = header("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter for retry ``attempt`` (0-based)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -1,32 +1,342 @@
 import os
+import re
+import json
+import math
+import heapq
 import logging
-from difflib import SequenceMatcher
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tools.embeddings import get_embedder, np
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+INDEX_VERSION = 1
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens of ``text``."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def split_passages(text: str, passage_words: int = 200) -> List[Tuple[int, int, List[str]]]:
+    """
+    Split a document into passages of about ``passage_words`` tokens.
+
+    Paragraphs (runs of non-blank lines) are kept together where they fit;
+    longer ones are cut into windows that share the paragraph's line range.
+
+    Returns:
+        List[Tuple[int, int, List[str]]]: ``(start_line, end_line, tokens)`` per passage.
+    """
+    paragraphs, block, first = [], [], None
+    for number, line in enumerate(text.split("\n"), 1):
+        if line.strip():
+            first = number if first is None else first
+            block.append(line)
+        elif block:
+            paragraphs.append((first, number - 1, tokenize("\n".join(block))))
+            block, first = [], None
+    if block:
+        paragraphs.append((first, first + len(block) - 1, tokenize("\n".join(block))))
+
+    passages, tokens, start, end = [], [], None, None
+    for first, last, words in paragraphs:
+        if not words:
+            continue
+        if tokens and len(tokens) + len(words) > passage_words:
+            passages.append((start, end, tokens))
+            tokens, start = [], None
+        start = first if start is None else start
+        end = last
+        tokens.extend(words)
+        while len(tokens) > passage_words:
+            passages.append((start, end, tokens[:passage_words]))
+            tokens, start = tokens[passage_words:], first
+    if tokens:
+        passages.append((start, end, tokens))
+    return passages
+
+
 class SimpleRetriever:
-    """Index and search text documents with basic similarity scoring."""
+    """
+    Index and search text documents with BM25 over an inverted index.
+
+    Documents are split into passages, and each passage is a separate BM25
+    document, so long files do not drown out short, relevant ones. A file
+    scores as its best passage. ``index_folder`` reads only files whose
+    modification time or size changed, in parallel, and drops files that
+    were deleted. With ``index_path`` the index is stored as JSON and
+    loaded again by later retrievers.
+
+    With an ``embedder`` (an instance, or a name registered in
+    ``tools.embeddings``) and numpy installed, every passage is also embedded
+    into one contiguous float32 matrix, memory-mapped from
+    ``<index_path>.vectors.npy`` when persisted. The best lexical candidates
+    are then reranked by cosine similarity to the query in a single matrix
+    product, and the max-normalized BM25 score and the similarity are fused
+    with ``lexical_weight`` and ``dense_weight``.
+    """
 
-    def __init__(self):
-        self.index = {}
+    k1 = 1.5
+    b = 0.75
 
-    def index_folder(self, directory: str, exts=(".md", ".txt")) -> None:
+    def __init__(self, index_path: Optional[str] = None, passage_words: int = 200, workers: int = 8,
+                 embedder=None, lexical_weight: float = 0.5, dense_weight: float = 0.5,
+                 rerank_candidates: int = 100):
+        self.index_path = index_path
+        self.passage_words = passage_words
+        self.workers = workers
+        self.lock = threading.RLock()
+        if embedder is not None and np is None:
+            logger.warning("⚠️ numpy is not installed; retrieval stays lexical only")
+            embedder = None
+        self.embedder = get_embedder(embedder) if isinstance(embedder, str) else embedder
+        self.lexical_weight = lexical_weight
+        self.dense_weight = dense_weight
+        self.rerank_candidates = rerank_candidates
+        # Passage embeddings, one row per passage ("row" in its entry); rows of
+        # removed passages are reused
+        self.vectors = None
+        self.row_count = 0
+        self.free_rows: List[int] = []
+        # path -> {"mtime": ns, "size": bytes, "passages": [passage ids]}
+        self.documents: Dict[str, Dict] = {}
+        # passage id -> {"path", "lines": [start, end], "length", "terms": {term: frequency}}
+        self.passages: Dict[int, Dict] = {}
+        # term -> {passage id: frequency}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.total_length = 0
+        self.next_id = 0
+        if index_path:
+            self.load()
+
+    def index_folder(self, directory: str, exts=(".md", ".txt")) -> List[str]:
+        """
+        Index (or re-index) the files under ``directory`` with one of ``exts``.
+
+        Returns:
+            List[str]: Paths that were added, updated or removed.
+        """
+        found = {}
         for root, _, files in os.walk(directory):
             for name in files:
                 if name.endswith(exts):
                     path = os.path.join(root, name)
                     try:
-                        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                            self.index[path] = f.read().lower()
-                    except Exception as e:
+                        stat = os.stat(path)
+                    except OSError as e:
                         logger.error(f"Failed to read {path}: {e}")
+                        continue
+                    found[path] = (stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            prefix = os.path.join(directory, "")
+            removed = [p for p in self.documents if p.startswith(prefix) and p not in found]
+            stale = [
+                p for p, (mtime, size) in found.items()
+                if p not in self.documents or (self.documents[p]["mtime"], self.documents[p]["size"]) != (mtime, size)
+            ]
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            read = list(executor.map(self._read_passages, stale))
+
+        with self.lock:
+            for path in removed:
+                self._remove_document(path)
+            for path, passages in zip(stale, read):
+                if passages is None:
+                    continue
+                self._remove_document(path)
+                mtime, size = found[path]
+                self._add_document(path, mtime, size, passages)
+
+        changed = removed + stale
+        if changed:
+            logger.info(f"📚 Indexed {len(stale)} and removed {len(removed)} documents under {directory}")
+            if self.index_path:
+                self.save()
+        return changed
+
+    def _read_passages(self, path: str) -> Optional[List[Tuple[int, int, List[str]]]]:
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                passages = split_passages(f.read(), self.passage_words)
+        except Exception as e:
+            logger.error(f"Failed to read {path}: {e}")
+            return None
+        if self.embedder is not None and passages:
+            vectors = self.embedder.embed([" ".join(tokens) for _, _, tokens in passages])
+            return [p + (vector,) for p, vector in zip(passages, vectors)]
+        return passages
+
+    def _add_document(self, path: str, mtime: int, size: int, passages: Iterable[Tuple]) -> None:
+        ids = []
+        for start, end, tokens, *vector in passages:
+            terms = {}
+            for token in tokens:
+                terms[token] = terms.get(token, 0) + 1
+            passage_id = self.next_id
+            self.next_id += 1
+            passage = {"path": path, "lines": [start, end], "length": len(tokens), "terms": terms}
+            if vector:
+                passage["row"] = self._store_vector(vector[0])
+            self._add_passage(passage_id, passage)
+            ids.append(passage_id)
+        self.documents[path] = {"mtime": mtime, "size": size, "passages": ids}
+
+    def _store_vector(self, vector) -> int:
+        if self.vectors is None:
+            self.vectors = np.zeros((64, self.embedder.dim), dtype=np.float32)
+        elif not self.vectors.flags.writeable:
+            # Loaded as a read-only memory map: copy before the first write
+            self.vectors = np.array(self.vectors)
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            row = self.row_count
+            self.row_count += 1
+            if row >= len(self.vectors):
+                grown = np.zeros((len(self.vectors) * 2, self.vectors.shape[1]), dtype=np.float32)
+                grown[:len(self.vectors)] = self.vectors
+                self.vectors = grown
+        self.vectors[row] = vector
+        return row
+
+    def _add_passage(self, passage_id: int, passage: Dict) -> None:
+        self.passages[passage_id] = passage
+        self.total_length += passage["length"]
+        for term, frequency in passage["terms"].items():
+            self.postings.setdefault(term, {})[passage_id] = frequency
+
+    def _remove_document(self, path: str) -> None:
+        document = self.documents.pop(path, None)
+        if not document:
+            return
+        for passage_id in document["passages"]:
+            passage = self.passages.pop(passage_id)
+            self.total_length -= passage["length"]
+            if "row" in passage:
+                self.free_rows.append(passage["row"])
+            for term in passage["terms"]:
+                posting = self.postings[term]
+                posting.pop(passage_id, None)
+                if not posting:
+                    del self.postings[term]
+
+    def score_passages(self, query: str) -> Dict[int, float]:
+        """BM25 score of every passage that shares a term with ``query``."""
+        scores: Dict[int, float] = {}
+        with self.lock:
+            count = len(self.passages)
+            if not count:
+                return scores
+            average = self.total_length / count
+            for term in set(tokenize(query)):
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for passage_id, frequency in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.passages[passage_id]["length"] / average)
+                    scores[passage_id] = scores.get(passage_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def search(self, query: str, top_k: int = 3) -> List[str]:
+        """Paths of the ``top_k`` documents most relevant to ``query``, best first."""
+        best: Dict[str, float] = {}
+        with self.lock:
+            scores = self.score_passages(query)
+            if self.embedder is not None and self.vectors is not None and scores:
+                scores = self._rerank(query, scores)
+            for passage_id, score in scores.items():
+                path = self.passages[passage_id]["path"]
+                if score > best.get(path, 0.0):
+                    best[path] = score
+        return [path for path, _ in heapq.nlargest(top_k, best.items(), key=lambda item: (item[1], item[0]))]
+
+    def _rerank(self, query: str, scores: Dict[int, float]) -> Dict[int, float]:
+        """Fuse the BM25 scores of the top lexical candidates with their cosine similarity to ``query``."""
+        candidates = heapq.nlargest(self.rerank_candidates, scores.items(), key=lambda item: item[1])
+        rows = np.fromiter((self.passages[pid]["row"] for pid, _ in candidates), dtype=np.int64, count=len(candidates))
+        lexical = np.fromiter((score for _, score in candidates), dtype=np.float32, count=len(candidates))
+        lexical /= lexical.max() or 1.0
+        # Rows and query are unit length, so the product is the cosine similarity
+        similarity = self.vectors[rows] @ self.embedder.embed([query])[0]
+        fused = self.lexical_weight * lexical + self.dense_weight * np.clip(similarity, 0.0, None)
+        return {pid: float(score) for (pid, _), score in zip(candidates, fused)}
+
+    @property
+    def vectors_path(self) -> str:
+        return f"{self.index_path}.vectors.npy"
+
+    def _embedder_signature(self) -> Optional[str]:
+        if self.embedder is None:
+            return None
+        return f"{type(self.embedder).__name__}:{self.embedder.dim}"
+
+    def load(self) -> None:
+        """Load the index stored at ``index_path``, if there is one."""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Rebuilding unreadable retriever index {self.index_path}: {e}")
+            return
+        if data.get("version") != INDEX_VERSION or data.get("passage_words") != self.passage_words or \
+                data.get("embedder") != self._embedder_signature():
+            return
+
+        vectors = None
+        if self.embedder is not None and data.get("row_count"):
+            try:
+                vectors = np.load(self.vectors_path, mmap_mode="r")
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Rebuilding retriever index without readable vectors: {e}")
+                return
+            if vectors.ndim != 2 or vectors.shape[1] != self.embedder.dim or len(vectors) != data.get("row_count"):
+                logger.warning("⚠️ Retriever vectors do not match the index; rebuilding")
+                return
+
+        with self.lock:
+            self.documents = data["documents"]
+            self.next_id = data["next_id"]
+            for passage_id, passage in data["passages"].items():
+                self._add_passage(int(passage_id), passage)
+            if vectors is not None:
+                self.vectors = vectors
+                self.row_count = len(vectors)
+                self.free_rows = data.get("free_rows", [])
 
-    def search(self, query: str, top_k: int = 3):
-        query = query.lower()
-        scored = []
-        for path, text in self.index.items():
-            score = SequenceMatcher(None, query, text).ratio()
-            scored.append((score, path))
-        scored.sort(reverse=True)
-        return [p for _, p in scored[:top_k]]
+    def save(self) -> None:
+        """Write the index to ``index_path`` atomically."""
+        with self.lock:
+            data = {
+                "version": INDEX_VERSION,
+                "passage_words": self.passage_words,
+                "next_id": self.next_id,
+                "documents": self.documents,
+                "passages": self.passages,
+                "embedder": self._embedder_signature(),
+                "row_count": self.row_count,
+                "free_rows": self.free_rows,
+            }
+            tmp_path = f"{self.index_path}.tmp"
+            try:
+                if self.embedder is not None:
+                    # Written first: the JSON refers to its rows
+                    vectors = self.vectors[:self.row_count] if self.vectors is not None else \
+                        np.zeros((0, self.embedder.dim), dtype=np.float32)
+                    with open(f"{self.vectors_path}.tmp", "wb") as f:
+                        np.save(f, vectors)
+                    os.replace(f"{self.vectors_path}.tmp", self.vectors_path)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.index_path)
+            except OSError as e:
+                logger.error(f"❌ Could not save retriever index: {e}")
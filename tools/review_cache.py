@@ -0,0 +1,33 @@
+# review_cache.py
+
+import hashlib
+import logging
+
+from tools.fix_cache import PersistentLRUCache
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def make_review_key(code: str, model: str, prompt_version: str) -> str:
+    """Build the cache key from file content, review model and prompt version."""
+    digest = hashlib.sha256()
+    digest.update(prompt_version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(code.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ReviewCache(PersistentLRUCache):
+    """
+    Persistent cache of code reviews keyed on content hash and prompt version.
+
+    Unchanged files are not re-reviewed on later runs; bumping the reviewer's
+    prompt version invalidates every entry. Bounded by
+    ``REVIEW_CACHE_MAX_ENTRIES``.
+    """
+
+    TABLE = "review_cache"
+    MAX_ENTRIES_SETTING = "REVIEW_CACHE_MAX_ENTRIES"
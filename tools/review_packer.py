@@ -0,0 +1,171 @@
+# review_packer.py
+
+import re
+import ast
+import logging
+from typing import List, Dict
+
+from agents.agent_base import estimate_tokens
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+_SECTION_RE = re.compile(
+    r"^#{2,3}\s*FILE:\s*(?P<path>.+?)(?:\s*\(lines?\s*(?P<start>\d+)\s*-\s*(?P<end>\d+)\))?\s*$",
+    re.MULTILINE,
+)
+
+
+def chunk_header(chunk: Dict) -> str:
+    """Header line that identifies a chunk in prompts and responses."""
+    return f"### FILE: {chunk['path']} (lines {chunk['start']}-{chunk['end']})"
+
+
+def split_code(path: str, code: str, max_tokens: int) -> List[Dict]:
+    """
+    Splits a file into review chunks of at most ``max_tokens`` each.
+
+    Python files are split along top-level function/class boundaries using
+    ``ast``; other files (or Python that does not parse) are split by lines.
+
+    Returns:
+        List[Dict]: Chunks with ``path``, ``start``, ``end`` (1-based, inclusive) and ``code``.
+    """
+    lines = code.splitlines()
+    if estimate_tokens(code) <= max_tokens or len(lines) <= 1:
+        return [{"path": path, "start": 1, "end": max(len(lines), 1), "code": code}]
+
+    boundaries = _python_boundaries(code) if path.endswith(".py") else []
+    if not boundaries:
+        boundaries = list(range(1, len(lines) + 1))
+    if boundaries[0] != 1:
+        boundaries.insert(0, 1)
+
+    chunks = []
+    current = None  # [start, end, tokens]
+    for start, next_start in zip(boundaries, boundaries[1:] + [len(lines) + 1]):
+        end = next_start - 1
+        tokens = estimate_tokens("\n".join(lines[start - 1:end]))
+        if current and current[2] + tokens + 1 > max_tokens:
+            chunks.append(_make_chunk(path, lines, current[0], current[1]))
+            current = None
+        if tokens > max_tokens:
+            # A single function/class larger than the budget is split by lines.
+            chunks.extend(_line_chunks(path, lines, start, end, max_tokens))
+            continue
+        if current:
+            current[1], current[2] = end, current[2] + tokens + 1
+        else:
+            current = [start, end, tokens]
+    if current:
+        chunks.append(_make_chunk(path, lines, current[0], current[1]))
+    return chunks
+
+
+def _python_boundaries(code: str) -> List[int]:
+    """Line numbers where top-level statements (including decorators) begin."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return []
+    starts = []
+    for node in tree.body:
+        decorators = getattr(node, "decorator_list", [])
+        starts.append(min([node.lineno] + [d.lineno for d in decorators]))
+    return sorted(set(starts))
+
+
+def _line_chunks(path: str, lines: List[str], start: int, end: int, max_tokens: int) -> List[Dict]:
+    """Splits lines ``start..end`` into chunks that fit the budget, one line at a time if needed."""
+    chunks = []
+    chunk_start = start
+    size = 0
+    for lineno in range(start, end + 1):
+        line_tokens = estimate_tokens(lines[lineno - 1]) + 1
+        if size and size + line_tokens > max_tokens:
+            chunks.append(_make_chunk(path, lines, chunk_start, lineno - 1))
+            chunk_start, size = lineno, 0
+        size += line_tokens
+    if chunk_start <= end:
+        chunks.append(_make_chunk(path, lines, chunk_start, end))
+    return chunks
+
+
+def _make_chunk(path: str, lines: List[str], start: int, end: int) -> Dict:
+    return {"path": path, "start": start, "end": end, "code": "\n".join(lines[start - 1:end])}
+
+
+def pack_files(files: Dict[str, str], max_tokens: int, max_chunks: int = None) -> List[List[Dict]]:
+    """
+    Groups files into review requests that each stay under ``max_tokens``.
+
+    Large files are split first; small files and chunks are then packed
+    greedily in order, so most requests carry several files.
+
+    Args:
+        files (Dict[str, str]): Mapping of path to contents.
+        max_tokens (int): Token budget for the code in one request.
+        max_chunks (int): Most chunks per request, so the reviews of all of
+            them fit in one response; unlimited if None.
+
+    Returns:
+        List[List[Dict]]: One list of chunks per request.
+    """
+    requests = []
+    current = []
+    used = 0
+    for path, code in files.items():
+        for chunk in split_code(path, code, max_tokens):
+            cost = estimate_tokens(chunk["code"]) + estimate_tokens(chunk_header(chunk)) + 4
+            if current and (used + cost > max_tokens or len(current) == max_chunks):
+                requests.append(current)
+                current, used = [], 0
+            current.append(chunk)
+            used += cost
+    if current:
+        requests.append(current)
+    logger.info(f"📦 Packed {len(files)} file(s) into {len(requests)} review request(s)")
+    return requests
+
+
+def build_review_prompt(chunks: List[Dict]) -> str:
+    """Builds one review prompt covering every chunk in a packed request."""
+    sections = "\n\n".join(f"{chunk_header(c)}\n```\n{c['code']}\n```" for c in chunks)
+    return (
+        "Please review each of the following code sections. Start the review of each section "
+        "with its header line exactly as given (e.g. '### FILE: <path> (lines <a>-<b>)'). "
+        "Refer to line numbers within the file.\n\n" + sections
+    )
+
+
+def split_review(response: str, chunks: List[Dict]) -> Dict[tuple, str]:
+    """
+    Maps a packed review response back to ``(path, start, end)`` chunk keys.
+
+    Sections are matched by path and line range. A section whose range is
+    missing or matches no chunk goes to one still unmatched chunk of its path
+    (the first), so the chunks of a split file never share a review. A lone
+    chunk without a section receives the whole response; in a packed request
+    such chunks are left out of the result, since the response cannot be
+    attributed to them, and the caller re-requests them.
+    """
+    keys = [(c["path"], c["start"], c["end"]) for c in chunks]
+    matches = list(_SECTION_RE.finditer(response))
+    reviews = {}
+    by_path = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+        text = response[match.end():end].strip()
+        path = match.group("path").strip("`'\" ")
+        key = (path, int(match.group("start")), int(match.group("end"))) if match.group("start") else None
+        if key in keys and key not in reviews:
+            reviews[key] = text
+        else:
+            by_path.setdefault(path, []).append(text)
+
+    for key in keys:
+        if key not in reviews and by_path.get(key[0]):
+            reviews[key] = by_path[key[0]].pop(0)
+    if not reviews and len(chunks) == 1:
+        reviews[keys[0]] = response
+    return reviews
@@ -0,0 +1,157 @@
+# run_manifest.py
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+MANIFEST_NAME = ".agency_run.json"
+
+
+def file_hash(path: str) -> Optional[str]:
+    """SHA-256 of a file's contents, or None if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class RunManifest:
+    """
+    Checkpoint of a pipeline run, stored as JSON in the project directory.
+
+    Completed stages keep their output (plan, generated files, test results,
+    fixes, reviews) and every generated file is recorded with its hash, so an
+    interrupted run can be resumed without repeating finished LLM work.
+    Every change is written to disk immediately.
+    """
+
+    def __init__(self, project_dir: str, data: Optional[Dict] = None):
+        self.project_dir = project_dir
+        self.data = data or {}
+        self.data.setdefault("stages", {})
+        self.data.setdefault("files", {})
+        self.lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.project_dir, MANIFEST_NAME)
+
+    @classmethod
+    def start(cls, project_dir: str, prompt: str, project_name: str) -> "RunManifest":
+        """Create and save a fresh manifest for a new run."""
+        manifest = cls(project_dir, {
+            "prompt": prompt,
+            "project_name": project_name,
+            "status": "in_progress",
+            "started": time.time(),
+        })
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, project_dir: str) -> Optional["RunManifest"]:
+        """Load the manifest in ``project_dir``; None if missing or unreadable."""
+        try:
+            with open(os.path.join(project_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                return cls(project_dir, json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Could not read run manifest in {project_dir}: {e}")
+            return None
+
+    def save(self) -> None:
+        """Write the manifest atomically so a crash never leaves it half-written."""
+        with self.lock:
+            self._save()
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=2, default=str)
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError) as e:
+            logger.error(f"❌ Could not write run manifest: {e}")
+
+    @property
+    def prompt(self) -> str:
+        return self.data.get("prompt", "")
+
+    @property
+    def project_name(self) -> str:
+        return self.data.get("project_name", os.path.basename(self.project_dir))
+
+    def stage_done(self, stage: str) -> bool:
+        return stage in self.data["stages"]
+
+    def stage_output(self, stage: str) -> Any:
+        return self.data["stages"].get(stage, {}).get("output")
+
+    def complete_stage(self, stage: str, output: Any = None) -> None:
+        """Checkpoint ``stage`` as finished with ``output``."""
+        with self.lock:
+            self.data["stages"][stage] = {"output": output, "completed": time.time()}
+            self._save()
+
+    def forget_stages(self, *stages: str) -> None:
+        """Drop checkpoints that no longer describe the project."""
+        with self.lock:
+            for stage in stages:
+                self.data["stages"].pop(stage, None)
+            self._save()
+
+    def add_change(self, prompt: str, diff: Dict) -> None:
+        """Append an incremental change request and its plan diff to the history."""
+        with self.lock:
+            self.data.setdefault("changes", []).append({"prompt": prompt, "diff": diff, "applied": time.time()})
+            self._save()
+
+    def record_file(self, path: str) -> None:
+        """Checkpoint a generated file (relative to the project) by its current hash."""
+        digest = file_hash(os.path.join(self.project_dir, path))
+        if digest is None:
+            return
+        with self.lock:
+            self.data["files"][path] = digest
+            self._save()
+
+    def update_files(self, paths: Iterable[str]) -> None:
+        """
+        Re-checkpoint recorded files after a later stage (e.g. the fixer) changed them.
+
+        Files that were never recorded, such as fallback placeholders written
+        when generation failed, stay unrecorded so a resume regenerates them.
+        """
+        with self.lock:
+            known = [p for p in paths if p in self.data["files"]]
+        hashes = {p: file_hash(os.path.join(self.project_dir, p)) for p in known}
+        with self.lock:
+            self.data["files"].update({p: h for p, h in hashes.items() if h})
+            self._save()
+
+    def forget_files(self, paths: Iterable[str]) -> None:
+        with self.lock:
+            for path in paths:
+                self.data["files"].pop(path, None)
+            self._save()
+
+    def completed_files(self) -> Set[str]:
+        """Recorded files that are still on disk unchanged."""
+        with self.lock:
+            files = dict(self.data["files"])
+        return {p for p, h in files.items() if file_hash(os.path.join(self.project_dir, p)) == h}
+
+    def finish(self, status: str) -> None:
+        with self.lock:
+            self.data["status"] = status
+            self.data["finished"] = time.time()
+            self._save()
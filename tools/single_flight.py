@@ -0,0 +1,74 @@
+# single_flight.py
+
+import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, Optional
+
+from tools.fix_cache import normalize_code
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def llm_request_key(model: str, prompt: str, system: str = "", max_tokens: int = 0,
+                    schema: Optional[dict] = None) -> str:
+    """
+    Hash identifying an LLM request.
+
+    The model name is case-folded and the prompts are normalized like cached
+    code, so requests differing only in trailing whitespace share a key.
+    """
+    digest = hashlib.sha256()
+    if max_tokens:
+        digest.update(f"max_tokens={max_tokens}".encode("utf-8"))
+        digest.update(b"\0")
+    if schema:
+        digest.update(json.dumps(schema, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(model.strip().lower().encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_code(system or "").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_code(prompt or "").encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait on the same future and receive its result (or error).
+    Nothing is kept once the call completes, so this is not a cache.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight: Dict[str, Future] = {}
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.in_flight[key] = future
+            else:
+                self.shared += 1
+
+        if not leader:
+            logger.info(f"🔗 Joining identical in-flight request {key[:12]}")
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+        return future.result()
@@ -0,0 +1,290 @@
+# symbol_index.py
+
+import os
+import re
+import ast
+import json
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+from tools.interface_summary import JS_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+INDEX_VERSION = 1
+
+PYTHON_EXTENSIONS = (".py",)
+
+# Directories that never hold project sources
+SKIPPED_DIRS = {"node_modules", "__pycache__", "venv", "env", "dist", "build"}
+
+_JS_DEF_RE = re.compile(
+    r"^[ \t]*(?:export[ \t]+)?(?:default[ \t]+)?(?:declare[ \t]+)?(?:async[ \t]+)?"
+    r"(function\*?|class|const|let|var|interface|type|enum)[ \t]+([A-Za-z_$][\w$]*)",
+    re.MULTILINE,
+)
+
+# Names pulled out of Python tracebacks and error messages
+_FRAME_RE = re.compile(r'File "([^"]+)", line (\d+), in ([\w<>]+)')
+_ERROR_NAME_RES = [
+    re.compile(r"name '(\w+)' is not defined"),
+    re.compile(r"cannot import name '(\w+)'"),
+    re.compile(r"(\w+)\(\) (?:takes|got|missing)"),
+]
+_ATTRIBUTE_RE = re.compile(r"'(\w+)' object has no attribute '(\w+)'")
+
+
+def _python_entries(code: str):
+    tree = ast.parse(code)
+    symbols = []
+
+    def visit(body, prefix: str, in_class: bool):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                if isinstance(node, ast.ClassDef):
+                    kind = "class"
+                else:
+                    kind = "method" if in_class else "function"
+                qualname = prefix + node.name
+                symbols.append({
+                    "name": node.name, "qualname": qualname, "kind": kind,
+                    "line": node.lineno, "end_line": getattr(node, "end_lineno", node.lineno),
+                })
+                visit(node.body, qualname + ".", isinstance(node, ast.ClassDef))
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)) and (in_class or not prefix):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        symbols.append({
+                            "name": target.id, "qualname": prefix + target.id,
+                            "kind": "attribute" if in_class else "variable",
+                            "line": node.lineno, "end_line": getattr(node, "end_lineno", node.lineno),
+                        })
+
+    visit(tree.body, "", False)
+    return symbols
+
+
+def _js_entries(code: str):
+    line_starts = [0] + [m.end() for m in re.finditer("\n", code)]
+
+    def line_of(offset: int) -> int:
+        low, high = 0, len(line_starts) - 1
+        while low < high:
+            mid = (low + high + 1) // 2
+            if line_starts[mid] <= offset:
+                low = mid
+            else:
+                high = mid - 1
+        return low + 1
+
+    total = len(line_starts)
+    symbols = []
+    for match in _JS_DEF_RE.finditer(code):
+        keyword, name = match.group(1).rstrip("*"), match.group(2)
+        kind = {"function": "function", "class": "class"}.get(keyword, "type" if keyword in ("interface", "type", "enum") else "variable")
+        symbols.append({"name": name, "qualname": name, "kind": kind, "line": line_of(match.start(2))})
+    # Without a parser, a definition is taken to run until the next one (at most 80 lines)
+    for current, following in zip(symbols, symbols[1:] + [None]):
+        end = following["line"] - 1 if following else total
+        current["end_line"] = max(current["line"], min(end, current["line"] + 80))
+    return symbols
+
+
+def traceback_names(text: str, project_dir: Optional[str] = None) -> Dict[str, list]:
+    """
+    Identifiers and project locations mentioned in a Python traceback.
+
+    Args:
+        text (str): Test output containing the traceback.
+        project_dir (str): If given, frames inside it are returned as
+            project-relative ``(path, line)`` locations.
+
+    Returns:
+        Dict[str, list]: ``names`` (functions in the frames and names from the
+        error message, qualified as ``Class.attr`` for attribute errors) and
+        ``locations``, both in order of appearance without duplicates.
+    """
+    names, locations = [], []
+    root = os.path.realpath(project_dir) if project_dir else None
+    for file_name, line, function in _FRAME_RE.findall(text):
+        if not function.startswith("<"):
+            names.append(function)
+        if root:
+            full = os.path.realpath(file_name if os.path.isabs(file_name) else os.path.join(root, file_name))
+            if full.startswith(root + os.sep):
+                locations.append((os.path.relpath(full, root), int(line)))
+    for pattern in _ERROR_NAME_RES:
+        names.extend(pattern.findall(text))
+    for owner, attribute in _ATTRIBUTE_RE.findall(text):
+        names.extend([f"{owner}.{attribute}", owner])
+    return {"names": list(dict.fromkeys(names)), "locations": list(dict.fromkeys(locations))}
+
+
+def index_path(project_dir: str, cache_dir: str) -> str:
+    """Path of the symbol index of ``project_dir`` inside ``cache_dir``, unique per project."""
+    real = os.path.realpath(project_dir)
+    digest = hashlib.sha1(real.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, "symbols", f"{os.path.basename(real) or 'project'}-{digest}.json")
+
+
+class SymbolIndex:
+    """
+    Persistent index of the symbols defined in a project.
+
+    Each definition is recorded with its file, line range and kind, and
+    lookups by name or qualified name are dictionary hits. ``refresh``
+    re-parses only files whose modification time and content hash changed,
+    and the index is stored as JSON under ``cache_dir`` between runs, never
+    among the project's files.
+    """
+
+    def __init__(self, project_dir: str, cache_dir: str, data: Optional[Dict] = None):
+        self.project_dir = project_dir
+        self.cache_dir = cache_dir
+        data = data or {}
+        self.files: Dict[str, Dict] = data.get("files", {}) if data.get("version") == INDEX_VERSION else {}
+        self.lock = threading.RLock()
+        self.by_name: Dict[str, List[Dict]] = {}
+        self.by_qualname: Dict[str, List[Dict]] = {}
+        for path in self.files:
+            self._add_lookups(path)
+
+    @property
+    def path(self) -> str:
+        return index_path(self.project_dir, self.cache_dir)
+
+    @classmethod
+    def load(cls, project_dir: str, cache_dir: str) -> "SymbolIndex":
+        """Load the index of ``project_dir`` stored in ``cache_dir``; an empty index if there is none."""
+        try:
+            with open(index_path(project_dir, cache_dir), "r", encoding="utf-8") as f:
+                return cls(project_dir, cache_dir, json.load(f))
+        except FileNotFoundError:
+            return cls(project_dir, cache_dir)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Rebuilding unreadable symbol index of {project_dir}: {e}")
+            return cls(project_dir, cache_dir)
+
+    def save(self) -> None:
+        """Write the index atomically."""
+        with self.lock:
+            tmp_path = f"{self.path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"version": INDEX_VERSION, "files": self.files}, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.error(f"❌ Could not save symbol index: {e}")
+
+    def source_files(self) -> List[str]:
+        """Project-relative paths of the Python and JavaScript/TypeScript files on disk."""
+        found = []
+        for root, dirs, files in os.walk(self.project_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d not in SKIPPED_DIRS]
+            for name in files:
+                if name.endswith(PYTHON_EXTENSIONS + JS_EXTENSIONS):
+                    found.append(os.path.relpath(os.path.join(root, name), self.project_dir))
+        return sorted(found)
+
+    def refresh(self, paths: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Bring the index up to date with the files on disk.
+
+        Args:
+            paths (Iterable[str]): Only check these files. By default the whole
+                project is scanned and deleted files are dropped.
+
+        Returns:
+            List[str]: Paths whose entries changed.
+        """
+        with self.lock:
+            if paths is None:
+                paths = self.source_files()
+                stale = [p for p in self.files if p not in set(paths)]
+            else:
+                paths = [os.path.normpath(p) for p in paths]
+                stale = []
+            changed = []
+            for path in stale:
+                self._remove_lookups(path)
+                del self.files[path]
+                changed.append(path)
+            for path in paths:
+                if self._index_file(path):
+                    changed.append(path)
+            if changed:
+                logger.info(f"🗂️ Symbol index updated for {len(changed)} files")
+            return changed
+
+    def _index_file(self, path: str) -> bool:
+        full_path = os.path.join(self.project_dir, path)
+        entry = self.files.get(path)
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            if entry is None:
+                return False
+            self._remove_lookups(path)
+            del self.files[path]
+            return True
+        mtime, size = stat.st_mtime_ns, stat.st_size
+        if entry and entry["mtime"] == mtime and entry.get("size") == size:
+            return False
+
+        with open(full_path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if entry and entry["hash"] == digest:
+            entry.update(mtime=mtime, size=size)
+            return False
+
+        code = raw.decode("utf-8", errors="replace")
+        try:
+            symbols = _python_entries(code) if path.endswith(PYTHON_EXTENSIONS) else _js_entries(code)
+        except SyntaxError:
+            # Keep the last good entries for files that are mid-edit or broken
+            symbols = entry["symbols"] if entry else []
+        if entry:
+            self._remove_lookups(path)
+        self.files[path] = {"mtime": mtime, "size": size, "hash": digest, "symbols": symbols}
+        self._add_lookups(path)
+        return True
+
+    def _add_lookups(self, path: str) -> None:
+        entry = self.files[path]
+        for symbol in entry["symbols"]:
+            located = dict(symbol, path=path)
+            self.by_name.setdefault(symbol["name"], []).append(located)
+            self.by_qualname.setdefault(symbol["qualname"], []).append(located)
+
+    def _remove_lookups(self, path: str) -> None:
+        entry = self.files[path]
+        for table, key_field, items in (
+            (self.by_name, "name", entry["symbols"]),
+            (self.by_qualname, "qualname", entry["symbols"]),
+        ):
+            for key in {item[key_field] for item in items}:
+                remaining = [item for item in table.get(key, []) if item["path"] != path]
+                if remaining:
+                    table[key] = remaining
+                else:
+                    table.pop(key, None)
+
+    def definitions(self, name: str) -> List[Dict]:
+        """Definitions of ``name``, which may be qualified (``Class.method``)."""
+        with self.lock:
+            return list(self.by_qualname.get(name) or self.by_name.get(name, []))
+
+    def symbols_in(self, path: str) -> List[Dict]:
+        """Symbols defined in ``path``."""
+        with self.lock:
+            return [dict(s, path=path) for s in self.files.get(os.path.normpath(path), {}).get("symbols", [])]
+
+    def symbol_at(self, path: str, line: int) -> Optional[Dict]:
+        """Innermost symbol of ``path`` whose definition spans ``line``."""
+        enclosing = [s for s in self.symbols_in(path) if s["line"] <= line <= s["end_line"]]
+        return min(enclosing, key=lambda s: s["end_line"] - s["line"], default=None)
@@ -0,0 +1,241 @@
+# usage_ledger.py
+
+import time
+import logging
+import sqlite3
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# USD per million (prompt, completion) tokens. Matched by longest model-name
+# prefix; unknown models (e.g. local Ollama ones) cost nothing. Override or
+# extend with ``LLM_PRICES`` in the config.
+DEFAULT_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "claude-3-opus": (15.00, 75.00),
+    "claude-3-sonnet": (3.00, 15.00),
+    "claude-3-haiku": (0.25, 1.25),
+}
+
+GROUP_BY_COLUMNS = ("project", "stage", "agent", "provider", "model")
+
+_context: contextvars.ContextVar = contextvars.ContextVar("usage_context", default={})
+
+
+def current_usage_context() -> Dict[str, str]:
+    """Tags (project, stage) attached to LLM calls made from the current context."""
+    return dict(_context.get())
+
+
+def set_usage_context(**tags) -> contextvars.Token:
+    """Merge ``tags`` into the current usage context; undo with ``reset_usage_context``."""
+    return _context.set({**_context.get(), **tags})
+
+
+def reset_usage_context(token: contextvars.Token) -> None:
+    _context.reset(token)
+
+
+@contextmanager
+def usage_context(**tags):
+    """Attribute LLM calls made inside the block to ``tags`` (e.g. project, stage)."""
+    token = set_usage_context(**tags)
+    try:
+        yield
+    finally:
+        reset_usage_context(token)
+
+
+def bind_usage_context(fn: Callable) -> Callable:
+    """
+    Wrap ``fn`` so it runs with the caller's usage context.
+
+    Worker threads start with an empty context, so functions handed to a
+    thread pool must be bound for their LLM calls to keep their tags.
+    """
+    tags = current_usage_context()
+
+    def bound(*args, **kwargs):
+        with usage_context(**tags):
+            return fn(*args, **kwargs)
+
+    return bound
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, prices: Optional[dict] = None) -> float:
+    """Estimated USD cost of one call."""
+    table = dict(DEFAULT_PRICES)
+    table.update(prices or {})
+    matches = [name for name in table if model.startswith(name)]
+    if not matches:
+        return 0.0
+    prompt_price, completion_price = table[max(matches, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class UsageLedger:
+    """
+    SQLite-backed record of every LLM call: tokens, time to first token,
+    latency, throughput and estimated cost, tagged with project, stage,
+    agent, provider and model so it can be aggregated along any of them.
+    Only the newest ``max_rows`` calls are kept.
+    """
+
+    _registry: Dict[str, "UsageLedger"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, db_path: str = "the_agency.db", prices: Optional[dict] = None, max_rows: int = 100000):
+        self.lock = threading.Lock()
+        self.prices = prices or {}
+        self.max_rows = max_rows
+        self.rows: List[dict] = []
+        self.conn = None
+        try:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_usage ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, created REAL, project TEXT, stage TEXT, "
+                "agent TEXT, provider TEXT, model TEXT, prompt_tokens INTEGER, completion_tokens INTEGER, "
+                "ttft REAL, latency REAL, tokens_per_sec REAL, cost REAL, estimated INTEGER)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS llm_usage_project ON llm_usage (project)")
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"❌ UsageLedger DB connection failed, using memory only: {e}")
+            self.conn = None
+
+    @classmethod
+    def get(cls, config=None) -> "UsageLedger":
+        """Return the process-wide ledger for the configured database."""
+        path = getattr(config, "SQLITE_PATH", "the_agency.db")
+        with cls._registry_lock:
+            if path not in cls._registry:
+                cls._registry[path] = cls(
+                    path, getattr(config, "LLM_PRICES", None), getattr(config, "USAGE_LEDGER_MAX_ROWS", 100000)
+                )
+            return cls._registry[path]
+
+    @classmethod
+    def reset_all(cls) -> None:
+        """Forget every ledger (used by tests)."""
+        with cls._registry_lock:
+            cls._registry.clear()
+
+    def record(self, provider: str, model: str, prompt_tokens: int, completion_tokens: int, latency: float,
+               ttft: Optional[float] = None, tokens_per_sec: Optional[float] = None, agent: str = "",
+               estimated: bool = False) -> dict:
+        """
+        Store one call. ``project`` and ``stage`` come from the usage context.
+
+        Args:
+            provider (str): openai, anthropic or ollama.
+            model (str): Model that served the call.
+            prompt_tokens (int): Input tokens.
+            completion_tokens (int): Output tokens.
+            latency (float): Total seconds for the call.
+            ttft (float): Seconds until the first token, if the provider reports it.
+            tokens_per_sec (float): Generation speed; derived from latency if omitted.
+            agent (str): Agent class that made the call.
+            estimated (bool): True when token counts were estimated, not reported.
+
+        Returns:
+            dict: The stored row.
+        """
+        tags = current_usage_context()
+        if tokens_per_sec is None:
+            tokens_per_sec = completion_tokens / latency if latency > 0 else 0.0
+        row = {
+            "created": time.time(),
+            "project": tags.get("project", ""),
+            "stage": tags.get("stage") or agent,
+            "agent": agent,
+            "provider": provider,
+            "model": model,
+            "prompt_tokens": int(prompt_tokens),
+            "completion_tokens": int(completion_tokens),
+            "ttft": ttft,
+            "latency": latency,
+            "tokens_per_sec": tokens_per_sec,
+            "cost": estimate_cost(model, prompt_tokens, completion_tokens, self.prices),
+            "estimated": int(estimated),
+        }
+        with self.lock:
+            if self.conn:
+                try:
+                    self.conn.execute(
+                        f"INSERT INTO llm_usage ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                        tuple(row.values()),
+                    )
+                    # Ids only grow, so everything below the newest max_rows ids is the oldest
+                    self.conn.execute(
+                        "DELETE FROM llm_usage WHERE id <= (SELECT MAX(id) FROM llm_usage) - ?",
+                        (self.max_rows,),
+                    )
+                    self.conn.commit()
+                    return row
+                except sqlite3.Error as e:
+                    logger.error(f"❌ UsageLedger write error: {e}")
+            self.rows.append(row)
+            del self.rows[:-self.max_rows]
+        return row
+
+    def summary(self, by: str = "stage", project: Optional[str] = None) -> List[dict]:
+        """
+        Aggregate calls along one dimension, most expensive first.
+
+        Args:
+            by (str): One of project, stage, agent, provider or model.
+            project (str): Only include calls made for this project.
+
+        Returns:
+            List[dict]: Per-group calls, token totals, cost, mean latency and mean tokens/sec.
+        """
+        if by not in GROUP_BY_COLUMNS:
+            raise ValueError(f"Cannot group usage by '{by}'; use one of {', '.join(GROUP_BY_COLUMNS)}")
+
+        # Per group: calls, prompt tokens, completion tokens, cost, total latency, total tokens/sec
+        totals: Dict[str, list] = {}
+
+        def add(key, values):
+            group = totals.setdefault(key, [0, 0, 0, 0.0, 0.0, 0.0])
+            for i, value in enumerate(values):
+                group[i] += value or 0
+
+        with self.lock:
+            if self.conn:
+                # `by` is one of GROUP_BY_COLUMNS, so it is safe to interpolate
+                try:
+                    cursor = self.conn.execute(
+                        f"SELECT {by}, COUNT(*), SUM(prompt_tokens), SUM(completion_tokens), SUM(cost), "
+                        f"SUM(latency), SUM(tokens_per_sec) FROM llm_usage"
+                        + (" WHERE project=?" if project is not None else "")
+                        + f" GROUP BY {by}",
+                        (project,) if project is not None else (),
+                    )
+                    for key, *values in cursor.fetchall():
+                        add(key, values)
+                except sqlite3.Error as e:
+                    logger.error(f"❌ UsageLedger read error: {e}")
+            for row in self.rows:
+                if project is None or row["project"] == project:
+                    add(row[by], (1, row["prompt_tokens"], row["completion_tokens"], row["cost"],
+                                  row["latency"], row["tokens_per_sec"]))
+
+        results = [{
+            by: key,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost": cost,
+            "calls": calls,
+            "avg_latency": total_latency / calls,
+            "avg_tokens_per_sec": total_speed / calls,
+        } for key, (calls, prompt_tokens, completion_tokens, cost, total_latency, total_speed) in totals.items()]
+        return sorted(results, key=lambda g: (-g["cost"], -g["calls"]))